@@ -0,0 +1 @@
+# Lets plain `pytest` import the utils package from the repository root
@@ -7,7 +7,182 @@ import numpy as np
 import os
 import datetime
 import json
-import plotly.io as pio
+
+from utils.forecasting import mc_dropout_forecast, recursive_forecast, undo_seasonal_difference
+from utils.feature_state import seasonal_frame
+from utils.forecast_cache import ForecastCache, forecast_key, series_hash
+from utils.model_registry import ModelRegistry
+from utils.notebook_loader import NOTEBOOK_FIGURES
+from utils.plot_loader import load_figure
+from utils.timeseries_store import TimeSeriesStore, store_directory
+
+
+def load_gdp_history():
+    """Annual GDP (current US$) in the shape the GDP LSTM was trained on"""
+    df = pd.read_csv('datasets_cleaned/Economy/Pakistan_GDP.csv', index_col=0)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df.set_index('Date')['GDP (current US$)']
+
+
+def load_debt_history():
+    """Total debt and liabilities in PKR, fiscal years ending June"""
+    df = pd.read_csv('datasets_cleaned/Economy/Pakistan_Debt_and_Liabilities.csv')
+    df = df[df['Series_Name'] == 'Total Debt and Liabilities (sum I to IX)'].copy()
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df.set_index('Date')['Value'] * 1_000_000_000
+
+
+def load_service_exports_history():
+    """Monthly exports of services in USD, as the service-exports LSTM was trained on"""
+    df = pd.read_csv('datasets_cleaned/Economy/Services-Export.csv')
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df.set_index('Date')['Value'].sort_index() * 1_000_000
+
+
+# Forecasts computed at request time from the registry's NumPy models
+LIVE_FORECASTS = {
+    'GDP LSTM Forecast': {
+        'model': 'lstm_gdp_model',
+        'history': load_gdp_history,
+        'steps': 10,
+        'freq': 'YS',
+        'label': 'GDP (current US$)',
+    },
+    'Debt Forecast': {
+        'model': 'Total_Debt_Liabilities',
+        'history': load_debt_history,
+        'steps': 12,
+        'freq': 'YE-JUN',
+        'label': 'Total Debt (PKR)',
+    },
+    # Trained with Dropout on seasonal differences (see seasonal_inputs), so it has an MC dropout band
+    'Service Exports Forecast': {
+        'model': 'service-exports',
+        'history': load_service_exports_history,
+        'steps': 36,
+        'freq': 'ME',
+        'label': 'Service Exports (USD)',
+        'seasonal_period': 12,
+    },
+}
+
+
+@st.cache_resource
+def get_model_registry():
+    """One registry per process; models load on first use, without importing TensorFlow"""
+    return ModelRegistry('models')
+
+
+@st.cache_resource
+def get_forecast_cache():
+    """Forecasts shared across sessions and kept on disk across restarts"""
+    return ForecastCache()
+
+
+@st.cache_resource
+def _open_timeseries_store(directory):
+    return TimeSeriesStore(directory)
+
+
+def get_timeseries_store():
+    """The current validated time-series store, opened once per published snapshot; None until it is built"""
+    try:
+        return _open_timeseries_store(store_directory())
+    except FileNotFoundError:
+        return None
+
+
+def series_id(store, source, name):
+    """Id of the series named exactly `name` in `source` ('Services Sector', not 'Growth Rate of Services Sector')"""
+    ids = [i for i in store.ids(source=source, name=name) if store.catalog.loc[i, 'name'] == name]
+    if not ids:
+        raise KeyError(f"No series {name!r} in {source}")
+    return ids[0]
+
+
+# Overview panels in subplot order: store source and series name, trace label, colour, scale, hover text
+OVERVIEW_SERIES = [
+    ('Pakistan_GDP.csv', 'GDP (current US$)', 'GDP', 'blue', 1e9,
+     "<b>GDP:</b> $%{y:.1f}B USD<br><b>Date:</b> %{x|%Y}<extra></extra>"),
+    ('Export_of_Goods_&_Services.csv', 'Exports of Goods & Services', 'Exports', 'green', 1,
+     "<b>Exports:</b> $%{y:,.0f}M USD<br><b>Date:</b> %{x|%B %Y}<extra></extra>"),
+    ('Total_Foreign_Investment.csv', 'FDI Outflow', 'Investment', 'purple', 1,
+     "<b>Investment:</b> $%{y:,.2f}M USD<br><b>Date:</b> %{x|%B %Y}<extra></extra>"),
+    ('Pakistan-CPI_Annual.csv', 'CPI Inflation', 'CPI', 'orange', 1,
+     "<b>CPI:</b> %{y:.2f}<br><b>Date:</b> %{x|%Y}<extra></extra>"),
+]
+
+
+# Real GDP views: radio label -> store frequency (fiscal years are summed from complete Jul-Jun quarters)
+GDP_FREQUENCIES = {'Quarterly': 'Q', 'Fiscal year': 'FY'}
+REAL_GDP_SERIES = {
+    'GDP': 'Gross Domestic Product (Total of Gross Value Addition at Constant Basic Prices(2015-16))',
+    'Agriculture': 'Agricultural Sector',
+    'Industry': 'Industrial Sector',
+    'Services': 'Services Sector',
+}
+
+
+# Monte Carlo dropout samples behind the 90% forecast band
+MC_SAMPLES = 200
+INTERVAL = (0.05, 0.95)
+
+
+def seasonal_inputs(lstm, series, steps, freq, period):
+    """
+    Scaled (diff_value, month, time_idx) history and future covariates of a
+    seasonally differenced model, as in the service exports notebook, and the
+    function taking its scaled forecasts (N, steps) back to levels.
+    """
+    features = seasonal_frame(series, period)
+    future = pd.date_range(start=series.index[-1], periods=steps + 1, freq=freq)[1:]
+    # The month and time index of every step are known; the rollout fills in diff_value
+    exog = lstm.transform(np.column_stack((np.zeros(steps), future.month, len(series) + np.arange(steps))))
+    last_season = series.values[-period:]
+    to_levels = lambda forecast: undo_seasonal_difference(lstm.inverse_transform(forecast, column=0), last_season)
+    return lstm.transform(features.values), exog, to_levels
+
+
+def live_forecast_figure(title, model, history, steps, freq, label, seasonal_period=None):
+    """Roll the NumPy LSTM forward from the latest data and plot it, with an MC dropout band, against history"""
+    registry = get_model_registry()
+    series = history()
+    key = forecast_key(registry.manifest(model)['content_hash'], series_hash(series.values, series.index), steps,
+                       {'mc_samples': MC_SAMPLES, 'interval': INTERVAL, 'seasonal_period': seasonal_period})
+
+    def compute():
+        lstm = registry.get(model)
+        look_back = lstm.input_shape[1]
+        if seasonal_period:
+            scaled, exog, to_values = seasonal_inputs(lstm, series, steps, freq, seasonal_period)
+        else:
+            scaled, exog = lstm.transform(series.values.reshape(-1, 1)), None
+            to_values = lambda forecast: lstm.inverse_transform(forecast.reshape(-1, 1)).reshape(forecast.shape)
+        forecast_scaled = recursive_forecast(lstm, scaled[-look_back:], steps, exog=exog)
+        result = {'forecast': to_values(forecast_scaled)[0]}
+        if lstm.has_dropout:
+            # Quantiles of the sampled paths in the series' own units
+            bands = mc_dropout_forecast(lstm, scaled[-look_back:], steps, MC_SAMPLES, INTERVAL, exog=exog,
+                                        transform=to_values)['quantiles']
+            result['lower'], result['upper'] = bands[0, 0], bands[1, 0]
+        return result
+
+    result = get_forecast_cache().get_or_compute(key, compute)
+    forecast_dates = pd.date_range(start=series.index[-1], periods=steps + 1, freq=freq)[1:]
+
+    fig = go.Figure()
+    if 'upper' in result:
+        fig.add_trace(go.Scatter(x=forecast_dates, y=result['upper'], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=forecast_dates, y=result['lower'], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor='rgba(255, 0, 0, 0.1)',
+                                 name=f"{INTERVAL[1] - INTERVAL[0]:.0%} MC Dropout Interval"))
+    fig.add_trace(go.Scatter(x=series.index, y=series.values, mode='lines+markers', name='Historical'))
+    fig.add_trace(go.Scatter(x=forecast_dates, y=result['forecast'], mode='lines+markers', name='LSTM Forecast',
+                             line=dict(dash='dash')))
+    fig.update_layout(title=title, xaxis_title='Date', yaxis_title=label, height=450)
+    return fig
+
 
 def show():
     # Custom CSS for better spacing
@@ -144,6 +319,37 @@ def show():
             except Exception as e:
                 st.error(f"Growth calculation error: {e}")
     
+        # Real GDP and its sectors by quarter or fiscal year, read from the store's precomputed levels
+        try:
+            store = get_timeseries_store()
+            if store is not None:
+                frequency = st.radio("Real GDP frequency", list(GDP_FREQUENCIES), horizontal=True)
+                ids = [series_id(store, 'GDP_Quarterly_With_Constant_Prices.csv', name)
+                       for name in REAL_GDP_SERIES.values()]
+                periods, block = store.get_series(ids, freq=GDP_FREQUENCIES[frequency])
+
+                fig_real = go.Figure()
+                for j, label in enumerate(REAL_GDP_SERIES):
+                    fig_real.add_trace(go.Scatter(
+                        x=periods, y=block[:, j] / 1e6,
+                        mode='lines+markers',
+                        name=label,
+                        hovertemplate=f"<b>{label}:</b> Rs. %{{y:,.2f}} Trillion PKR<br>" +
+                                      "<b>Period ending:</b> %{x|%b %Y}<br>" +
+                                      "<extra></extra>"
+                    ))
+                fig_real.update_layout(
+                    title=f"Real GDP by Sector ({frequency})<br><sub>Constant 2015-16 basic prices</sub>",
+                    xaxis_title="Period",
+                    yaxis_title="Trillion PKR",
+                    height=400,
+                    template="plotly_white"
+                )
+                st.plotly_chart(fig_real, use_container_width=True)
+        
+        except Exception as e:
+            st.error(f"Real GDP data error: {e}")
+    
         st.markdown("---")
     
         # GDP Composition Section
@@ -684,58 +890,38 @@ def show():
         # Combined Overview Dashboard
         st.subheader("Economic Overview Dashboard")
         try:
-            # Create a multi-indicator dashboard
-            fig_overview = make_subplots(
-                rows=2, cols=2,
-                subplot_titles=('GDP Trend', 'Trade Balance', 'Investment Flow', 'Inflation'),
-                specs=[[{"secondary_y": False}, {"secondary_y": False}],
-                       [{"secondary_y": False}, {"secondary_y": False}]]
-            )
-        
-            # GDP
-            gdp_data = pd.read_csv('datasets_cleaned/Economy/Pakistan_GDP.csv', parse_dates=['Date'])
-            fig_overview.add_trace(
-                go.Scatter(x=gdp_data['Date'], y=gdp_data['GDP (current US$)']/1e9, 
-                          name='GDP', line=dict(color='blue'),
-                          hovertemplate="<b>GDP:</b> $%{y:.1f}B USD<br><b>Date:</b> %{x|%Y}<extra></extra>"),
-                row=1, col=1
-            )
-        
-            # Exports
-            exports_data = pd.read_csv('datasets_cleaned/Economy/Export_of_Goods_&_Services.csv', parse_dates=['Date'])
-            fig_overview.add_trace(
-                go.Scatter(x=exports_data['Date'], y=exports_data['Value'], 
-                          name='Exports', line=dict(color='green'),
-                          hovertemplate="<b>Exports:</b> $%{y:,.0f}M USD<br><b>Date:</b> %{x|%B %Y}<extra></extra>"),
-                row=1, col=2
-            )
-        
-            # Investment
-            investment_data = pd.read_csv('datasets_cleaned/Economy/Total_Foreign_Investment.csv', parse_dates=['Date'])
-            fig_overview.add_trace(
-                go.Scatter(x=investment_data['Date'], y=investment_data['Value'], 
-                          name='Investment', line=dict(color='purple'),
-                          hovertemplate="<b>Investment:</b> $%{y:,.2f}M USD<br><b>Date:</b> %{x|%B %Y}<extra></extra>"),
-                row=2, col=1
-            )
-        
-            # CPI - Fixed column name
-            cpi_data = pd.read_csv('datasets_cleaned/Economy/Pakistan-CPI_Annual.csv', parse_dates=['Date'])
-            fig_overview.add_trace(
-                go.Scatter(x=cpi_data['Date'], y=cpi_data['CPI_Value'],  # Fixed: using correct column name
-                          name='CPI', line=dict(color='orange'),
-                          hovertemplate="<b>CPI:</b> %{y:.2f}<br><b>Date:</b> %{x|%Y}<extra></extra>"),
-                row=2, col=2
-            )
-        
-            fig_overview.update_layout(
-                height=600,
-                showlegend=False,
-                template="plotly_white",
-                title_text="Pakistan Economic Overview Dashboard"
-            )
-        
-            st.plotly_chart(fig_overview, use_container_width=True)
+            store = get_timeseries_store()
+            if store is None:
+                st.info("The overview reads the validated time-series store. "
+                        "Build it with `python -m utils.timeseries_store build`.")
+            else:
+                # One aligned lookup for all four series; each is NaN outside its own periods
+                ids = [series_id(store, source, name) for source, name, *_ in OVERVIEW_SERIES]
+                periods, block = store.get_series(ids)
+
+                # Create a multi-indicator dashboard
+                fig_overview = make_subplots(
+                    rows=2, cols=2,
+                    subplot_titles=('GDP Trend', 'Trade Balance', 'Investment Flow', 'Inflation'),
+                    specs=[[{"secondary_y": False}, {"secondary_y": False}],
+                           [{"secondary_y": False}, {"secondary_y": False}]]
+                )
+                for j, (_, _, label, color, scale, hovertemplate) in enumerate(OVERVIEW_SERIES):
+                    present = ~np.isnan(block[:, j])
+                    fig_overview.add_trace(
+                        go.Scatter(x=periods[present], y=block[present, j] / scale,
+                                   name=label, line=dict(color=color), hovertemplate=hovertemplate),
+                        row=j // 2 + 1, col=j % 2 + 1
+                    )
+
+                fig_overview.update_layout(
+                    height=600,
+                    showlegend=False,
+                    template="plotly_white",
+                    title_text="Pakistan Economic Overview Dashboard"
+                )
+
+                st.plotly_chart(fig_overview, use_container_width=True)
         
         except Exception as e:
             st.error(f"Overview dashboard error: {e}")
@@ -758,14 +944,15 @@ def show():
             try:
                 st.markdown(f"### 📈 {title}")
                 
-                # Check if file exists
-                if os.path.exists(filepath):
-                    # Read the JSON file
-                    with open(filepath, 'r') as f:
-                        fig_json = json.load(f)
-                    
-                    # Create Plotly figure from JSON
-                    fig = pio.from_json(json.dumps(fig_json))
+                # Prefer a forecast computed from the exported model weights
+                live = LIVE_FORECASTS.get(title)
+                if live and get_model_registry().has_numpy_runtime(live['model']):
+                    st.plotly_chart(live_forecast_figure(title, **live), use_container_width=True)
+                    version = get_model_registry().manifest(live['model'])['version']
+                    st.success(f"✅ {title} computed from model `{live['model']}` ({version})")
+                elif os.path.exists(filepath):
+                    # Parsed once per file version by the plot loader
+                    fig = load_figure(filepath)
                     
                     # Display the figure
                     st.plotly_chart(fig, use_container_width=True)
@@ -783,9 +970,31 @@ def show():
                 st.error(f"❌ Error loading {title}: {e}")
                 st.info(f"Please check if the file exists at: `{filepath}`")
         
+        # Forecast figures published from the analysis notebooks (python -m utils.notebook_loader publish)
+        if os.path.exists(NOTEBOOK_FIGURES):
+            with open(NOTEBOOK_FIGURES) as f:
+                notebook_figures = json.load(f)
+            if notebook_figures:
+                with st.expander("📓 Forecasts from the analysis notebooks"):
+                    name = st.selectbox(
+                        "Figure",
+                        list(notebook_figures),
+                        format_func=lambda n: f"{notebook_figures[n]['title']} "
+                                              f"({os.path.basename(notebook_figures[n]['notebook'])})"
+                    )
+                    st.plotly_chart(load_figure(notebook_figures[name]['path']), use_container_width=True)
+        
+        cache_stats = get_forecast_cache().stats()
+        st.caption(
+            f"Forecast cache: {cache_stats['memory_hits']} memory hits, {cache_stats['disk_hits']} disk hits, "
+            f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)"
+        )
+
         # Forecast Information
         with st.expander("ℹ️ About These Forecasts"):
-            st.markdown("""
+            titles = [f"**{title}**" for title in LIVE_FORECASTS]
+            live_titles = f"{', '.join(titles[:-1])} and {titles[-1]}" if len(titles) > 1 else titles[0]
+            st.markdown(f"""
             **Forecast Models:**
             
             These forecasts are generated using LSTM (Long Short-Term Memory) neural networks trained on historical economic data.
@@ -808,7 +1017,7 @@ def show():
             - Accuracy decreases with longer forecast horizons
             - Should be used as guidance, not absolute predictions
             
-            **Note**: If forecasts are not displaying, please run the respective Jupyter notebooks in the `notebooks/` directory to generate the forecast plots.
+            **Note**: {live_titles} are computed on the fly when their exported weights are present (`python -m utils.lstm_numpy export`); otherwise the saved plots are shown. If forecasts are not displaying, please run the respective Jupyter notebooks in the `notebooks/` directory to generate the forecast plots.
             """)
     
     # Footer
@@ -4,37 +4,116 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from utils.cohort_projection import SCENARIOS, CohortModel
+from utils.education_metrics import RATIO_LEVELS, build as build_education_metrics, load_metrics
+from utils.enrollment_cube import SCHOOL_STAGES, STAGE_CLASSES, EducationCube, build as build_enrollment_cube
+from utils.hdx_indicators import HDX_EDUCATION, load_indicators
+from utils.xlsx_ingest import ITAASER_SCHOOLS, load_table
+
+# ASER 2023 school survey codes used by the school view
+SCHOOL_COLUMNS = {
+    'RNAME': 'Region',
+    'DNAME': 'District',
+    'STYPE': 'School Type',
+    'S007E': 'Students Enrolled',
+    'S007P': 'Students Present',
+    'S008TA': 'Teachers Appointed',
+    'S008TP': 'Teachers Present',
+}
+SCHOOL_TYPES = {1: 'Government', 2: 'Private'}
+
 
 def show():
     st.title("🎓 Education Dashboard")
     st.markdown("*Comprehensive analysis of Pakistan's education system - Enrollments and Teachers*")
     
     # Create tabs for Enrollments and Teachers
-    tab1, tab2 = st.tabs(["📚 Student Enrollments", "👨‍🏫 Teachers"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📚 Student Enrollments", "👨‍🏫 Teachers", "📐 Pupil-Teacher Ratios",
+                                                  "🔮 Enrollment Projection", "🏫 Schools (ASER 2023)",
+                                                  "🔎 Indicators (HDX)"])
     
     with tab1:
         show_enrollment_analysis()
     
     with tab2:
         show_teacher_analysis()
+    
+    with tab3:
+        show_ratio_analysis()
+    
+    with tab4:
+        show_enrollment_projection()
+    
+    with tab5:
+        show_school_analysis()
+
+    with tab6:
+        show_indicator_explorer()
+
+
+@st.cache_data
+def load_school_survey():
+    """School-level ASER 2023 survey from the ingested Arrow table (the XLSX is never parsed here)"""
+    schools = load_table(ITAASER_SCHOOLS, columns=list(SCHOOL_COLUMNS)).rename(columns=SCHOOL_COLUMNS)
+    schools['School Type'] = schools['School Type'].map(SCHOOL_TYPES).fillna('Other')
+    return schools
+
+
+@st.cache_resource
+def get_enrollment_cube():
+    """Enrollment cube shared across sessions, rebuilt only when an enrollment file changes"""
+    return EducationCube.load(build_enrollment_cube())
+
+
+@st.cache_resource
+def get_cohort_model():
+    """Grade-progression model fitted once per enrollment cube; projections run per widget change"""
+    return CohortModel.fit(get_enrollment_cube())
+
+
+@st.cache_resource
+def get_education_metrics():
+    """Precomputed pupil-teacher and qualification metrics, recomputed only when a source file changes"""
+    return load_metrics(build_education_metrics())
+
+
+@st.cache_resource
+def get_indicator_index():
+    """Indicator index of the HDX education file, shared across sessions (the CSV is never read here)"""
+    return load_indicators(HDX_EDUCATION)
+
+
+def school_summary(schools, by):
+    """Schools, enrollment and attendance rates aggregated by the `by` columns"""
+    summary = schools.groupby(by).agg(
+        Schools=('Students Enrolled', 'size'),
+        Enrolled=('Students Enrolled', 'sum'),
+        Present=('Students Present', 'sum'),
+        Teachers=('Teachers Appointed', 'sum'),
+        Teachers_Present=('Teachers Present', 'sum'),
+    ).reset_index()
+    summary['Student Attendance %'] = 100 * summary['Present'] / summary['Enrolled']
+    summary['Teacher Attendance %'] = 100 * summary['Teachers_Present'] / summary['Teachers']
+    summary['Students per Teacher Present'] = summary['Present'] / summary['Teachers_Present']
+    return summary
 
 
 def show_enrollment_analysis():
     """Display enrollment visualizations"""
     st.subheader("Student Enrollment Analysis")
     
-    # Load enrollment data
-    enrollment_5yr = pd.read_csv('datasets_cleaned/Education/Enrollments/5_year_enrollment.csv')
-    enrollment_2024 = pd.read_csv('datasets_cleaned/Education/Enrollments/Total_enrollment_2023to2024.csv')
-    enrollment_classwise = pd.read_csv('datasets_cleaned/Education/Enrollments/Enrollment_Class_Wise.csv')
-    enrollment_10yr = pd.read_csv('datasets_cleaned/Education/Enrollments/Total_Enrollent(Public)_Ten_Years.csv')
+    # Every chart below is a slice of the enrollment cube
+    cube = get_enrollment_cube()
+    year = '2023-24'
+    provinces = cube.members('province')
     
-    # Key Metrics
-    total_students = enrollment_2024['TOTAL - Total'].sum()
-    total_boys = enrollment_2024['TOTAL - Boys'].sum()
-    total_girls = enrollment_2024['TOTAL - Girls'].sum()
-    urban_students = enrollment_2024['URBAN - Total'].sum()
-    rural_students = enrollment_2024['RURAL - Total'].sum()
+    # Key Metrics (schools and colleges: the stages broken down by province, area and gender)
+    schools = cube.slice(year=year, level=SCHOOL_STAGES, gender=['Boys', 'Girls'], area=['Urban', 'Rural'])
+    by_gender = schools.sum('level', 'area').to_series()
+    by_area = schools.sum('level', 'gender').to_series()
+    total_students = cube.slice(year=year, level=SCHOOL_STAGES).sum()
+    total_boys, total_girls = by_gender['Boys'], by_gender['Girls']
+    urban_students, rural_students = by_area['Urban'], by_area['Rural']
     
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
@@ -55,20 +134,18 @@ def show_enrollment_analysis():
     
     with col1:
         # Provincial enrollment distribution
-        province_data = enrollment_2024[enrollment_2024['Stage'] == 'Total'][['Province/Region', 'TOTAL - Total']]
-        province_data = province_data[province_data['Province/Region'] != 'Pakistan']
+        province_data = cube.slice(year=year, level=SCHOOL_STAGES, province=provinces).sum('level').to_series()
         
         fig_province = px.bar(
-            province_data,
-            x='Province/Region',
-            y='TOTAL - Total',
+            x=province_data.index,
+            y=province_data.values,
             title='Student Enrollment by Province/Region (2023-24)',
-            labels={'TOTAL - Total': 'Total Students', 'Province/Region': 'Province'},
-            color='TOTAL - Total',
+            labels={'x': 'Province', 'y': 'Total Students'},
+            color=province_data.values,
             color_continuous_scale='Greens'
         )
         fig_province.update_traces(
-            text=province_data['TOTAL - Total'].apply(lambda x: f'{x/1000000:.1f}M'),
+            text=[f'{x/1000000:.1f}M' for x in province_data.values],
             textposition='outside'
         )
         fig_province.update_layout(showlegend=False, height=400)
@@ -76,20 +153,20 @@ def show_enrollment_analysis():
     
     with col2:
         # Gender distribution by province
-        gender_data = enrollment_2024[enrollment_2024['Stage'] == 'Total'][['Province/Region', 'TOTAL - Boys', 'TOTAL - Girls']]
-        gender_data = gender_data[gender_data['Province/Region'] != 'Pakistan']
+        gender_data = cube.slice(year=year, level=SCHOOL_STAGES, province=provinces,
+                                 gender=['Boys', 'Girls']).sum('level').to_frame()
         
         fig_gender = go.Figure()
         fig_gender.add_trace(go.Bar(
             name='Boys',
-            x=gender_data['Province/Region'],
-            y=gender_data['TOTAL - Boys'],
+            x=gender_data.index,
+            y=gender_data['Boys'],
             marker_color='#0f4c3a'
         ))
         fig_gender.add_trace(go.Bar(
             name='Girls',
-            x=gender_data['Province/Region'],
-            y=gender_data['TOTAL - Girls'],
+            x=gender_data.index,
+            y=gender_data['Girls'],
             marker_color='#7ee5c7'
         ))
         fig_gender.update_layout(
@@ -106,14 +183,11 @@ def show_enrollment_analysis():
     
     with col1:
         # Stage-wise enrollment
-        stages = ['Pre Primary', 'Primary', 'Middle', 'High', 'Higher Secondary', 'Degree']
-        stage_data = enrollment_2024[enrollment_2024['Province/Region'] == 'Pakistan']
-        stage_data = stage_data[stage_data['Stage'].isin(stages)]
+        stage_data = cube.slice(year=year, level=SCHOOL_STAGES).to_series()
         
         fig_stage = px.pie(
-            stage_data,
-            values='TOTAL - Total',
-            names='Stage',
+            values=stage_data.values,
+            names=stage_data.index,
             title='Enrollment Distribution by Education Stage (2023-24)',
             hole=0.4,
             color_discrete_sequence=px.colors.sequential.Greens
@@ -123,20 +197,19 @@ def show_enrollment_analysis():
     
     with col2:
         # Urban vs Rural by stage
-        urban_rural_data = enrollment_2024[enrollment_2024['Province/Region'] == 'Pakistan']
-        urban_rural_data = urban_rural_data[urban_rural_data['Stage'].isin(stages)]
+        urban_rural_data = cube.slice(year=year, level=SCHOOL_STAGES, area=['Urban', 'Rural']).to_frame()
         
         fig_ur = go.Figure()
         fig_ur.add_trace(go.Bar(
             name='Urban',
-            x=urban_rural_data['Stage'],
-            y=urban_rural_data['URBAN - Total'],
+            x=urban_rural_data.index,
+            y=urban_rural_data['Urban'],
             marker_color='#2ea87e'
         ))
         fig_ur.add_trace(go.Bar(
             name='Rural',
-            x=urban_rural_data['Stage'],
-            y=urban_rural_data['RURAL - Total'],
+            x=urban_rural_data.index,
+            y=urban_rural_data['Rural'],
             marker_color='#0f4c3a'
         ))
         fig_ur.update_layout(
@@ -151,21 +224,17 @@ def show_enrollment_analysis():
     # Row 3: 5-Year Trends
     st.subheader("Enrollment Trends (2019-2024)")
     
-    # Prepare 5-year trend data
-    years = ['2019-20', '2020-21', '2021-22', '2022-23', '2023-24']
-    trend_stages = ['Primary', 'Middle', 'High', 'Higher Secondary/Inter Colleges', 'Universities']
-    trend_data = enrollment_5yr[enrollment_5yr['Stage'].isin(trend_stages) & (enrollment_5yr['Sector'] == 'Total')]
+    # Stage x year, keeping the years with published stage totals
+    trend_stages = ['Primary', 'Middle', 'High', 'Higher Secondary', 'Universities']
+    trend_data = cube.slice(level=trend_stages).to_frame().dropna(axis=1, how='all') / 1000000
     
     fig_trend = go.Figure()
     colors = ['#0f4c3a', '#1a7f5f', '#2ea87e', '#4fd1a8', '#7ee5c7']
     
     for idx, stage in enumerate(trend_stages):
-        stage_row = trend_data[trend_data['Stage'] == stage]
-        values = [stage_row[year].values[0] / 1000000 for year in years]
-        
         fig_trend.add_trace(go.Scatter(
-            x=years,
-            y=values,
+            x=trend_data.columns,
+            y=trend_data.loc[stage],
             mode='lines+markers',
             name=stage,
             line=dict(color=colors[idx], width=3),
@@ -186,13 +255,11 @@ def show_enrollment_analysis():
     
     with col1:
         # Sector distribution pie chart
-        sector_data = enrollment_5yr[enrollment_5yr['Stage'] == 'Total'][['Sector', '2023-24']]
-        sector_data = sector_data[sector_data['Sector'].isin(['Public', 'Private', 'Other Public'])]
+        sector_data = cube.slice(year=year, sector=['Public', 'Private', 'Other Public']).to_series()
         
         fig_sector = px.pie(
-            sector_data,
-            values='2023-24',
-            names='Sector',
+            values=sector_data.values,
+            names=sector_data.index,
             title='Enrollment by Sector (2023-24)',
             hole=0.4,
             color_discrete_sequence=['#0f4c3a', '#7ee5c7', '#2ea87e']
@@ -202,20 +269,19 @@ def show_enrollment_analysis():
     
     with col2:
         # Class-wise enrollment
-        class_data = enrollment_classwise[enrollment_classwise['Stage'] != 'Grand Total']
-        class_totals = class_data.groupby('Stage')['Total - Total'].sum().reset_index()
+        classes = [name for stage_classes in STAGE_CLASSES.values() for name in stage_classes]
+        class_totals = cube.slice(year=year, level=classes).to_series()
         
         fig_class = px.bar(
-            class_totals,
-            x='Stage',
-            y='Total - Total',
-            title='Total Enrollment by Stage (All Sectors)',
-            labels={'Total - Total': 'Total Students', 'Stage': 'Education Stage'},
-            color='Total - Total',
+            x=class_totals.index,
+            y=class_totals.values,
+            title='Total Enrollment by Class (All Sectors)',
+            labels={'x': 'Class', 'y': 'Total Students'},
+            color=class_totals.values,
             color_continuous_scale='Teal'
         )
         fig_class.update_traces(
-            text=class_totals['Total - Total'].apply(lambda x: f'{x/1000000:.1f}M'),
+            text=[f'{x/1000000:.1f}M' for x in class_totals.values],
             textposition='outside'
         )
         fig_class.update_layout(showlegend=False, height=400)
@@ -460,3 +526,365 @@ def show_teacher_analysis():
         st.write(f"• Urban Teachers: {urban_total:,}")
         st.write(f"• Rural Teachers: {rural_total:,}")
         st.write(f"• Rural Coverage: {(rural_total/total_teachers)*100:.1f}%")
+
+
+def show_ratio_analysis():
+    """Display pupil-teacher ratios, their growth and the teacher qualification mix"""
+    st.subheader("Pupil-Teacher Ratios")
+    st.markdown("*Teachers are counted by institution type and pupils by stage, and many primary pupils are "
+                "taught in middle and high schools, so ratios are shown for schools combined (pre-primary to "
+                "class 12) and for all levels rather than per stage*")
+    
+    metrics = get_education_metrics()
+    ratio = metrics['ratio']
+    year = ratio.axes['year'][-1]
+    provinces = ratio.members('province')
+    levels = list(RATIO_LEVELS)
+    
+    # Key Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Pupils per Teacher", f"{ratio.slice(year=year):.1f}", f"All levels, {year}")
+    with col2:
+        st.metric("Schools", f"{ratio.slice(year=year, level='Schools'):.1f}", "Pupils per teacher")
+    with col3:
+        st.metric("Public Schools", f"{ratio.slice(year=year, level='Schools', sector='Public'):.1f}",
+                  "Pupils per teacher")
+    with col4:
+        st.metric("Private Schools", f"{ratio.slice(year=year, level='Schools', sector='Private'):.1f}",
+                  "Pupils per teacher")
+    
+    st.markdown("---")
+    
+    # Row 1: Provinces and sectors
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        by_province = ratio.slice(year=year, level=levels, province=provinces).to_frame()
+        fig_province = px.bar(
+            by_province.reset_index().melt(id_vars='province', var_name='Levels', value_name='Pupils per Teacher'),
+            x='province',
+            y='Pupils per Teacher',
+            color='Levels',
+            barmode='group',
+            title=f'Pupils per Teacher by Province ({year})',
+            labels={'province': 'Province'},
+            color_discrete_sequence=['#0f4c3a', '#7ee5c7']
+        )
+        fig_province.update_layout(height=420)
+        st.plotly_chart(fig_province, use_container_width=True)
+    
+    with col2:
+        by_sector = ratio.slice(year=year, level=levels, sector=['Public', 'Other Public', 'Private']).to_frame()
+        fig_sector = px.bar(
+            by_sector.reset_index().melt(id_vars='level', var_name='Sector', value_name='Pupils per Teacher'),
+            x='level',
+            y='Pupils per Teacher',
+            color='Sector',
+            barmode='group',
+            title=f'Pupils per Teacher by Sector ({year})',
+            labels={'level': 'Levels'},
+            color_discrete_sequence=['#0f4c3a', '#2ea87e', '#7ee5c7']
+        )
+        fig_sector.update_layout(height=420)
+        st.plotly_chart(fig_sector, use_container_width=True)
+    
+    # Row 2: Trends and growth
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        trend = ratio.slice(level=levels).to_frame()
+        fig_trend = go.Figure()
+        colors = ['#0f4c3a', '#7ee5c7']
+        for idx, level in enumerate(trend.index):
+            fig_trend.add_trace(go.Scatter(
+                x=trend.columns,
+                y=trend.loc[level],
+                mode='lines+markers',
+                name=level,
+                line=dict(color=colors[idx], width=3)
+            ))
+        fig_trend.update_layout(
+            title='Pupils per Teacher (Pakistan)',
+            xaxis_title='Academic Year',
+            yaxis_title='Pupils per Teacher',
+            height=420,
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig_trend, use_container_width=True)
+    
+    with col2:
+        enrollment_growth = metrics['enrollment_growth'].slice(year=year, level=levels).to_series()
+        teacher_growth = metrics['teacher_growth'].slice(year=year, level=levels).to_series()
+        fig_growth = go.Figure()
+        fig_growth.add_trace(go.Bar(
+            name='Enrollment',
+            x=enrollment_growth.index,
+            y=enrollment_growth.values * 100,
+            marker_color='#0f4c3a'
+        ))
+        fig_growth.add_trace(go.Bar(
+            name='Teachers',
+            x=teacher_growth.index,
+            y=teacher_growth.values * 100,
+            marker_color='#7ee5c7'
+        ))
+        fig_growth.update_layout(
+            title=f'Enrollment vs Teacher Growth ({year}, % on previous year)',
+            barmode='group',
+            xaxis_title='Levels',
+            yaxis_title='Growth (%)',
+            height=420
+        )
+        st.plotly_chart(fig_growth, use_container_width=True)
+    
+    # Row 3: Qualification mix of public-sector teachers
+    st.subheader("Teacher Qualification Mix (Public Sector)")
+    col1, col2 = st.columns(2)
+    
+    for column, kind in zip((col1, col2), ('academic', 'professional')):
+        if f'{kind}_mix' not in metrics:
+            continue
+        mix = metrics[f'{kind}_mix']
+        institutions = [level for level in mix.members('level') if level in SCHOOL_STAGES]
+        shares = mix.slice(level=institutions, qualification=mix.members('qualification')).to_frame() * 100
+        with column:
+            fig_mix = px.bar(
+                shares.reset_index().melt(id_vars='level', var_name='Qualification', value_name='Share (%)'),
+                x='level',
+                y='Share (%)',
+                color='Qualification',
+                title=f'{kind.title()} Qualifications by Institution Type',
+                labels={'level': 'Institution Type'},
+                color_discrete_sequence=px.colors.sequential.Greens_r
+            )
+            fig_mix.update_layout(barmode='stack', height=450)
+            st.plotly_chart(fig_mix, use_container_width=True)
+
+
+def show_enrollment_projection():
+    """Project class-wise enrollment forward under a scenario chosen with widgets"""
+    st.subheader("Enrollment Projection (Grade Progression Model)")
+    st.markdown("*Pupils move up one class a year at the progression rates estimated from the class-wise "
+                "and ten-year enrollment data; the rest drop out or repeat*")
+    
+    model = get_cohort_model()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        scenario = st.selectbox("Scenario", list(SCENARIOS), key='projection_scenario')
+    preset = SCENARIOS[scenario]
+    baseline_intake = float(model.intake_growth.mean())
+    with col2:
+        years = st.slider("Years ahead", 5, 30, 10, key='projection_years')
+    with col3:
+        intake_growth = st.slider("Intake growth (% a year)", -5.0, 10.0,
+                                  round(100 * preset.get('intake_growth', baseline_intake), 1), 0.1,
+                                  key=f'projection_intake_{scenario}') / 100
+    with col4:
+        dropout_change = st.slider("Change in dropout (%)", -100, 100,
+                                   int(100 * preset.get('dropout_change', 0.0)), 5,
+                                   key=f'projection_dropout_{scenario}') / 100
+    
+    projected = model.project(years=years, intake_growth=intake_growth, dropout_change=dropout_change,
+                              progression=preset.get('progression'))
+    baseline = model.project(years=years)
+    stages = list(STAGE_CLASSES)
+    final_year = projected.axes['year'][-1]
+    
+    # Key Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        start, end = projected.slice(year=model.base_year), projected.slice(year=final_year)
+        st.metric(f"Enrollment {final_year}", f"{end/1000000:.1f}M", f"{(end/start - 1)*100:+.1f}% vs {model.base_year}")
+    with col2:
+        high = projected.slice(year=final_year, level='High')
+        st.metric(f"High Stage {final_year}", f"{high/1000000:.2f}M",
+                  f"{(high/baseline.slice(year=final_year, level='High') - 1)*100:+.1f}% vs baseline")
+    with col3:
+        girls = projected.slice(year=final_year, gender='Girls')
+        st.metric(f"Girls' Share {final_year}", f"{girls/end*100:.1f}%")
+    with col4:
+        private = projected.slice(year=final_year, sector='Private')
+        st.metric(f"Private Share {final_year}", f"{private/end*100:.1f}%")
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        by_stage = projected.slice(level=stages).to_frame() / 1000000
+        fig_stage = go.Figure()
+        colors = ['#0f4c3a', '#1a7f5f', '#2ea87e', '#4fd1a8', '#7ee5c7']
+        for idx, stage in enumerate(stages):
+            fig_stage.add_trace(go.Scatter(
+                x=by_stage.columns,
+                y=by_stage.loc[stage],
+                mode='lines',
+                name=stage,
+                line=dict(color=colors[idx], width=3)
+            ))
+        fig_stage.update_layout(
+            title=f'Projected Enrollment by Stage ({scenario})',
+            xaxis_title='Academic Year',
+            yaxis_title='Students (Millions)',
+            height=420,
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig_stage, use_container_width=True)
+    
+    with col2:
+        by_sector = projected.slice(sector=model.sectors).to_frame() / 1000000
+        fig_sector = go.Figure()
+        for idx, sector in enumerate(model.sectors):
+            fig_sector.add_trace(go.Scatter(
+                x=by_sector.columns,
+                y=by_sector.loc[sector],
+                mode='lines',
+                stackgroup='sector',
+                name=sector,
+                line=dict(color=['#0f4c3a', '#2ea87e', '#7ee5c7'][idx])
+            ))
+        fig_sector.update_layout(
+            title='Projected Enrollment by Sector',
+            xaxis_title='Academic Year',
+            yaxis_title='Students (Millions)',
+            height=420,
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig_sector, use_container_width=True)
+    
+    # Estimated rates behind the projection, boys and girls weighted by their base-year enrollment
+    dropout = model.rates().sel(sector=model.sectors, rate='Dropout')
+    weights = model.base[..., :-1]
+    weighted = (dropout.values * weights).sum(axis=1) / weights.sum(axis=1)
+    by_grade = pd.DataFrame(weighted.T * 100, index=dropout.axes['level'], columns=model.sectors)
+    fig_rates = px.line(
+        by_grade.reset_index().melt(id_vars='index', var_name='Sector', value_name='Dropout (%)'),
+        x='index',
+        y='Dropout (%)',
+        color='Sector',
+        markers=True,
+        title='Estimated Dropout After Each Class (2023-24 rates)',
+        labels={'index': 'Class'},
+        color_discrete_sequence=['#0f4c3a', '#2ea87e', '#7ee5c7']
+    )
+    fig_rates.update_layout(height=400)
+    st.plotly_chart(fig_rates, use_container_width=True)
+
+
+def show_school_analysis():
+    """Display school-level visualizations from the ASER 2023 school survey"""
+    st.subheader("School-Level Survey (ITA ASER 2023)")
+    
+    try:
+        schools = load_school_survey()
+    except FileNotFoundError:
+        st.info("The ASER school survey has not been ingested yet. Run `python -m utils.xlsx_ingest` once to convert it.")
+        return
+    
+    # Key Metrics
+    overall = school_summary(schools.assign(All='All'), 'All').iloc[0]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Schools Surveyed", f"{int(overall['Schools']):,}", f"{schools['District'].nunique()} districts")
+    with col2:
+        st.metric("Students Enrolled", f"{int(overall['Enrolled']):,}")
+    with col3:
+        st.metric("Student Attendance", f"{overall['Student Attendance %']:.1f}%", "On survey day")
+    with col4:
+        st.metric("Teacher Attendance", f"{overall['Teacher Attendance %']:.1f}%", "On survey day")
+    
+    st.markdown("---")
+    
+    by_region = school_summary(schools, ['Region', 'School Type'])
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_attendance = px.bar(
+            by_region,
+            x='Region',
+            y='Student Attendance %',
+            color='School Type',
+            barmode='group',
+            title='Student Attendance by Region and School Type',
+            color_discrete_sequence=['#0f4c3a', '#7ee5c7']
+        )
+        fig_attendance.update_layout(height=400)
+        st.plotly_chart(fig_attendance, use_container_width=True)
+    
+    with col2:
+        fig_ratio = px.bar(
+            by_region,
+            x='Region',
+            y='Students per Teacher Present',
+            color='School Type',
+            barmode='group',
+            title='Students per Teacher Present by Region',
+            color_discrete_sequence=['#0f4c3a', '#7ee5c7']
+        )
+        fig_ratio.update_layout(height=400)
+        st.plotly_chart(fig_ratio, use_container_width=True)
+    
+    # District drill-down
+    region = st.selectbox("Region", sorted(schools['Region'].dropna().unique()), key='aser_region')
+    districts = school_summary(schools[schools['Region'] == region], ['District'])
+    fig_districts = px.scatter(
+        districts,
+        x='Student Attendance %',
+        y='Teacher Attendance %',
+        size='Enrolled',
+        hover_name='District',
+        title=f'District Attendance in {region.title()} (bubble size = enrollment)',
+        color_discrete_sequence=['#1a7f5f']
+    )
+    fig_districts.update_layout(height=450)
+    st.plotly_chart(fig_districts, use_container_width=True)
+    st.dataframe(districts.round(1), use_container_width=True, hide_index=True)
+
+
+def show_indicator_explorer():
+    """Browse and plot any indicator of the HDX education-indicators file"""
+    st.subheader("Education Indicators Explorer (World Bank / HDX)")
+    
+    try:
+        index = get_indicator_index()
+    except FileNotFoundError:
+        st.info("The HDX education indicators have not been ingested yet. Run `python -m utils.hdx_indicators` once to index them.")
+        return
+    
+    catalog = index.catalog()
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        source = st.selectbox("Source", ['All'] + sorted(catalog['Source'].unique()), key='hdx_source')
+    with col2:
+        search = st.text_input("Search indicators", key='hdx_search', placeholder="e.g. enrolment, literacy, female")
+    
+    if source != 'All':
+        catalog = catalog[catalog['Source'] == source]
+    if search:
+        catalog = catalog[catalog['Indicator Name'].str.contains(search, case=False, regex=False)
+                          | catalog['Indicator Code'].str.contains(search, case=False, regex=False)]
+    st.caption(f"{len(catalog):,} of {len(index):,} indicators")
+    
+    codes = st.multiselect(
+        "Indicators to plot",
+        catalog['Indicator Code'].tolist(),
+        default=catalog['Indicator Code'].tolist()[:1],
+        format_func=lambda code: f"{index.name(code)} ({code})",
+        key='hdx_codes'
+    )
+    if codes:
+        frame = index.frame(codes).rename(columns=index.name)
+        fig = px.line(
+            frame.reset_index(),
+            x='Year',
+            y=list(frame.columns),
+            markers=True,
+            title='Selected Education Indicators',
+            color_discrete_sequence=['#0f4c3a', '#1a7f5f', '#2d9f7f', '#4dbf9f', '#7ee5c7']
+        )
+        fig.update_layout(height=450, legend_title_text='', yaxis_title='Value')
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(catalog, use_container_width=True, hide_index=True)
@@ -0,0 +1,48 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+pytest.importorskip('statsmodels')
+
+from utils.arima_forecaster import ArimaForecaster
+
+
+def _series(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 1, n)
+    values = np.empty(n)
+    values[0] = 10.0
+    for t in range(1, n):
+        values[t] = 10.0 + 0.6 * (values[t - 1] - 10.0) + noise[t]
+    return values
+
+
+def test_save_and_load_reproduce_the_forecast(tmp_path):
+    values = _series()
+    forecaster = ArimaForecaster.fit(values[:50], '2020-01-01', order=(1, 0, 0))
+    forecaster.save('demo', str(tmp_path))
+
+    loaded = ArimaForecaster.load('demo', str(tmp_path))
+    assert loaded.order == (1, 0, 0)
+    assert loaded.state == forecaster.state
+    for expected, actual in zip(forecaster.forecast(5), loaded.forecast(5)):
+        np.testing.assert_allclose(actual, expected, rtol=1e-8)
+    # Nothing is pickled: the store holds only .npz and .json files
+    assert all(path.suffix in ('.npz', '.json', '') for path in tmp_path.rglob('*') if path.is_file())
+
+
+def test_extend_then_reload(tmp_path):
+    values = _series()
+    forecaster = ArimaForecaster.fit(values[:50], '2020-01-01', order=(1, 0, 0))
+    z = forecaster.extend(values[50:], '2020-11-01')
+    forecaster.save('demo', str(tmp_path))
+
+    assert z.shape == (10,)
+    assert forecaster.state['n_obs'] == 60
+    loaded = ArimaForecaster.load('demo', str(tmp_path))
+    np.testing.assert_array_equal(loaded.values, values)
+    np.testing.assert_allclose(loaded.forecast(3)[0], forecaster.forecast(3)[0], rtol=1e-8)
+
+
+def test_missing_forecaster(tmp_path):
+    assert ArimaForecaster.load('demo', str(tmp_path)) is None
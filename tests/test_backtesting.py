@@ -0,0 +1,29 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+from utils.backtesting import error_metrics
+
+
+def test_error_metrics_over_folds_and_horizon():
+    actual = np.array([[1.0, 2.0], [4.0, 0.0]])
+    predicted = np.array([[2.0, 2.0], [2.0, 1.0]])
+
+    metrics = error_metrics(actual, predicted)
+
+    assert metrics['rmse'] == pytest.approx(np.sqrt(6 / 4))
+    assert metrics['mae'] == pytest.approx(1.0)
+    # The zero actual is left out of MAPE
+    assert metrics['mape'] == pytest.approx(100 * (1.0 + 0.0 + 0.5) / 3)
+
+
+def test_error_metrics_broadcast_over_models():
+    actual = np.arange(1.0, 7.0).reshape(2, 3)
+    predicted = np.stack([actual, actual + 1, actual - 2])
+
+    metrics = error_metrics(actual, predicted)
+
+    np.testing.assert_allclose(metrics['rmse'], [0.0, 1.0, 2.0])
+    np.testing.assert_allclose(metrics['mae'], [0.0, 1.0, 2.0])
+    assert metrics['mape'].shape == (3,)
@@ -0,0 +1,55 @@
+import math
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+from utils.cohort_projection import GRADES, CohortModel, academic_year, annual_growth, cohort_progression
+from utils.enrollment_cube import TOTAL
+
+
+def _model(progression):
+    base = np.arange(1.0, len(GRADES) + 1).reshape(1, 1, -1)
+    rates = np.full((1, 1, len(GRADES) - 1), progression)
+    return CohortModel(base, rates, np.zeros((1, 1)), sectors=['Public'], genders=['Boys'])
+
+
+def test_academic_year():
+    assert academic_year('2023-24') == '2024-25'
+    assert academic_year('1999-00', 3) == '2002-03'
+
+
+def test_cohort_progression_and_intake_growth():
+    # Two grades over three years; the second grade is unpublished in the last year
+    panel = np.array([[100.0, 110.0, 120.0],
+                      [90.0, 95.0, np.nan]])
+    np.testing.assert_allclose(cohort_progression(panel), [95.0 / 100.0])
+    assert math.isnan(cohort_progression(np.full((2, 2), np.nan))[0])
+
+    assert annual_growth(np.array([100.0, np.nan, 121.0])) == pytest.approx(0.1)
+    assert annual_growth(np.array([np.nan, 50.0])) == 0.0
+
+
+def test_full_progression_shifts_every_cohort_up_a_grade():
+    projected = _model(1.0).project(years=3, intake_growth=0.0)
+
+    assert projected.axes['year'] == ['2023-24', '2024-25', '2025-26', '2026-27']
+    assert projected.axes['sector'] == ['Public', TOTAL]
+    grades = projected.sel(sector='Public', gender='Boys', level=GRADES, year='2026-27').values
+    np.testing.assert_allclose(grades, [1.0, 1.0, 1.0] + list(range(1, 12)))
+    primary = projected.slice(level='Primary', year='2026-27')
+    assert primary == sum(grades[GRADES.index(f'Class {n}')] for n in range(1, 6))
+
+
+def test_dropout_scenario():
+    model = _model(0.8)
+    model.progression[..., 0] = 1.2  # more enter Kachi directly than leave Unadmitted
+
+    matrices = model.transition_matrices(dropout_change=-0.5)
+
+    assert matrices[0, 0, 1, 0] == pytest.approx(1.2)
+    assert matrices[0, 0, 2, 1] == pytest.approx(0.9)
+    assert model.dropout[0, 0, 0] == 0.0
+    baseline = model.project(years=5).slice(level=TOTAL, year='2028-29')
+    assert model.project(years=5, dropout_change=-0.5).slice(level=TOTAL, year='2028-29') > baseline
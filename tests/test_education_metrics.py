@@ -0,0 +1,44 @@
+import math
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+from utils.education_metrics import compute, growth, ratio
+from utils.enrollment_cube import AXES, TOTAL, EducationCube
+
+YEARS = ['2022-23', '2023-24']
+CELL = {'province': 'Punjab', 'sector': 'Public'}
+
+
+def _cube(levels):
+    """A Punjab public-sector cube at gender and area Total from {level: [value per year]}"""
+    axes = dict(zip(AXES, [['Punjab'], list(levels), ['Public'], [TOTAL], [TOTAL], YEARS]))
+    values = np.array(list(levels.values()), dtype=float).reshape(1, len(levels), 1, 1, 1, len(YEARS))
+    return EducationCube(values, axes)
+
+
+def test_ratio_and_growth():
+    assert math.isnan(ratio(np.array([5.0]), np.array([0.0]))[0])
+    change = growth(np.array([[100.0, 110.0, 99.0]]))
+    assert math.isnan(change[0, 0])
+    np.testing.assert_allclose(change[0, 1:], [0.1, -0.1])
+
+
+def test_ratios_are_taken_over_level_groups(tmp_path):
+    enrollment = _cube({'Primary': [100, 110], 'Middle': [50, 60], 'Degree': [10, 10], TOTAL: [160, 180]})
+    # Teachers have a level enrollment does not publish, and no level Total
+    teachers = _cube({'Primary': [5, 5], 'Middle': [5, 5], 'Degree': [1, 2], 'Education Foundations': [3, 3]})
+
+    metrics = compute(enrollment, teachers, qualifications={'none': (str(tmp_path / 'missing.csv'), 'Level')})
+
+    pupils = metrics['enrollment']
+    assert pupils.members('level', total=True) == ['Schools', TOTAL]
+    assert pupils.slice(**CELL, level='Schools', year='2023-24') == 170
+    assert metrics['teachers'].slice(**CELL, level=TOTAL, year='2023-24') == 12
+    assert metrics['ratio'].slice(**CELL, level='Schools').to_series().tolist() == [15.0, 17.0]
+    assert metrics['ratio'].slice(**CELL, level=TOTAL, year='2023-24') == pytest.approx(15.0)
+    assert metrics['enrollment_growth'].slice(**CELL, level='Schools', year='2023-24') == pytest.approx(170 / 150 - 1)
+    assert math.isnan(metrics['teacher_growth'].slice(**CELL, level='Schools', year='2022-23'))
+    assert 'none_mix' not in metrics
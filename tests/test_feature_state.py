@@ -0,0 +1,59 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from utils.feature_state import FeatureState, feature_frame, reference_features, seasonal_frame, verify
+
+
+def _monthly(n=60, seed=0):
+    """Trend, yearly season and noise around a level of a few thousand"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    values = 3000 + 25 * t + 400 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 50, n)
+    return pd.Series(values, index=pd.date_range('2015-07-01', periods=n, freq='MS'))
+
+
+def test_feature_frame_matches_the_pandas_reference():
+    series = _monthly()
+    expected = reference_features(series)
+    actual = feature_frame(series)
+
+    assert list(actual.columns) == list(expected.columns)
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-9)
+    assert verify(series, atol=1e-9) <= 1e-9
+
+
+def test_incremental_rollout_matches_the_pandas_reference():
+    series = _monthly()
+    expected = reference_features(series).to_numpy()
+
+    state = FeatureState.from_series(series.iloc[:24])
+    # Later observations arrive without dates, as forecasts do; the calendar advances a month each
+    rows = [state.append(value) for value in series.values[24:]]
+    np.testing.assert_allclose(np.array(rows), expected[24:], rtol=0, atol=1e-9)
+
+    batched = FeatureState.from_series(series.iloc[:24]).copy(batch=3)
+    for value, row in zip(series.values[24:], expected[24:]):
+        features = batched.append(np.full(3, value))
+        assert features.shape == (3, len(row))
+        np.testing.assert_allclose(features, np.tile(row, (3, 1)), rtol=0, atol=1e-9)
+
+
+def test_verify_rejects_a_wrong_nan_pattern(monkeypatch):
+    series = _monthly(30)
+    monkeypatch.setattr('utils.feature_state.feature_frame', lambda s: reference_features(s).fillna(0.0))
+
+    with pytest.raises(AssertionError):
+        verify(series)
+
+
+def test_seasonal_frame():
+    series = _monthly(30)
+    frame = seasonal_frame(series, period=12)
+
+    assert len(frame) == 18
+    assert frame.index[0] == series.index[12]
+    np.testing.assert_allclose(frame['diff_value'], series.values[12:] - series.values[:-12])
+    assert frame['month'].iloc[0] == series.index[12].month
+    assert frame['time_idx'].iloc[0] == 12
@@ -0,0 +1,54 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from utils.forecast_cache import ForecastCache, forecast_key, series_hash
+
+
+def test_key_depends_on_every_input():
+    values = np.arange(12.0)
+    key = forecast_key('model', series_hash(values), 6, {'dropout': 0.1})
+
+    assert key == forecast_key('model', series_hash(values.copy()), 6, {'dropout': 0.1})
+    assert key != forecast_key('other', series_hash(values), 6, {'dropout': 0.1})
+    assert key != forecast_key('model', series_hash(values + 1), 6, {'dropout': 0.1})
+    assert key != forecast_key('model', series_hash(values), 12, {'dropout': 0.1})
+    assert key != forecast_key('model', series_hash(values), 6, {'dropout': 0.2})
+
+
+def test_forecasts_survive_a_restart(tmp_path):
+    key = forecast_key('model', series_hash(np.arange(12.0)), 3)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'point': np.array([1.0, 2.0, 3.0])}
+
+    cache = ForecastCache(str(tmp_path))
+    first = cache.get_or_compute(key, compute)
+    second = cache.get_or_compute(key, compute)
+    assert calls == [1]
+    assert cache.stats()['memory_hits'] == 1
+    np.testing.assert_array_equal(first['point'], second['point'])
+
+    restarted = ForecastCache(str(tmp_path))
+    np.testing.assert_array_equal(restarted.get_or_compute(key, compute)['point'], [1.0, 2.0, 3.0])
+    assert calls == [1]
+    assert restarted.stats()['disk_hits'] == 1
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ForecastCache(str(tmp_path))
+    (tmp_path / 'broken.npz').write_bytes(b'not an archive')
+
+    assert cache.get('broken') is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_memory_tier_is_bounded():
+    cache = ForecastCache(None, max_entries=2)
+    for key in 'abc':
+        cache.put(key, {'point': np.zeros(1)})
+
+    assert cache.stats()['entries'] == 2
+    assert cache.get('a') is None
@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+
+from utils.hdx_indicators import HDX_EDUCATION, LAYOUT_VERSION, ingest, load_indicators
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_ingested_file_loads(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    manifest = ingest(HDX_EDUCATION, str(tmp_path))
+    index = load_indicators(HDX_EDUCATION, str(tmp_path))
+
+    assert len(index) == manifest['indicators']
+    assert 'BAR.NOED.1519.FE.ZS' in index
+    years, values = index.series('BAR.NOED.1519.FE.ZS')
+    assert list(years) == sorted(years)
+    assert values[list(years).index(2010)] == pytest.approx(35.46)
+    assert np.isin(index.catalog()['Indicator Code'], index.codes).all()
+
+
+def test_ingest_redoes_an_older_layout(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    manifest = ingest(HDX_EDUCATION, str(tmp_path))
+    manifest_path = tmp_path / manifest['content_hash'] / 'manifest.json'
+    manifest_path.write_text(json.dumps(dict(manifest, layout_version=1)))
+
+    assert ingest(HDX_EDUCATION, str(tmp_path))['layout_version'] == LAYOUT_VERSION
+    assert len(load_indicators(HDX_EDUCATION, str(tmp_path))) == manifest['indicators']
@@ -0,0 +1,59 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+joblib = pytest.importorskip('joblib')
+preprocessing = pytest.importorskip('sklearn.preprocessing')
+tf = pytest.importorskip('tensorflow')
+
+from utils.lstm_numpy import NumpyModel, check_parity, export_model
+
+LOOK_BACK, N_FEATURES = 6, 2
+
+
+@pytest.fixture
+def exported(tmp_path):
+    """A small untrained LSTM+Dense model and a MinMaxScaler, saved and exported"""
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+
+    tf.keras.utils.set_random_seed(0)
+    model = Sequential([
+        Input(shape=(LOOK_BACK, N_FEATURES)),
+        LSTM(8, return_sequences=True),
+        Dropout(0.2),
+        LSTM(4),
+        Dense(1),
+    ])
+    model_path = str(tmp_path / 'model.keras')
+    model.save(model_path)
+
+    data = np.random.default_rng(0).normal([1000.0, 50.0], [200.0, 5.0], size=(40, N_FEATURES))
+    scaler = preprocessing.MinMaxScaler().fit(data)
+    scaler_path = str(tmp_path / 'scaler.joblib')
+    joblib.dump(scaler, scaler_path)
+
+    npz_path = export_model(model_path, scaler_path)
+    return model, scaler, data, model_path, npz_path
+
+
+def test_predict_matches_keras(exported):
+    model, _, _, model_path, npz_path = exported
+    numpy_model = NumpyModel.load(npz_path)
+    x = np.random.default_rng(1).random((16, LOOK_BACK, N_FEATURES), dtype=np.float32)
+
+    assert numpy_model.input_shape == (None, LOOK_BACK, N_FEATURES)
+    assert numpy_model.has_dropout
+    np.testing.assert_allclose(numpy_model.predict(x), model.predict(x, verbose=0), atol=1e-5)
+    assert check_parity(model_path, npz_path)['passed']
+
+
+def test_scaler_round_trip(exported):
+    _, scaler, data, _, npz_path = exported
+    numpy_model = NumpyModel.load(npz_path)
+    scaled = scaler.transform(data)
+
+    np.testing.assert_allclose(numpy_model.transform(data), scaled)
+    np.testing.assert_allclose(numpy_model.inverse_transform(scaled), data)
+    # One feature on its own, as the forecasts of a multivariate model's target come back
+    np.testing.assert_allclose(numpy_model.inverse_transform(scaled[:, 1], column=1), data[:, 1])
+    np.testing.assert_allclose(numpy_model.inverse_transform(scaled[:, 0], column=0), data[:, 0])
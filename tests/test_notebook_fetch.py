@@ -0,0 +1,85 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+requests = pytest.importorskip('requests')
+
+from utils.notebook_loader import fetch_notebook
+
+BODY = b'{"cells": [], "metadata": {}, "nbformat": 4, "nbformat_minor": 5}'
+ETAG = '"v1"'
+
+
+class NotebookHandler(BaseHTTPRequestHandler):
+    """Serves BODY with an ETag and answers a matching If-None-Match with 304"""
+
+    always_not_modified = False
+    seen = []
+
+    def do_GET(self):
+        self.seen.append(self.headers.get('If-None-Match'))
+        if self.always_not_modified or self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    NotebookHandler.always_not_modified = False
+    NotebookHandler.seen = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), NotebookHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/analysis.ipynb"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_then_not_modified(server, tmp_path):
+    local_path = str(tmp_path / 'analysis.ipynb')
+    state = {}
+
+    assert fetch_notebook(server, local_path, requests.Session(), state) == 'downloaded'
+    assert open(local_path, 'rb').read() == BODY
+    assert state[server]['etag'] == ETAG
+
+    assert fetch_notebook(server, local_path, requests.Session(), state) == 'not-modified'
+    assert NotebookHandler.seen == [None, ETAG]
+    assert open(local_path, 'rb').read() == BODY
+
+
+def test_missing_or_changed_cache_is_downloaded_again(server, tmp_path):
+    local_path = tmp_path / 'analysis.ipynb'
+    state = {}
+    fetch_notebook(server, str(local_path), requests.Session(), state)
+
+    local_path.unlink()
+    assert fetch_notebook(server, str(local_path), requests.Session(), state) == 'downloaded'
+    local_path.write_bytes(b'edited locally')
+    assert fetch_notebook(server, str(local_path), requests.Session(), state) == 'downloaded'
+
+    assert NotebookHandler.seen == [None, None, None]
+    assert local_path.read_bytes() == BODY
+
+
+def test_unconditional_not_modified_is_an_error(server, tmp_path):
+    NotebookHandler.always_not_modified = True
+    local_path = tmp_path / 'analysis.ipynb'
+    state = {}
+
+    with pytest.raises(requests.HTTPError):
+        fetch_notebook(server, str(local_path), requests.Session(), state)
+    assert not local_path.exists()
+    assert state == {}
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+pytest.importorskip('requests')
+
+from utils.notebook_loader import build_notebook_index
+
+
+def _cell(cell_type, source, cell_id=None, outputs=None):
+    cell = {'cell_type': cell_type, 'source': source, 'metadata': {}}
+    if cell_id:
+        cell['id'] = cell_id
+    if cell_type == 'code':
+        cell['outputs'] = outputs or []
+    return cell
+
+
+def test_cells_without_or_with_repeated_ids_are_kept():
+    notebook = {'cells': [
+        _cell('markdown', '# Title', 'intro'),
+        _cell('code', 'a = 1', 'step', [{'output_type': 'stream', 'text': '1'}]),
+        _cell('code', 'b = 2', 'step', [{'output_type': 'stream', 'text': '2'}]),
+        _cell('code', 'c = 3'),
+    ]}
+
+    cells = build_notebook_index(notebook)['cells']
+
+    assert [cell['id'] for cell in cells] == ['intro', 'step', 'cell-2', 'cell-3']
+    assert [cell['position'] for cell in cells] == [0, 1, 2, 3]
+    assert [cell['source'] for cell in cells if cell['cell_type'] == 'code'] == ['a = 1', 'b = 2', 'c = 3']
+    assert cells[2]['outputs'][0]['text'] == '2'
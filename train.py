@@ -0,0 +1,5 @@
+"""Retrain the economy forecasting models: python train.py [model ...] [--workers N]"""
+from utils.training import main
+
+if __name__ == '__main__':
+    main()
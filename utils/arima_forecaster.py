@@ -0,0 +1,209 @@
+"""ARIMA forecasts that are refreshed incrementally as new observations arrive.
+
+The ARIMA order is chosen once with ``auto_arima`` (stepwise, as in
+GDP-prediction.py) and fitted with statsmodels. Each model is a versioned
+artifact in an ArtifactStore under ``models/arima/``: the history it was fitted
+on as ``.npz`` and, as the version's JSON metadata, its order, parameters, last
+date and drift statistics. Nothing is pickled; loading filters the history
+once with the saved parameters, which rebuilds the fitted state without
+re-estimating anything. New observations are folded in with the state-space
+``extend``, which filters only the new points with the existing parameters.
+The full order search runs again only when it is due (``research_every``
+updates or ``max_age_days``) or when the one-step-ahead errors of the new
+points show drift.
+
+The backtests (utils.backtesting) evaluate the same ``ArimaForecaster.fit``.
+"""
+import argparse
+import datetime
+import os
+import warnings
+
+import numpy as np
+
+from utils.artifact_store import ArtifactStore
+
+MODELS_DIR = 'models/arima'
+
+RESEARCH_EVERY = 8          # updates between scheduled order searches
+MAX_AGE_DAYS = 365          # or this long since the last search
+DRIFT_Z = 3.0               # one new point this many std errors off the forecast
+DRIFT_MEAN_SQUARED_Z = 4.0  # or the updates since the search averaging 2 std errors
+
+
+def search_order(values, seasonal=False):
+    """Best non-seasonal (p, d, q) by stepwise auto_arima"""
+    from pmdarima import auto_arima
+
+    model = auto_arima(values, seasonal=seasonal, stepwise=True, error_action='ignore', suppress_warnings=True)
+    return tuple(int(v) for v in model.order)
+
+
+def fit_arima(values, order):
+    """statsmodels ARIMA results for `values`, with convergence warnings silenced"""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore')
+        return ARIMA(np.asarray(values, dtype=np.float64), order=order).fit()
+
+
+def filter_arima(values, order, params):
+    """statsmodels ARIMA results for `values` at fixed `params` ({name: value}), without estimation"""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    model = ARIMA(np.asarray(values, dtype=np.float64), order=order)
+    return model.filter(np.array([params[name] for name in model.param_names]), cov_type='none')
+
+
+class ArimaForecaster:
+    """A fitted ARIMA plus the bookkeeping needed to refresh it cheaply"""
+
+    def __init__(self, results, state, values):
+        self.results = results
+        self.state = state
+        self.values = values  # full history; the results of an extend hold only the new points
+
+    @classmethod
+    def fit(cls, values, last_date=None, order=None):
+        """Search the order (unless given) and fit on the full history"""
+        values = np.asarray(values, dtype=np.float64)
+        order = tuple(order) if order else search_order(values)
+        results = fit_arima(values, order)
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        state = {
+            'order': list(order),
+            'params': {name: float(value) for name, value in zip(results.model.param_names, results.params)},
+            'n_obs': int(len(values)),
+            'last_date': None if last_date is None else str(last_date)[:10],
+            'searched_at': now,
+            'updated_at': now,
+            'updates_since_search': 0,
+            'sum_squared_z': 0.0,
+            'new_obs_since_search': 0,
+        }
+        return cls(results, state, values)
+
+    @property
+    def order(self):
+        return tuple(self.state['order'])
+
+    def forecast(self, steps, alpha=0.05):
+        """Point forecast and (1 - alpha) interval, each of shape (steps,)"""
+        prediction = self.results.get_forecast(steps=steps)
+        interval = np.asarray(prediction.conf_int(alpha=alpha))
+        return np.asarray(prediction.predicted_mean), interval[:, 0], interval[:, 1]
+
+    def standardized_errors(self, n):
+        """
+        One-step-ahead errors of the last `n` filtered observations over their
+        std errors, as the Kalman filter computed them while extending
+        """
+        filtered = self.results.filter_results
+        errors = np.asarray(filtered.forecasts_error)[0, -n:]
+        se = np.sqrt(np.asarray(filtered.forecasts_error_cov)[0, 0, -n:])
+        return errors / np.where(se > 0, se, 1.0)
+
+    def extend(self, new_values, last_date):
+        """Fold new observations into the state with the existing parameters; returns their z-scores"""
+        new_values = np.asarray(new_values, dtype=np.float64)
+        self.results = self.results.extend(new_values)
+        self.values = np.concatenate([self.values, new_values])
+        z = self.standardized_errors(len(new_values))
+        self.state.update(
+            n_obs=self.state['n_obs'] + len(new_values),
+            last_date=str(last_date)[:10],
+            updated_at=datetime.datetime.now().isoformat(timespec='seconds'),
+            updates_since_search=self.state['updates_since_search'] + 1,
+            sum_squared_z=self.state['sum_squared_z'] + float(np.sum(z ** 2)),
+            new_obs_since_search=self.state['new_obs_since_search'] + len(new_values),
+        )
+        return z
+
+    def research_reason(self, z=None, research_every=RESEARCH_EVERY, max_age_days=MAX_AGE_DAYS):
+        """Why a full order search is due now, or None"""
+        if z is not None and len(z) and np.max(np.abs(z)) > DRIFT_Z:
+            return f"drift: |z| = {np.max(np.abs(z)):.1f}"
+        if self.state['new_obs_since_search']:
+            mean_squared_z = self.state['sum_squared_z'] / self.state['new_obs_since_search']
+            if mean_squared_z > DRIFT_MEAN_SQUARED_Z:
+                return f"drift: mean z^2 = {mean_squared_z:.1f}"
+        if self.state['updates_since_search'] >= research_every:
+            return f"schedule: {self.state['updates_since_search']} updates"
+        searched = datetime.datetime.fromisoformat(self.state['searched_at'])
+        if (datetime.datetime.now() - searched).days >= max_age_days:
+            return f"schedule: last search {searched:%Y-%m-%d}"
+        return None
+
+    # --- persistence -----------------------------------------------------
+
+    def save(self, name, models_dir=MODELS_DIR):
+        """Publish the history and state as a new version of `name`"""
+        ArtifactStore(models_dir).put(name, {'values': self.values}, metadata=self.state)
+
+    @classmethod
+    def load(cls, name, models_dir=MODELS_DIR):
+        """Persisted forecaster for `name`, or None if there is none"""
+        store = ArtifactStore(models_dir)
+        if store.latest(name) is None:
+            return None
+        state = store.manifest(name)['metadata']
+        values = store.get(name)['values']
+        return cls(filter_arima(values, tuple(state['order']), state['params']), state, values)
+
+
+def refresh(name, series, models_dir=MODELS_DIR, research_every=RESEARCH_EVERY, max_age_days=MAX_AGE_DAYS):
+    """
+    Bring the persisted forecaster for `name` up to date with `series`.
+
+    Returns (forecaster, action) where action is 'fit' (no saved model),
+    'current' (nothing new), 'extend' or 'research: <reason>'.
+    """
+    forecaster = ArimaForecaster.load(name, models_dir)
+    last_date = series.index[-1]
+    if forecaster is None:
+        forecaster = ArimaForecaster.fit(series.values, last_date)
+        forecaster.save(name, models_dir)
+        return forecaster, 'fit'
+
+    new = series[series.index > forecaster.state['last_date']]
+    if new.empty:
+        return forecaster, 'current'
+    if len(series) - len(new) != forecaster.state['n_obs']:
+        # History was revised rather than appended to: refit from scratch
+        forecaster = ArimaForecaster.fit(series.values, last_date)
+        forecaster.save(name, models_dir)
+        return forecaster, 'research: history revised'
+
+    z = forecaster.extend(new.values, last_date)
+    reason = forecaster.research_reason(z, research_every, max_age_days)
+    if reason:
+        forecaster = ArimaForecaster.fit(series.values, last_date)
+        action = f"research: {reason}"
+    else:
+        action = 'extend'
+    forecaster.save(name, models_dir)
+    return forecaster, action
+
+
+def main(argv=None):
+    from utils.training import DATA_DIR, TRAINING_CONFIGS, load_series
+
+    parser = argparse.ArgumentParser(description="Refresh the persisted ARIMA forecasters")
+    parser.add_argument('series', nargs='*', help=f"Series to refresh (default: all of {', '.join(TRAINING_CONFIGS)})")
+    parser.add_argument('--steps', type=int, default=10)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    args = parser.parse_args(argv)
+
+    for name in args.series or TRAINING_CONFIGS:
+        config = TRAINING_CONFIGS[name]
+        if not os.path.exists(os.path.join(args.data_dir, config['file'])):
+            continue
+        forecaster, action = refresh(name, load_series(config, args.data_dir), args.models_dir)
+        mean, _, _ = forecaster.forecast(args.steps)
+        print(f"{name:<24} ARIMA{forecaster.order}  {action:<28} next: {mean[0]:,.2f}")
+
+
+if __name__ == '__main__':
+    main()
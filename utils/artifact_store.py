@@ -0,0 +1,245 @@
+"""Content-addressed, versioned store for processed data.
+
+Objects are written once under ``objects/<hash[:2]>/<hash>.<ext>`` in a format
+chosen by type, never pickle:
+
+- DataFrames: Arrow IPC files, read back through a memory map
+- NumPy arrays (or dicts of them): uncompressed ``.npz``
+- JSON-serializable values: ``.json``
+
+A name (``'gdp_features'``) has write-once version manifests under
+``refs/<name>/<version>.json``. Each one records the object hash, kind, shape
+and caller metadata, and ``refs/<name>/LATEST`` points at the current version.
+Every file is written to a temporary name and renamed into place, so readers
+never see a partial artifact. Storing content identical to the latest version
+returns that version instead of creating a new one, and identical content under
+different names shares one object.
+
+    store = ArtifactStore()
+    store.put('gdp_features', df, metadata={'source': 'Pakistan_GDP.csv'})
+    df = store.get('gdp_features')
+
+    python -m utils.artifact_store list
+    python -m utils.artifact_store import-legacy   # data_processed/*.csv
+"""
+import argparse
+import datetime
+import glob
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.etl import file_hash
+
+ARTIFACTS_DIR = 'data_processed/artifacts'
+LEGACY_DIR = 'data_processed'
+
+EXTENSIONS = {'frame': 'arrow', 'arrays': 'npz', 'json': 'json'}
+
+
+def kind_of(data):
+    """'frame', 'arrays' or 'json' for `data`; raises TypeError for anything else"""
+    if isinstance(data, pd.DataFrame):
+        return 'frame'
+    if isinstance(data, np.ndarray) or (
+            isinstance(data, dict) and data and all(isinstance(v, np.ndarray) for v in data.values())):
+        return 'arrays'
+    try:
+        json.dumps(data)
+    except TypeError:
+        raise TypeError(f"Cannot store {type(data).__name__}: use a DataFrame, NumPy arrays or JSON values")
+    return 'json'
+
+
+def _arrays_hash(arrays):
+    """Hash of array names, dtypes, shapes and bytes (the .npz zip itself embeds timestamps)"""
+    digest = hashlib.sha256()
+    for key in sorted(arrays):
+        array = np.ascontiguousarray(arrays[key])
+        digest.update(f"{key}:{array.dtype.str}:{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def _write_frame(df, path):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+class ArtifactStore:
+    """Versioned artifacts by name over a deduplicated, content-addressed object directory"""
+
+    def __init__(self, root=ARTIFACTS_DIR):
+        self.root = root
+
+    # --- objects ---------------------------------------------------------
+
+    def _object_path(self, digest, kind):
+        return os.path.join(self.root, 'objects', digest[:2], f"{digest}.{EXTENSIONS[kind]}")
+
+    def _write_object(self, data, kind):
+        """Write `data` unless an identical object exists; returns its content hash"""
+        tmp_dir = os.path.join(self.root, 'objects')
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, f".tmp-{os.getpid()}-{threading.get_ident()}.{EXTENSIONS[kind]}")
+
+        if kind == 'frame':
+            _write_frame(data, tmp_path)
+            digest = file_hash(tmp_path)
+        elif kind == 'arrays':
+            arrays = data if isinstance(data, dict) else {'array': data}
+            np.savez(tmp_path, **arrays)
+            digest = _arrays_hash(arrays)
+        else:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, sort_keys=True)
+            digest = file_hash(tmp_path)
+
+        path = self._object_path(digest, kind)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return digest
+
+    # --- versions --------------------------------------------------------
+
+    def _ref_dir(self, name):
+        return os.path.join(self.root, 'refs', name)
+
+    def versions(self, name):
+        """Published versions of `name`, oldest first"""
+        ref_dir = self._ref_dir(name)
+        if not os.path.isdir(ref_dir):
+            return []
+        return sorted(f[:-len('.json')] for f in os.listdir(ref_dir) if f.endswith('.json'))
+
+    def latest(self, name):
+        path = os.path.join(self._ref_dir(name), 'LATEST')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read().strip()
+
+    def names(self):
+        refs = os.path.join(self.root, 'refs')
+        return sorted(n for n in os.listdir(refs) if self.latest(n)) if os.path.isdir(refs) else []
+
+    def manifest(self, name, version=None):
+        """Manifest of `version` of `name` (default: latest); KeyError if there is none"""
+        version = version or self.latest(name)
+        path = os.path.join(self._ref_dir(name), f"{version}.json")
+        if not version or not os.path.exists(path):
+            raise KeyError(f"No artifact {name!r}" + (f" version {version!r}" if version else ''))
+        with open(path) as f:
+            return json.load(f)
+
+    def put(self, name, data, metadata=None):
+        """
+        Store `data` as a new version of `name` and make it current; returns the manifest.
+
+        If the content equals the latest version's, that version is returned
+        unchanged.
+        """
+        kind = kind_of(data)
+        digest = self._write_object(data, kind)
+        current = self.latest(name)
+        if current:
+            manifest = self.manifest(name, current)
+            if manifest['content_hash'] == digest and manifest.get('metadata') == (metadata or {}):
+                return manifest
+
+        now = datetime.datetime.now()
+        version = f"{now:%Y%m%dT%H%M%S%f}-{digest[:8]}"
+        manifest = {
+            'name': name,
+            'version': version,
+            'kind': kind,
+            'content_hash': digest,
+            'object': os.path.relpath(self._object_path(digest, kind), self.root),
+            'created_at': now.isoformat(timespec='seconds'),
+            'metadata': metadata or {},
+        }
+        if kind == 'frame':
+            manifest.update(rows=int(len(data)), columns=[str(c) for c in data.columns])
+        elif kind == 'arrays':
+            arrays = data if isinstance(data, dict) else {'array': data}
+            manifest['arrays'] = {key: {'dtype': a.dtype.str, 'shape': list(a.shape)} for key, a in arrays.items()}
+
+        ref_dir = self._ref_dir(name)
+        os.makedirs(ref_dir, exist_ok=True)
+        path = os.path.join(ref_dir, f"{version}.json")
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        # Versions are write-once: link fails rather than replacing an existing manifest
+        os.link(tmp_path, path)
+        os.remove(tmp_path)
+
+        latest_tmp = os.path.join(ref_dir, f".LATEST.tmp-{os.getpid()}-{threading.get_ident()}")
+        with open(latest_tmp, 'w') as f:
+            f.write(version + '\n')
+        os.replace(latest_tmp, os.path.join(ref_dir, 'LATEST'))
+        return manifest
+
+    def get_table(self, name, version=None, columns=None):
+        """A stored frame as a pyarrow Table memory-mapped from its Arrow file (zero-copy)"""
+        import pyarrow as pa
+
+        manifest = self.manifest(name, version)
+        if manifest['kind'] != 'frame':
+            raise TypeError(f"{name!r} is stored as {manifest['kind']}, not a frame")
+        # The table's buffers keep the mapping alive after the file is closed
+        with pa.memory_map(os.path.join(self.root, manifest['object'])) as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+
+    def get(self, name, version=None, columns=None):
+        """A stored artifact as a DataFrame, an array (or dict of arrays) or a JSON value"""
+        manifest = self.manifest(name, version)
+        path = os.path.join(self.root, manifest['object'])
+        if manifest['kind'] == 'frame':
+            return self.get_table(name, manifest['version'], columns).to_pandas()
+        if manifest['kind'] == 'arrays':
+            with np.load(path) as arrays:
+                loaded = {key: arrays[key] for key in arrays.files}
+            return loaded['array'] if list(loaded) == ['array'] else loaded
+        with open(path) as f:
+            return json.load(f)
+
+    def import_legacy(self, legacy_dir=LEGACY_DIR):
+        """Store each data_processed/*.csv under its file name; returns the manifests"""
+        return [self.put(os.path.splitext(os.path.basename(path))[0], pd.read_csv(path),
+                         metadata={'imported_from': path})
+                for path in sorted(glob.glob(os.path.join(legacy_dir, '*.csv')))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the processed-data artifact store")
+    parser.add_argument('command', choices=['list', 'import-legacy'])
+    parser.add_argument('--root', default=ARTIFACTS_DIR)
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore(args.root)
+    if args.command == 'import-legacy':
+        for manifest in store.import_legacy():
+            print(f"imported {manifest['name']} -> {manifest['content_hash'][:12]}")
+        return
+
+    for name in store.names():
+        manifest = store.manifest(name)
+        size = f"{manifest['rows']} rows" if manifest['kind'] == 'frame' else manifest['kind']
+        print(f"{name:<32} {manifest['version']:<32} {size:<12} hash={manifest['content_hash'][:12]} "
+              f"versions={len(store.versions(name))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""Rolling-origin backtests of every forecasting model on every economy series.
+
+``python -m utils.backtesting`` evaluates ARIMA, Linear Regression, Random
+Forest, XGBoost and the LSTM on each series in ``TRAINING_CONFIGS``:
+
+1. for each series the fold origins, training slices and the (folds, horizon)
+   block of actual values are built once and cached under
+   ``data_processed/cache/folds`` by data hash;
+2. each (model, series) pair runs all of its folds in a process pool worker,
+   forecasting `horizon` steps from every origin;
+3. RMSE, MAE and MAPE are computed for all folds and models at once from the
+   stacked (models, folds, horizon) error array, and the run is written as one
+   table to ``saved_analysis/backtests/<run>.csv``.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.training import DATA_DIR, TRAINING_CONFIGS, load_series
+from utils.windowing import sliding_windows
+
+CACHE_DIR = 'data_processed/cache/folds'
+RESULTS_DIR = 'saved_analysis/backtests'
+MODELS = ['arima', 'linear', 'random_forest', 'xgboost', 'lstm']
+
+# LSTMs are retrained from scratch on every fold, so keep their budget small
+LSTM_MAX_EPOCHS = 50
+
+
+def default_horizon(index):
+    """Forecast steps per fold: 3 years, 4 quarters or 12 months"""
+    spacing = np.median(np.diff(index.asi8)) / 86_400e9
+    if spacing > 300:
+        return 3
+    if spacing > 80:
+        return 4
+    return 12
+
+
+def rolling_origins(n, horizon, min_train, max_folds=None):
+    """Fold origins: each fold trains on [0, origin) and is scored on [origin, origin + horizon)"""
+    origins = np.arange(min_train, n - horizon + 1)
+    if len(origins) == 0:
+        raise ValueError(f"{n} observations are too few for min_train={min_train} and horizon={horizon}")
+    if max_folds and len(origins) > max_folds:
+        origins = origins[-max_folds:]
+    return origins
+
+
+def build_folds(series, look_back, horizon, max_folds=None):
+    """Series values, fold origins and the (folds, horizon) array of actual values"""
+    values = series.to_numpy(dtype=np.float64)
+    min_train = max(3 * look_back, len(values) // 2)
+    origins = rolling_origins(len(values), horizon, min_train, max_folds)
+    actual = values[origins[:, None] + np.arange(horizon)]
+    return {'values': values, 'origins': origins, 'actual': actual, 'dates': series.index.asi8}
+
+
+def load_folds(name, config, horizon=None, max_folds=None, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Fold dataset for one series, cached by a hash of the data and fold settings"""
+    series = load_series(config, data_dir)
+    horizon = horizon or default_horizon(series.index)
+
+    digest = hashlib.sha256()
+    digest.update(series.index.asi8.tobytes())
+    digest.update(series.to_numpy(dtype='float64').tobytes())
+    digest.update(json.dumps([config['look_back'], horizon, max_folds]).encode())
+    path = os.path.join(cache_dir, f"{digest.hexdigest()}.npz")
+
+    if os.path.exists(path):
+        with np.load(path) as archive:
+            folds = {key: archive[key] for key in archive.files}
+    else:
+        folds = build_folds(series, config['look_back'], horizon, max_folds)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = os.path.join(cache_dir, f".{digest.hexdigest()}.{os.getpid()}.npz")
+        np.savez(tmp_path, **folds)
+        os.replace(tmp_path, path)
+
+    folds.update(name=name, horizon=horizon, look_back=config['look_back'])
+    return folds
+
+
+# --- forecasters: (train values, horizon, look_back, config, train dates) -> (horizon,)
+
+
+def _minmax(train):
+    lo, hi = train.min(), train.max()
+    scale = hi - lo if hi > lo else 1.0
+    return lo, scale
+
+
+def _recursive_regression(regressor, train, horizon, look_back):
+    """Fit a regressor on lagged windows of the scaled series and roll it forward"""
+    lo, scale = _minmax(train)
+    scaled = (train - lo) / scale
+    X, y = sliding_windows(scaled, look_back)
+    regressor.fit(X, y)
+
+    window = scaled[-look_back:].copy()
+    forecast = np.empty(horizon)
+    for step in range(horizon):
+        forecast[step] = regressor.predict(window[None, :])[0]
+        window[:-1] = window[1:]
+        window[-1] = forecast[step]
+    return forecast * scale + lo
+
+
+def forecast_arima(train, horizon, look_back, config, dates):
+    from utils.arima_forecaster import ArimaForecaster
+
+    # The stepwise order search and statsmodels fit that the persisted forecasters use
+    return ArimaForecaster.fit(train).forecast(horizon)[0]
+
+
+def forecast_linear(train, horizon, look_back, config, dates):
+    from sklearn.linear_model import LinearRegression
+
+    return _recursive_regression(LinearRegression(), train, horizon, look_back)
+
+
+def forecast_random_forest(train, horizon, look_back, config, dates):
+    from sklearn.ensemble import RandomForestRegressor
+
+    return _recursive_regression(RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=1),
+                                 train, horizon, look_back)
+
+
+def forecast_xgboost(train, horizon, look_back, config, dates):
+    import xgboost as xgb
+
+    return _recursive_regression(
+        xgb.XGBRegressor(objective='reg:squarederror', n_estimators=100, random_state=42, n_jobs=1),
+        train, horizon, look_back,
+    )
+
+
+def forecast_lstm(train, horizon, look_back, config, dates):
+    """
+    Retrain the configured LSTM on the inputs utils.training builds for it and
+    roll it forward: seasonal differences with month and time index covariates,
+    streamed lag/rolling/calendar features, or scaled levels
+    """
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    from utils import lstm_models
+    from utils.feature_state import FeatureState, feature_frame, seasonal_frame
+    from utils.forecasting import recursive_forecast, stateful_forecast, undo_seasonal_difference
+    from utils.training import build_windows
+
+    series = pd.Series(train, index=pd.DatetimeIndex(dates))
+    X, y, scaler, _ = build_windows(series, config)
+
+    params = dict(config['params'])
+    model = getattr(lstm_models, config['builder'])(params, X.shape[1:])
+    model.fit(X, y, epochs=min(params.get('epochs', 100), LSTM_MAX_EPOCHS),
+              batch_size=params.get('batch_size', 32), verbose=0, shuffle=False,
+              callbacks=[EarlyStopping(monitor='loss', patience=5, restore_best_weights=True)])
+
+    if config['features'] == 'seasonal':
+        period = config['seasonal_period']
+        history = scaler.transform(seasonal_frame(series, period).values)[-look_back:]
+        months = (series.index[-1].month + np.arange(horizon)) % 12 + 1
+        exog = scaler.transform(np.column_stack((np.zeros(horizon), months, len(series) + np.arange(horizon))))
+        diffs = recursive_forecast(model, history, horizon, exog=exog)[0]
+        diffs = (diffs - scaler.min_[0]) / scaler.scale_[0]
+        return undo_seasonal_difference(diffs, train[-period:])
+
+    scaled = pd.Series(scaler.transform(train.reshape(-1, 1))[:, 0], index=series.index)
+    if config['features'] == 'advanced':
+        features = feature_frame(scaled).dropna()
+        forecast = stateful_forecast(model, features.values[-look_back:], horizon, FeatureState.from_series(scaled))[0]
+    else:
+        forecast = recursive_forecast(model, scaled.values[-look_back:, None], horizon)[0]
+    return scaler.inverse_transform(forecast.reshape(-1, 1))[:, 0]
+
+
+FORECASTERS = {
+    'arima': forecast_arima,
+    'linear': forecast_linear,
+    'random_forest': forecast_random_forest,
+    'xgboost': forecast_xgboost,
+    'lstm': forecast_lstm,
+}
+
+
+def run_folds(model_name, folds, config):
+    """(folds, horizon) predictions of one model on one series (runs in a worker)"""
+    forecaster = FORECASTERS[model_name]
+    values, dates = folds['values'], folds['dates']
+    horizon, look_back = folds['horizon'], folds['look_back']
+    started = time.perf_counter()
+    predicted = np.stack([forecaster(values[:origin], horizon, look_back, config, dates[:origin])
+                          for origin in folds['origins']])
+    return predicted, time.perf_counter() - started
+
+
+# --- metrics --------------------------------------------------------------
+
+
+def error_metrics(actual, predicted):
+    """
+    RMSE, MAE and MAPE (%) over the last two (folds, horizon) axes.
+
+    `predicted` may carry leading axes (e.g. models) that broadcast against
+    `actual`; MAPE ignores zero actuals.
+    """
+    errors = predicted - actual
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.abs(errors) / np.abs(actual)
+    pct = np.where(actual != 0, pct, np.nan)
+    return {
+        'rmse': np.sqrt(np.mean(errors ** 2, axis=(-2, -1))),
+        'mae': np.mean(np.abs(errors), axis=(-2, -1)),
+        'mape': 100 * np.nanmean(pct, axis=(-2, -1)),
+    }
+
+
+def _init_worker(threads):
+    """
+    Cap the worker's native thread pools at `threads` without importing
+    TensorFlow; LSTM folds import it themselves and read the TF_* variables
+    """
+    from threadpoolctl import threadpool_limits
+
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    # NumPy's BLAS is already loaded by the time the initializer runs, so limit it directly
+    threadpool_limits(limits=threads)
+
+
+def run(series_names=None, models=None, workers=None, horizon=None, max_folds=20,
+        data_dir=DATA_DIR, cache_dir=CACHE_DIR, results_dir=RESULTS_DIR):
+    """Backtest `models` on `series_names` (default: all) and return the results table"""
+    models = models or MODELS
+    unknown = set(models) - set(FORECASTERS)
+    if unknown:
+        raise ValueError(f"Unknown model(s): {', '.join(sorted(unknown))}")
+    names = series_names or list(TRAINING_CONFIGS)
+    configs = {name: TRAINING_CONFIGS[name] for name in names
+               if os.path.exists(os.path.join(data_dir, TRAINING_CONFIGS[name]['file']))}
+    if not configs:
+        print(f"No configured series found in {data_dir}")
+        return pd.DataFrame()
+
+    folds = {name: load_folds(name, config, horizon, max_folds, data_dir, cache_dir)
+             for name, config in configs.items()}
+    tasks = [(model, name) for name in configs for model in models]
+
+    cpus = os.cpu_count() or 1
+    workers = workers or min(len(tasks), cpus)
+    threads = max(1, cpus // workers)
+    print(f"Backtesting {len(models)} model(s) x {len(configs)} series on {workers} worker(s)")
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = {task: pool.submit(run_folds, task[0], folds[task[1]], configs[task[1]]) for task in tasks}
+        outputs = {task: future.result() for task, future in futures.items()}
+
+    rows = []
+    for name, series_folds in folds.items():
+        predicted = np.stack([outputs[(model, name)][0] for model in models])  # (models, folds, horizon)
+        metrics = error_metrics(series_folds['actual'], predicted)
+        for i, model in enumerate(models):
+            rows.append({
+                'series': name,
+                'model': model,
+                'folds': len(series_folds['origins']),
+                'horizon': series_folds['horizon'],
+                'rmse': metrics['rmse'][i],
+                'mae': metrics['mae'][i],
+                'mape': metrics['mape'][i],
+                'seconds': outputs[(model, name)][1],
+            })
+    results = pd.DataFrame(rows)
+    results['rank'] = results.groupby('series')['rmse'].rank(method='min').astype(int)
+
+    os.makedirs(results_dir, exist_ok=True)
+    run_id = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(results_dir, f"{run_id}.csv")
+    results.to_csv(path, index=False)
+    print(f"Results written to {path}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling-origin backtests of the forecasting models")
+    parser.add_argument('series', nargs='*', help=f"Series to evaluate (default: all of {', '.join(TRAINING_CONFIGS)})")
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=MODELS)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--horizon', type=int, help="Steps per fold (default: by series frequency)")
+    parser.add_argument('--max-folds', type=int, default=20)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    unknown = set(args.series) - set(TRAINING_CONFIGS)
+    if unknown:
+        parser.error(f"Unknown series: {', '.join(sorted(unknown))}")
+    results = run(args.series, args.models, args.workers, args.horizon, args.max_folds, args.data_dir)
+    if not results.empty:
+        print(results.sort_values(['series', 'rank']).to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+
+
+if __name__ == '__main__':
+    main()
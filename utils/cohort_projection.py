@@ -0,0 +1,190 @@
+"""Grade-progression (cohort-flow) projection of school enrollment.
+
+Each year the pupils of a grade move to the next grade at that grade's
+progression rate. The rest drop out, or repeat and are counted again. The
+lowest grade (Unadmitted) is refilled by an intake that grows at a
+constant rate. With every group's rates in a subdiagonal transition matrix,
+one projection year for all groups is a single batched matrix product:
+
+    enrollment[t + 1] = A @ enrollment[t] + intake[t]
+
+``CohortModel.fit`` estimates the rates from the enrollment cube
+(utils.enrollment_cube):
+
+- The class-wise 2023-24 counts give the ratio between consecutive grades
+  for every sector x gender group (a cross-sectional progression ratio).
+  A ratio above 1 (Kachi over Unadmitted) stands for pupils who enter
+  directly at that grade.
+- The ten-year public class series gives true cohort progression
+  (class g in year t to class g + 1 in year t + 1). Its ratio to the
+  public cross-section corrects every group's cross-sectional ratios for
+  cohort-size trends, grade by grade, where the panel covers the grade.
+- The five-year pre-primary totals give the default intake growth.
+
+Projections run for the sector x gender groups at once and take well under
+a millisecond per year, so they can follow dashboard widgets directly.
+Class-level counts are not published by province; a provincial class-wise
+source would add a province batch axis without changing the model.
+
+    model = CohortModel.fit(load_cube())
+    projected = model.project(years=10, **SCENARIOS['Halve dropout'])
+    projected.slice(level=['Primary', 'Middle', 'High'])      # stage x year
+"""
+import numpy as np
+
+from utils.education_metrics import ratio
+from utils.enrollment_cube import STAGE_CLASSES, TOTAL, EducationCube
+
+GRADES = [grade for classes in STAGE_CLASSES.values() for grade in classes]
+BASE_YEAR = '2023-24'
+SECTORS = ['Public', 'Other Public', 'Private']
+GENDERS = ['Boys', 'Girls']
+COMPULSORY = GRADES[GRADES.index('Class 1'):GRADES.index('Class 10')]  # grades that move on to class 10
+
+# Keyword arguments of CohortModel.project
+SCENARIOS = {
+    'Baseline': {},
+    'Halve dropout': {'dropout_change': -0.5},
+    'Everyone reaches class 10': {'progression': {grade: 1.0 for grade in COMPULSORY}},
+    'Flat intake': {'intake_growth': 0.0},
+    'Intake +3% a year': {'intake_growth': 0.03},
+}
+
+
+def academic_year(label, offset=1):
+    """'2023-24' shifted by `offset` years ('2024-25')"""
+    start = int(label[:4]) + offset
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def cohort_progression(panel):
+    """
+    Progression from each grade to the next pooled over consecutive years.
+
+    `panel` is (..., grade, year); only (grade, year) pairs published in both
+    years count. NaN where no pair exists.
+    """
+    current, following = panel[..., :-1, :-1], panel[..., 1:, 1:]
+    both = np.isfinite(current) & np.isfinite(following)
+    pairs = both.any(axis=-1)
+    rates = ratio(np.where(both, following, 0).sum(axis=-1), np.where(both, current, 0).sum(axis=-1))
+    return np.where(pairs, rates, np.nan)
+
+
+def annual_growth(series):
+    """Compound annual growth between the first and last published value along the last axis (0 if undefined)"""
+    finite = np.isfinite(series)
+    first = finite.argmax(axis=-1)
+    last = series.shape[-1] - 1 - finite[..., ::-1].argmax(axis=-1)
+    start = np.take_along_axis(series, first[..., np.newaxis], axis=-1)[..., 0]
+    end = np.take_along_axis(series, last[..., np.newaxis], axis=-1)[..., 0]
+    span = last - first
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (end / start) ** (1 / np.maximum(span, 1)) - 1
+    return np.where((span > 0) & (start > 0) & np.isfinite(growth), growth, 0.0)
+
+
+def _with_totals(values, labels, axis, groups=None):
+    """`values` with the sum of each group (and then of every label) appended along `axis`"""
+    blocks, names = [values], list(labels)
+    for name, members in (groups or {}).items():
+        positions = [labels.index(member) for member in members]
+        blocks.append(np.take(values, positions, axis=axis).sum(axis=axis, keepdims=True))
+        names.append(name)
+    blocks.append(values.sum(axis=axis, keepdims=True))
+    return np.concatenate(blocks, axis=axis), names + [TOTAL]
+
+
+class CohortModel:
+    """Grade progression rates and base-year enrollment for sector x gender groups"""
+
+    def __init__(self, base, progression, intake_growth, base_year=BASE_YEAR, sectors=SECTORS, genders=GENDERS):
+        self.base = base                    # (sector, gender, grade) enrollment in base_year
+        self.progression = progression      # (sector, gender, grade - 1): share moving from each grade to the next
+        self.intake_growth = intake_growth  # (sector, gender) yearly growth of the lowest grade
+        self.base_year = base_year
+        self.sectors = list(sectors)
+        self.genders = list(genders)
+
+    @classmethod
+    def fit(cls, cube, base_year=BASE_YEAR, sectors=SECTORS, genders=GENDERS):
+        """Estimate the model from an enrollment cube"""
+        national = cube.sel(province=TOTAL, area=TOTAL)
+        # The cube keeps its axis order (level, sector, gender); the model works in (sector, gender, grade)
+        base = np.moveaxis(
+            national.sel(year=base_year, sector=list(sectors), gender=list(genders), level=GRADES).values, 0, -1)
+        cross_section = ratio(base[..., 1:], base[..., :-1])
+
+        # Cohort progression / cross-sectional ratio of the public panel, per grade
+        public = national.sel(sector='Public', gender=TOTAL, level=GRADES)
+        public_base = public.values[:, public.axes['year'].index(base_year)]
+        correction = ratio(cohort_progression(public.values), ratio(public_base[1:], public_base[:-1]))
+        correction = np.where(np.isfinite(correction), correction, 1.0)
+        progression = np.nan_to_num(cross_section * correction, nan=0.0)
+
+        intake = annual_growth(national.sel(sector=TOTAL, gender=TOTAL, level='Pre Primary').values)
+        intake_growth = np.full(base.shape[:-1], intake)
+        return cls(np.nan_to_num(base), progression, intake_growth, base_year, sectors, genders)
+
+    @property
+    def dropout(self):
+        """Share of each grade not moving to the next (0 where more arrive than leave)"""
+        return np.clip(1 - self.progression, 0, None)
+
+    def rates(self):
+        """Progression and dropout rates as a cube: sector x gender x level (from-grade) x rate"""
+        values = np.stack([self.progression, self.dropout], axis=-1)
+        return EducationCube(values, {'sector': self.sectors, 'gender': self.genders, 'level': GRADES[:-1],
+                                      'rate': ['Progression', 'Dropout']})
+
+    def _rates_for(self, progression=None, dropout_change=0.0):
+        rates = self.progression.copy()
+        if dropout_change:
+            rates = np.where(rates < 1, 1 - (1 - rates) * (1 + dropout_change), rates)
+        for grade, rate in (progression or {}).items():
+            rates[..., GRADES.index(grade)] = rate
+        return np.clip(rates, 0, None)
+
+    def _intake_for(self, intake_growth=None):
+        if intake_growth is None:
+            return self.intake_growth
+        if isinstance(intake_growth, dict):
+            by_sector = np.array([intake_growth.get(sector, 0.0) for sector in self.sectors])
+            return np.broadcast_to(by_sector[:, np.newaxis], self.intake_growth.shape)
+        return np.broadcast_to(np.asarray(intake_growth, dtype=np.float64), self.intake_growth.shape)
+
+    def transition_matrices(self, progression=None, dropout_change=0.0):
+        """(sector, gender, grade, grade) matrices moving each grade's pupils to the next"""
+        rates = self._rates_for(progression, dropout_change)
+        matrices = np.zeros(rates.shape[:-1] + (len(GRADES), len(GRADES)))
+        below = np.arange(len(GRADES) - 1)
+        matrices[..., below + 1, below] = rates
+        return matrices
+
+    def project(self, years=10, intake_growth=None, dropout_change=0.0, progression=None):
+        """
+        Enrollment for `years` years after the base year, as a cube of
+        sector x gender x level x year (base year included).
+
+        Scenario arguments: `intake_growth` (yearly rate, or {sector: rate}),
+        `dropout_change` (relative change of every dropout rate, -0.5 halves
+        them) and `progression` ({grade: rate} overriding the share of a grade
+        moving on). Level holds the grades, their stages and Total; sector and
+        gender gain Total members.
+        """
+        matrices = self.transition_matrices(progression, dropout_change)
+        growth = self._intake_for(intake_growth)
+
+        values = np.empty(self.base.shape + (years + 1,))
+        state = values[..., 0] = self.base
+        for t in range(1, years + 1):
+            intake = state[..., 0] * (1 + growth)
+            state = np.matmul(matrices, state[..., np.newaxis])[..., 0]
+            state[..., 0] = intake
+            values[..., t] = state
+
+        values, levels = _with_totals(values, GRADES, axis=2, groups=STAGE_CLASSES)
+        values, sectors = _with_totals(values, self.sectors, axis=0)
+        values, genders = _with_totals(values, self.genders, axis=1)
+        labels = [academic_year(self.base_year, t) for t in range(years + 1)]
+        return EducationCube(values, {'sector': sectors, 'gender': genders, 'level': levels, 'year': labels})
@@ -0,0 +1,226 @@
+"""Pupil-teacher ratios, growth and teacher qualification mix, precomputed.
+
+Teacher counts are built into a cube on the same axes as the enrollment cube
+(utils.enrollment_cube): the provincial total and per-sector teacher files
+for 2023-24 and the five-year teacher series. Teacher files count inter
+colleges apart from higher secondary schools, and the build adds them
+together to match the enrollment stage.
+
+Teachers are counted by institution type but pupils by stage, and pupils
+of one stage are largely taught in schools of another (primary classes in
+middle and high schools). A ratio per stage would divide unrelated counts,
+so ``build`` aligns the two cubes on the members they share, i.e.
+
+    province x level x sector x area x year   (gender at Total)
+
+sums both over the levels of each RATIO_LEVELS group (schools from
+pre-primary to class 12, and all levels) and computes, for every
+combination at once:
+
+- enrollment and teachers
+- the pupil-teacher ratio (enrollment per teacher)
+- year-on-year growth of enrollment, teachers and the ratio
+
+It also shares out the public-sector academic and professional
+qualification files (level x qualification x area x gender) within each
+level. The results are published as cubes under
+``data_processed/cache/education_metrics/<hash>/``, so the dashboard only
+slices them.
+
+    python -m utils.education_metrics build
+
+    metrics = load_metrics()
+    metrics['ratio'].slice(year='2023-24', level='Schools', province=provinces)
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+from utils import enrollment_cube
+from utils.enrollment_cube import (CUBE_DIR, CUBE_SOURCES, SCHOOL_STAGES, TOTAL, EducationCube,
+                                   academic_year_columns, fill, split_columns)
+from utils.etl import file_hash
+from utils.fileio import is_current, publish_dir, write_json_atomic
+
+METRICS_DIR = 'data_processed/cache/education_metrics'
+TEACHER_CUBE_DIR = 'data_processed/cache/teachers'
+POINTER = 'current.json'
+TEACHERS = 'datasets_cleaned/Education/Teachers'
+
+RATIO_AXES = ('province', 'level', 'sector', 'area', 'year')
+QUALIFICATION_AXES = ('level', 'qualification', 'area', 'gender')
+
+# Level groups that enrollment and teacher counts both cover (see above); TOTAL is every level
+SCHOOL_LEVELS = [stage for stage in SCHOOL_STAGES if stage != 'Degree']
+RATIO_LEVELS = {'Schools': SCHOOL_LEVELS, TOTAL: SCHOOL_STAGES}
+
+
+def _teacher_file(sector=None):
+    spec = {
+        'transform': split_columns,
+        'params': {'rows': {'Province/Region': 'province', 'Level': 'level'},
+                   'column_axes': ['area', 'gender'], 'sep': ' ', 'fixed': {'year': '2023-24'}},
+        'drop_totals': ['level'],
+    }
+    if sector:
+        spec['params']['fixed']['sector'] = sector
+    return spec
+
+
+# In order of precedence, as for CUBE_SOURCES
+TEACHER_SOURCES = {
+    f'{TEACHERS}/5_year_Teachers.csv': {
+        'transform': academic_year_columns,
+        'params': {'rows': {'Institution Type': 'level', 'Sector': 'sector'}},
+    },
+    f'{TEACHERS}/Teachers_Total_Provincial.csv': _teacher_file(),
+    f'{TEACHERS}/Teachers_Public_Sector.csv': _teacher_file('Public'),
+    f'{TEACHERS}/Teachers_Private_Sector.csv': _teacher_file('Private'),
+    f'{TEACHERS}/Teachers_Other_Public_Sector.csv': _teacher_file('Other Public'),
+}
+
+QUALIFICATIONS = {
+    'academic': (f'{TEACHERS}/Teacher_Academic_Qualification_Total(Public Sector).csv', 'Academic Qualification'),
+    'professional': (f'{TEACHERS}/Teacher_Professional_Qualification_Total(Public Sector).csv',
+                     'Professional Qualification'),
+}
+
+
+# --- metrics ----------------------------------------------------------------------
+
+
+def align(enrollment, teachers, axes=RATIO_AXES):
+    """Enrollment and teacher cubes over the members both share on `axes`, at gender Total"""
+    coords = {axis: [label for label in enrollment.axes[axis] if label in teachers.axes[axis]] for axis in axes}
+    return enrollment.sel(gender=TOTAL, **coords), teachers.sel(gender=TOTAL, **coords)
+
+
+def combine(cube, groups=RATIO_LEVELS):
+    """`cube` with its level axis replaced by the sum of each group of levels"""
+    position = list(cube.axes).index('level')
+    sums = [cube.sel(level=[level for level in levels if level in cube.axes['level']]).sum('level').values
+            for levels in groups.values()]
+    return EducationCube(np.stack(sums, axis=position), dict(cube.axes, level=list(groups)))
+
+
+def ratio(numerator, denominator):
+    """Elementwise numerator / denominator, NaN where the denominator is missing or zero"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def growth(values, axis=-1):
+    """Relative change from the previous member along `axis` (NaN for the first one)"""
+    values = np.moveaxis(values, axis, -1)
+    change = np.full(values.shape, np.nan)
+    change[..., 1:] = ratio(values[..., 1:], values[..., :-1]) - 1
+    return np.moveaxis(change, -1, axis)
+
+
+def qualification_mix(path, column):
+    """(counts, shares) cubes of one qualification file; shares add up to 1 within each level"""
+    records = split_columns(path, {'Level': 'level', column: 'qualification'}, ['area', 'gender'], sep=' ',
+                            axes=QUALIFICATION_AXES)
+    records = records.groupby(list(QUALIFICATION_AXES), sort=False, as_index=False)['value'].sum()
+    counts, _ = fill(records, QUALIFICATION_AXES)
+    qualifications = counts.members('qualification')
+    detail = counts.sel(qualification=qualifications)
+    total = detail.sum('qualification').values[:, np.newaxis]
+    shares = EducationCube(ratio(detail.values, total), detail.axes)
+    return counts, shares
+
+
+def compute(enrollment, teachers, qualifications=None):
+    """Every metric cube by name"""
+    pupils, staff = (combine(cube) for cube in align(enrollment, teachers))
+    year = list(pupils.axes).index('year')
+    metrics = {
+        'enrollment': pupils,
+        'teachers': staff,
+        'ratio': EducationCube(ratio(pupils.values, staff.values), pupils.axes),
+        'enrollment_growth': EducationCube(growth(pupils.values, year), pupils.axes),
+        'teacher_growth': EducationCube(growth(staff.values, year), pupils.axes),
+    }
+    metrics['ratio_growth'] = EducationCube(growth(metrics['ratio'].values, year), pupils.axes)
+    for name, (path, column) in (qualifications or QUALIFICATIONS).items():
+        if os.path.exists(path):
+            metrics[f'{name}_qualifications'], metrics[f'{name}_mix'] = qualification_mix(path, column)
+    return metrics
+
+
+# --- building -------------------------------------------------------------------
+
+
+def _digest(enrollment_dir, teacher_dir, qualifications):
+    digest = hashlib.sha256()
+    digest.update(f"{os.path.basename(enrollment_dir)}:{os.path.basename(teacher_dir)}".encode())
+    digest.update(json.dumps(RATIO_LEVELS).encode())
+    for name, (path, column) in sorted(qualifications.items()):
+        if os.path.exists(path):
+            digest.update(f"{name}:{path}:{column}:{file_hash(path)}".encode())
+    for function in (align, combine, ratio, growth, qualification_mix, compute):
+        digest.update(inspect.getsource(function).encode())
+    return digest.hexdigest()
+
+
+def build(root=METRICS_DIR, force=False):
+    """
+    Build (or reuse) the enrollment and teacher cubes and publish every metric
+    for them unless already published; returns the metrics directory.
+    """
+    enrollment_dir = enrollment_cube.build(CUBE_SOURCES, CUBE_DIR)
+    teacher_dir = enrollment_cube.build(TEACHER_SOURCES, TEACHER_CUBE_DIR)
+    digest = _digest(enrollment_dir, teacher_dir, QUALIFICATIONS)
+    target = os.path.join(root, digest)
+
+    if force or not is_current(os.path.join(target, 'manifest.json')):
+        metrics = compute(EducationCube.load(enrollment_dir), EducationCube.load(teacher_dir))
+        with publish_dir(target) as tmp_dir:
+            for name, cube in metrics.items():
+                cube.save(tmp_dir, name)
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+                json.dump({
+                    'content_hash': digest,
+                    'enrollment_cube': enrollment_dir,
+                    'teacher_cube': teacher_dir,
+                    'metrics': {name: cube.axes for name, cube in metrics.items()},
+                }, f, indent=2)
+
+    write_json_atomic(os.path.join(root, POINTER), {'content_hash': digest})
+    return target
+
+
+def load_metrics(directory=None, root=METRICS_DIR):
+    """Metric cubes by name from `directory`, or from the current published build"""
+    if directory is None:
+        pointer = os.path.join(root, POINTER)
+        if not os.path.exists(pointer):
+            raise FileNotFoundError(f"No education metrics in {root}; run python -m utils.education_metrics build")
+        with open(pointer) as f:
+            directory = os.path.join(root, json.load(f)['content_hash'])
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        names = json.load(f)['metrics']
+    return {name: EducationCube.load(directory, name) for name in names}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build pupil-teacher ratio and qualification metrics")
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--root', default=METRICS_DIR)
+    parser.add_argument('--force', action='store_true', help="Recompute even if the inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    directory = build(args.root, args.force)
+    metrics = load_metrics(directory)
+    national = metrics['ratio'].slice(level=list(RATIO_LEVELS)).to_frame()
+    print(f"{len(metrics)} metric cubes -> {directory}")
+    print("Pupils per teacher (Pakistan, all sectors; schools and all levels):")
+    print(national.round(1).to_string())
+
+
+if __name__ == '__main__':
+    main()
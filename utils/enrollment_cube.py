@@ -0,0 +1,379 @@
+"""Education enrollments as one dense cube with named axes.
+
+The enrollment files each publish a different cut of the same counts: stage x
+sector over five years, province x stage x area x gender for 2023-24, stage x
+class x sector x gender for 2023-24 and public enrollment by class over ten
+years. ``build`` normalizes their labels ('Pre- Primary' / 'Pre-Primary' /
+'Pre Primary', 'URBAN', 'Balochisan', 'Grand Total', ...) and reshapes them
+once into a single float64 array over
+
+    province x level x sector x gender x area x year
+
+Level holds both stages and classes (see STAGE_CLASSES). A file that does
+not break an axis down fills its 'Total' member, so national rows land on
+province 'Total'; only years are always explicit. Cells no file publishes are
+NaN. Sources are applied in CUBE_SOURCES order and the first value written to
+a cell wins. Later values that disagree are counted as conflicts in the
+manifest.
+
+Charts are then a slice and a sum of the array instead of repeated DataFrame
+filtering:
+
+    cube = EducationCube.load(build())
+    cube.slice(year='2023-24', level=SCHOOL_STAGES, gender=['Boys', 'Girls']).sum('level')
+
+New provinces, districts, classes or years are new members of an axis, and a
+new file is one more CUBE_SOURCES entry.
+
+    python -m utils.enrollment_cube build
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.etl import code_hash, file_hash
+from utils.fileio import is_current, publish_dir, write_json_atomic
+
+CUBE_DIR = 'data_processed/cache/enrollment'
+POINTER = 'current.json'
+ENROLLMENTS = 'datasets_cleaned/Education/Enrollments'
+
+AXES = ('province', 'level', 'sector', 'gender', 'area', 'year')
+TOTAL = 'Total'
+
+SCHOOL_STAGES = ['Pre Primary', 'Primary', 'Middle', 'High', 'Higher Secondary', 'Degree']
+STAGE_CLASSES = {
+    'Pre Primary': ['Unadmitted', 'Kachi'],
+    'Primary': ['Class 1', 'Class 2', 'Class 3', 'Class 4', 'Class 5'],
+    'Middle': ['Class 6', 'Class 7', 'Class 8'],
+    'High': ['Class 9', 'Class 10'],
+    'Higher Secondary': ['Class 11', 'Class 12'],
+}
+
+# Published spellings -> cube labels, per axis ('Total' and 'Grand Total' are TOTAL on every axis)
+ALIASES = {
+    'province': {'Pakistan': TOTAL, 'Balochisan': 'Balochistan'},
+    'level': {
+        'Pre- Primary': 'Pre Primary',
+        'Pre-Primary': 'Pre Primary',
+        'Higher Secondary/Inter Colleges': 'Higher Secondary',
+        'Degree Colleges (XI-XIV)': 'Degree',
+        'Degree Colleges': 'Degree',
+        # Teacher files count inter colleges apart; the enrollment stage includes them
+        'Inter Colleges': 'Higher Secondary',
+        'Education Foundations*': 'Education Foundations',
+    },
+    'area': {'URBAN': 'Urban', 'RURAL': 'Rural'},
+}
+TOTALS = {'Total', 'TOTAL', 'Grand Total'}
+
+# Member order on the axes that have a natural one; other members follow in order of appearance
+ORDER = {
+    'level': SCHOOL_STAGES + [name for classes in STAGE_CLASSES.values() for name in classes],
+    'sector': ['Public', 'Other Public', 'Private'],
+    'gender': ['Boys', 'Girls', 'Male', 'Female'],
+    'area': ['Urban', 'Rural'],
+}
+
+
+# --- readers: source file -> DataFrame of AXES + value ------------------------
+
+
+def normalize(labels, axis):
+    """Cube labels for the published `labels` of one axis"""
+    labels = labels.astype(str).str.strip()
+    labels = labels.where(~labels.isin(TOTALS), TOTAL)
+    return labels.replace(ALIASES.get(axis, {}))
+
+
+def _coordinates(long, rows, fixed, axes=AXES):
+    """
+    Long records with one column per axis of `axes`.
+
+    `rows` maps source columns to axes; when several columns map to one axis
+    (Stage and Class both give the level) the last one that is not a total
+    wins. Axes no column gives are filled from `fixed`, else with TOTAL.
+    """
+    records = pd.DataFrame({'value': pd.to_numeric(long['value'], errors='coerce')})
+    for axis in axes:
+        columns = [column for column, target in rows.items() if target == axis]
+        if not columns and axis in long.columns:
+            columns = [axis]
+        if not columns:
+            records[axis] = (fixed or {}).get(axis, TOTAL)
+            continue
+        labels = normalize(long[columns[0]], axis)
+        for column in columns[1:]:
+            finer = normalize(long[column], axis)
+            labels = labels.where(finer == TOTAL, finer)
+        records[axis] = labels.values
+    return records.dropna(subset=['value'])
+
+
+def academic_year_columns(path, rows, fixed=None, axes=AXES):
+    """Wide '2019-20' year columns, with the rest of the coordinates in `rows` columns"""
+    df = pd.read_csv(path)
+    years = [column for column in df.columns if column[:4].isdigit() and column[4:5] == '-']
+    if not years:
+        raise KeyError("academic-year columns such as '2019-20'")
+    long = df.melt(id_vars=list(rows), value_vars=years, var_name='year', value_name='value')
+    return _coordinates(long, rows, fixed, axes)
+
+
+def split_columns(path, rows, column_axes, fixed=None, sep=' - ', axes=AXES):
+    """Value columns named '<a> - <b>' ('URBAN - Boys', 'Public - Girls') split over two axes"""
+    df = pd.read_csv(path)
+    values = [column for column in df.columns if sep in column and column not in rows]
+    long = df.melt(id_vars=list(rows), value_vars=values, var_name='column', value_name='value')
+    parts = long['column'].str.split(sep, n=1, expand=True)
+    for i, axis in enumerate(column_axes):
+        long[axis] = parts[i]
+    return _coordinates(long, rows, fixed, axes)
+
+
+# In order of precedence. 'drop_totals' lists axes whose published totals cover
+# less than the cube's Total (the 2023-24 files total the school stages only).
+CUBE_SOURCES = {
+    f'{ENROLLMENTS}/5_year_enrollment.csv': {
+        'transform': academic_year_columns,
+        'params': {'rows': {'Stage': 'level', 'Sector': 'sector'}},
+    },
+    f'{ENROLLMENTS}/Total_enrollment_2023to2024.csv': {
+        'transform': split_columns,
+        'params': {'rows': {'Province/Region': 'province', 'Stage': 'level'},
+                   'column_axes': ['area', 'gender'], 'fixed': {'year': '2023-24'}},
+        'drop_totals': ['level'],
+    },
+    f'{ENROLLMENTS}/Enrollment_Class_Wise.csv': {
+        'transform': split_columns,
+        'params': {'rows': {'Stage': 'level', 'Class': 'level'},
+                   'column_axes': ['sector', 'gender'], 'fixed': {'year': '2023-24'}},
+        'drop_totals': ['level'],
+    },
+    f'{ENROLLMENTS}/Total_Enrollent(Public)_Ten_Years.csv': {
+        'transform': academic_year_columns,
+        'params': {'rows': {'Class': 'level'}, 'fixed': {'sector': 'Public'}},
+    },
+}
+
+
+def read_sources(sources=None, axes=AXES):
+    """
+    Records of every existing source, in precedence order, with the source's position.
+
+    Rows of one source that land on the same cell are added up: a file may
+    split what the cube keeps together (inter colleges within higher
+    secondary).
+    """
+    frames = []
+    for position, (path, spec) in enumerate((sources or CUBE_SOURCES).items()):
+        if not os.path.exists(path):
+            continue
+        records = spec['transform'](path, **spec.get('params', {}))
+        for axis in spec.get('drop_totals', []):
+            records = records[records[axis] != TOTAL]
+        records = records.groupby(list(axes), sort=False, as_index=False)['value'].sum()
+        frames.append(records.assign(source=position))
+    if not frames:
+        raise FileNotFoundError(f"None of the sources exist: {', '.join(sources or CUBE_SOURCES)}")
+    return pd.concat(frames, ignore_index=True)
+
+
+def _members(labels, axis):
+    """Ordered members of one axis: years sorted, known labels in ORDER, then the rest, TOTAL last"""
+    labels = pd.unique(labels)
+    found = [label for label in labels if label != TOTAL]
+    if axis == 'year':
+        found = sorted(found)
+    else:
+        known = ORDER.get(axis, [])
+        found = [label for label in known if label in found] + [label for label in found if label not in known]
+    return found + [TOTAL] if TOTAL in labels else found
+
+
+# --- the cube -------------------------------------------------------------------
+
+
+class EducationCube:
+    """Counts (or metrics) on named axes, backed by one dense float64 array (NaN where unpublished)"""
+
+    def __init__(self, values, axes):
+        self.values = values
+        self.axes = {axis: list(labels) for axis, labels in axes.items()}
+        if tuple(len(labels) for labels in self.axes.values()) != values.shape:
+            raise ValueError(f"Axes {list(self.axes)} do not match an array of shape {values.shape}")
+
+    @classmethod
+    def load(cls, directory, name='cube'):
+        with np.load(os.path.join(directory, f'{name}.npz')) as arrays:
+            values = arrays['values']
+            axes = {axis: arrays[f'axis_{axis}'].tolist() for axis in arrays['axes'].tolist()}
+        return cls(values, axes)
+
+    def save(self, directory, name='cube'):
+        np.savez(os.path.join(directory, f'{name}.npz'), values=self.values, axes=np.array(list(self.axes)),
+                 **{f'axis_{axis}': np.array(labels) for axis, labels in self.axes.items()})
+
+    def __repr__(self):
+        shape = ' x '.join(f"{axis}[{len(labels)}]" for axis, labels in self.axes.items())
+        return f"EducationCube({shape or 'scalar'})"
+
+    def members(self, axis, total=False):
+        """Labels of `axis`, without its TOTAL member unless `total`"""
+        return [label for label in self.axes[axis] if total or label != TOTAL]
+
+    def _position(self, axis, label):
+        try:
+            return self.axes[axis].index(label)
+        except ValueError:
+            raise KeyError(f"{label!r} is not a member of the {axis} axis")
+
+    def sel(self, **coords):
+        """
+        The sub-cube at `coords` (axis=label or axis=[labels]).
+
+        A single label drops its axis, a list keeps it in the given order. Once
+        no axis is left the value itself is returned.
+        """
+        unknown = set(coords) - set(self.axes)
+        if unknown:
+            raise KeyError(f"Unknown axes {sorted(unknown)}; the cube has {list(self.axes)}")
+        values, axes = self.values, dict(self.axes)
+        # Right to left, so dropping an axis leaves the positions of the earlier ones unchanged
+        for i, axis in reversed(list(enumerate(self.axes))):
+            if axis not in coords:
+                continue
+            key = coords[axis]
+            if isinstance(key, (list, tuple)):
+                values = np.take(values, [self._position(axis, label) for label in key], axis=i)
+                axes[axis] = list(key)
+            else:
+                values = np.take(values, self._position(axis, key), axis=i)
+                del axes[axis]
+        return EducationCube(values, axes) if axes else float(values)
+
+    def slice(self, **coords):
+        """Like sel, with every axis not named that has a TOTAL member taken at it"""
+        defaults = {axis: TOTAL for axis, labels in self.axes.items() if axis not in coords and TOTAL in labels}
+        return self.sel(**defaults, **coords)
+
+    def sum(self, *axes):
+        """
+        Sum over `axes` (all of them by default), treating unpublished cells as
+        absent; a sum over cells that are all unpublished stays NaN.
+        """
+        axes = axes or tuple(self.axes)
+        positions = tuple(list(self.axes).index(axis) for axis in axes)
+        present = ~np.isnan(self.values)
+        total = np.where(present, self.values, 0).sum(axis=positions)
+        total = np.where(present.any(axis=positions), total, np.nan)
+        remaining = {axis: labels for axis, labels in self.axes.items() if axis not in axes}
+        return EducationCube(total, remaining) if remaining else float(total)
+
+    def to_series(self):
+        """pandas Series of a one-axis cube, indexed by its labels"""
+        (axis, labels), = self.axes.items()
+        return pd.Series(self.values, index=pd.Index(labels, name=axis))
+
+    def to_frame(self):
+        """pandas DataFrame of a two-axis cube: first axis down, second across"""
+        (rows, row_labels), (columns, column_labels) = self.axes.items()
+        return pd.DataFrame(self.values, index=pd.Index(row_labels, name=rows),
+                            columns=pd.Index(column_labels, name=columns))
+
+
+# --- building -------------------------------------------------------------------
+
+
+def _digest(sources):
+    digest = hashlib.sha256()
+    for position, (source, spec) in enumerate(sources.items()):
+        if os.path.exists(source):
+            digest.update(f"{position}:{source}:{file_hash(source)}:{code_hash(spec)}:"
+                          f"{spec.get('drop_totals')}".encode())
+    digest.update(inspect.getsource(_coordinates).encode())
+    digest.update(inspect.getsource(fill).encode())
+    digest.update(json.dumps([AXES, ALIASES, ORDER], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def fill(records, axes=AXES):
+    """
+    (cube, conflicts) from records in precedence order: the first value of
+    each cell wins and `conflicts` flags the records that disagree with it.
+    """
+    labels = {axis: _members(records[axis], axis) for axis in axes}
+    shape = tuple(len(members) for members in labels.values())
+    codes = [pd.Categorical(records[axis], categories=labels[axis]).codes for axis in axes]
+    cells = np.ravel_multi_index(codes, shape)
+
+    _, first = np.unique(cells, return_index=True)
+    values = np.full(shape, np.nan)
+    values.flat[cells[first]] = records['value'].values[first]
+    conflicts = ~np.isclose(values.flat[cells], records['value'].values)
+    return EducationCube(values, labels), conflicts
+
+
+def build(sources=None, root=CUBE_DIR, force=False):
+    """Publish the cube for the current sources unless it already exists; returns its directory"""
+    sources = sources or CUBE_SOURCES
+    digest = _digest(sources)
+    target = os.path.join(root, digest)
+
+    if force or not is_current(os.path.join(target, 'manifest.json')):
+        records = read_sources(sources)
+        cube, conflicts = fill(records)
+
+        paths = list(sources)
+        by_source = records.assign(conflict=conflicts).groupby('source')
+        manifest = {
+            'content_hash': digest,
+            'axes': cube.axes,
+            'shape': list(cube.values.shape),
+            'filled': int(np.isfinite(cube.values).sum()),
+            'sources': {paths[position]: {'records': int(len(group)), 'conflicts': int(group['conflict'].sum())}
+                        for position, group in by_source},
+        }
+
+        with publish_dir(target) as tmp_dir:
+            cube.save(tmp_dir)
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+    write_json_atomic(os.path.join(root, POINTER), {'content_hash': digest})
+    return target
+
+
+def load_cube(root=CUBE_DIR):
+    """The current published cube; raises FileNotFoundError if none has been built"""
+    pointer = os.path.join(root, POINTER)
+    if not os.path.exists(pointer):
+        raise FileNotFoundError(f"No enrollment cube in {root}; run python -m utils.enrollment_cube build")
+    with open(pointer) as f:
+        return EducationCube.load(os.path.join(root, json.load(f)['content_hash']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the education enrollment cube")
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--root', default=CUBE_DIR)
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the sources are unchanged")
+    args = parser.parse_args(argv)
+
+    directory = build(root=args.root, force=args.force)
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+    print(' x '.join(f"{axis}[{len(labels)}]" for axis, labels in manifest['axes'].items()),
+          f"({manifest['filled']} cells filled) -> {directory}")
+    for source, counts in manifest['sources'].items():
+        note = f", {counts['conflicts']} conflicting values ignored" if counts['conflicts'] else ''
+        print(f"  {source}: {counts['records']} records{note}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+"""Incremental raw -> cleaned ETL for the datasets in datasets_raw/.
+
+Each cleaned file is produced by one declarative entry in ``TRANSFORMS``: the
+raw source, the transform function and its parameters. ``python -m utils.etl``
+records the content hash of every input and output, together with a hash of
+the transform's code and parameters, in ``data_processed/etl_manifest.json``
+and re-runs only the transforms whose input, code or output changed.
+Independent transforms run in parallel and every output is written to a
+temporary file, validated (see utils.validation) and only then renamed into
+place, so a bad rebuild leaves the previous cleaned file untouched.
+
+    python -m utils.etl                      # refresh what is stale
+    python -m utils.etl Workers_Remittance   # only some outputs
+    python -m utils.etl --force              # rebuild everything
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils.fileio import write_json_atomic
+from utils.validation import ValidationError, validate_source
+from utils.wdi import wdi_indicator, wdi_long
+
+RAW_DIR = 'datasets_raw'
+CLEAN_DIR = 'datasets_cleaned'
+MANIFEST_PATH = 'data_processed/etl_manifest.json'
+
+SBP_DATE_FORMAT = '%d-%b-%Y'  # 30-Sep-2025
+SBP_MISSING = 'Missing value'  # Observation Status of withheld observations, some of which keep a value
+
+
+# --- transforms: raw DataFrame (all columns as str) -> cleaned DataFrame ---------
+
+
+def sbp_series(raw, layout='date_first'):
+    """
+    A single-series SBP EasyData export (Dataset, Series Key, Series, ...).
+
+    SBP lists the newest observation first, so rows are reversed into date
+    order. layout 'date_first' writes Date, Series_Name, Value (float), Unit;
+    'name_first' writes Series Name, Date, Value (as published), Unit.
+    """
+    df = raw.iloc[::-1]
+    dates = pd.to_datetime(df['Observation Date'], format=SBP_DATE_FORMAT)
+    if layout == 'name_first':
+        return pd.DataFrame({
+            'Series Name': df['Series'].values,
+            'Date': dates.values,
+            'Value': df['Observation Value'].values,
+            'Unit': df['Unit'].values,
+        })
+    return pd.DataFrame({
+        'Date': dates.values,
+        'Series_Name': df['Series'].values,
+        'Value': df['Observation Value'].astype('float64').values,
+        'Unit': df['Unit'].values,
+    })
+
+
+def sbp_panel(raw, sort_by='series', status_columns=False):
+    """
+    A multi-series SBP export (Dataset Name, Observation Date, ..., Series name).
+
+    Missing observations (blank, or flagged 'Missing value' by SBP) and
+    duplicate (date, series) rows are dropped and the rows sorted by series
+    then date ('series') or by date then series ('date').
+    """
+    published = raw['Observation Value'].fillna('').str.strip() != ''
+    df = raw[published & (raw['Observation Status'] != SBP_MISSING)]
+    out = pd.DataFrame({
+        'Date': pd.to_datetime(df['Observation Date'], format=SBP_DATE_FORMAT),
+        'Series_Name': df['Series name'],
+        'Value': df['Observation Value'].astype('float64'),
+        'Unit': df['Unit'],
+    })
+    if status_columns:
+        out['Status'] = df['Observation Status']
+        out['Sequence_No'] = df['Sequence No.'].astype('int64')
+    out = out.drop_duplicates(subset=['Date', 'Series_Name'])
+    keys = ['Series_Name', 'Date'] if sort_by == 'series' else ['Date', 'Series_Name']
+    return out.sort_values(keys, kind='mergesort').reset_index(drop=True)
+
+
+# Cleaned file (relative to CLEAN_DIR) -> raw source (relative to RAW_DIR), transform, params.
+# 'stream' transforms are given the source path and read it themselves.
+TRANSFORMS = {
+    'Economy/Agriculture-Sector.csv': {
+        'source': 'Economy/Agriculture-Sector.csv', 'transform': sbp_series,
+    },
+    'Economy/Export_By_Commodities.csv': {
+        'source': 'Economy/ExportByCommodities.csv', 'transform': sbp_series,
+    },
+    'Economy/Export_of_Goods_&_Services.csv': {
+        'source': 'Economy/Good&Services-Export.csv', 'transform': sbp_series,
+    },
+    'Economy/Net-balance-PKR-Exports.csv': {
+        'source': 'Economy/Net-balance-PKR-Exports.csv', 'transform': sbp_series,
+    },
+    'Economy/Net-balance-USD-Exports.csv': {
+        'source': 'Economy/Net-balance-USD-Exports.csv', 'transform': sbp_series,
+    },
+    'Economy/Services-Export.csv': {
+        'source': 'Economy/Services-Export.csv', 'transform': sbp_series, 'params': {'layout': 'name_first'},
+    },
+    'Economy/Total_Foreign_Investment.csv': {
+        'source': 'Economy/Total-Foreign-Investment.csv', 'transform': sbp_series,
+        'params': {'layout': 'name_first'},
+    },
+    'Economy/Private_Foreign_Investment.csv': {
+        'source': 'Economy/Private-Foreign-Investment.csv', 'transform': sbp_series,
+        'params': {'layout': 'name_first'},
+    },
+    'Economy/Workers_Remittance.csv': {
+        'source': "Economy/Worker's-Remittance.csv", 'transform': sbp_series, 'params': {'layout': 'name_first'},
+    },
+    'Economy/Exchange_Rates.csv': {
+        'source': 'Economy/Exchange_Rates.csv', 'transform': sbp_panel, 'params': {'sort_by': 'date'},
+    },
+    'Economy/Pakistan_Debt_and_Liabilities.csv': {
+        'source': 'Economy/dataset (3).csv', 'transform': sbp_panel,
+    },
+    'Economy/GDP_Quarterly_With_Constant_Prices.csv': {
+        'source': 'Economy/dataset (1).csv', 'transform': sbp_panel, 'params': {'status_columns': True},
+    },
+    'Economy/Pakistan-CPI_Annual.csv': {
+        'source': 'Economy/CPI_All Countries.csv', 'transform': wdi_indicator, 'stream': True,
+        'params': {'country': 'PAK', 'start': 2010, 'value_column': 'CPI_Value', 'date_last': True},
+    },
+    'Economy/WDI_GDP_Pakistan.csv': {
+        'source': 'Economy/API_NY.GDP.MKTP.CD_DS2_en_csv_v2_130122.csv', 'transform': wdi_long, 'stream': True,
+        'params': {'countries': ['PAK'], 'start': 1999},
+    },
+}
+
+
+# --- hashing and manifest ---------------------------------------------------
+
+
+def file_hash(path):
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_hash(spec):
+    """Hash of the source of a transform's module (its helpers and constants included) and its parameters"""
+    digest = hashlib.sha256()
+    digest.update(inspect.getsource(inspect.getmodule(spec['transform'])).encode())
+    digest.update(json.dumps(spec.get('params', {}), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def stale_reason(output, spec, entry, raw_dir=RAW_DIR, clean_dir=CLEAN_DIR):
+    """Why `output` must be rebuilt, or None if its manifest entry is current"""
+    out_path = os.path.join(clean_dir, output)
+    if entry is None:
+        return 'new'
+    if not os.path.exists(out_path):
+        return 'output missing'
+    if entry['input_hash'] != file_hash(os.path.join(raw_dir, spec['source'])):
+        return 'input changed'
+    if entry['code_hash'] != code_hash(spec):
+        return 'code changed'
+    if entry['output_hash'] != file_hash(out_path):
+        return 'output edited'
+    return None
+
+
+def run_transform(output, raw_dir=RAW_DIR, clean_dir=CLEAN_DIR):
+    """
+    Read, transform, validate and atomically write one output; returns its manifest entry (runs in a worker).
+
+    Raises ValidationError, without touching the published file, if the new
+    output fails validation.
+    """
+    from utils.timeseries_store import SOURCES
+
+    spec = TRANSFORMS[output]
+    source = os.path.join(raw_dir, spec['source'])
+    started = time.perf_counter()
+
+    if spec.get('stream'):
+        cleaned = spec['transform'](source, **spec.get('params', {}))
+    else:
+        raw = pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[''], encoding='utf-8-sig')
+        cleaned = spec['transform'](raw, **spec.get('params', {}))
+
+    out_path = os.path.join(clean_dir, output)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = f"{out_path}.tmp-{os.getpid()}"
+    cleaned.to_csv(tmp_path, index=False, date_format='%Y-%m-%d')
+    store_spec = SOURCES.get(os.path.join(CLEAN_DIR, output))
+    if store_spec is not None:
+        report, _ = validate_source(tmp_path, store_spec)
+        if not report['ok']:
+            os.remove(tmp_path)
+            report['source'] = out_path
+            raise ValidationError([report])
+    os.replace(tmp_path, out_path)
+
+    return {
+        'source': spec['source'],
+        'transform': spec['transform'].__name__,
+        'params': spec.get('params', {}),
+        'input_hash': file_hash(source),
+        'code_hash': code_hash(spec),
+        'output_hash': file_hash(out_path),
+        'rows': int(len(cleaned)),
+        'seconds': round(time.perf_counter() - started, 3),
+        'built_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+    }
+
+
+def run(outputs=None, force=False, workers=None, raw_dir=RAW_DIR, clean_dir=CLEAN_DIR,
+        manifest_path=MANIFEST_PATH):
+    """
+    Rebuild the stale (or, with force, all) outputs; returns {output: reason}
+    ('blocked' if invalid, 'failed' if the transform raised).
+
+    The manifest is written even if some outputs fail, so the ones that were
+    built keep their entries.
+    """
+    unknown = set(outputs or []) - set(TRANSFORMS)
+    if unknown:
+        raise ValueError(f"Unknown output(s): {', '.join(sorted(unknown))}")
+    manifest = load_manifest(manifest_path)
+
+    todo = {}
+    for output, spec in TRANSFORMS.items():
+        if outputs and output not in outputs:
+            continue
+        if not os.path.exists(os.path.join(raw_dir, spec['source'])):
+            print(f"  skip {output}: raw source {spec['source']} not found")
+            continue
+        reason = 'forced' if force else stale_reason(output, spec, manifest.get(output), raw_dir, clean_dir)
+        if reason:
+            todo[output] = reason
+
+    if todo:
+        try:
+            with ProcessPoolExecutor(max_workers=workers or min(len(todo), os.cpu_count() or 1)) as pool:
+                futures = {output: pool.submit(run_transform, output, raw_dir, clean_dir) for output in todo}
+                for output, future in futures.items():
+                    try:
+                        manifest[output] = future.result()
+                    except ValidationError as e:
+                        print(f"  BLOCKED {output}: {e}")
+                        todo[output] = 'blocked'
+                        continue
+                    except Exception as e:
+                        print(f"  FAILED {output}: {type(e).__name__}: {e}")
+                        todo[output] = 'failed'
+                        continue
+                    print(f"  built {output} ({todo[output]}): {manifest[output]['rows']} rows "
+                          f"in {manifest[output]['seconds']:.2f}s")
+        finally:
+            os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+            write_json_atomic(manifest_path, manifest)
+    blocked = sum(reason == 'blocked' for reason in todo.values())
+    failed = sum(reason == 'failed' for reason in todo.values())
+    print(f"{len(todo) - blocked - failed} rebuilt, {blocked} blocked by validation, {failed} failed, "
+          f"{len(TRANSFORMS) - len(todo)} up to date or skipped")
+    return todo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild datasets_cleaned/ from datasets_raw/")
+    parser.add_argument('outputs', nargs='*',
+                        help="Cleaned files to consider, e.g. Economy/Workers_Remittance.csv (default: all)")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if nothing changed")
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(argv)
+
+    # Accept bare names such as Workers_Remittance
+    by_stem = {os.path.splitext(os.path.basename(output))[0]: output for output in TRANSFORMS}
+    outputs = [by_stem.get(name, name) for name in args.outputs]
+    run(outputs, args.force, args.workers)
+
+
+if __name__ == '__main__':
+    main()
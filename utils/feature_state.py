@@ -0,0 +1,190 @@
+"""Streaming lag, rolling and calendar features for the multivariate exports LSTM.
+
+``FeatureState`` keeps the last few observations in a ring buffer together with
+running window sums, so appending an observation (historical or predicted)
+produces its feature row in constant time: lags are ring lookups, rolling means
+come from the running sums and rolling standard deviations are taken around
+that mean over the (fixed, small) window. Training-time feature preparation
+and the recursive forecast both stream through it, so the rows a model is
+trained on and the rows it forecasts from are built by the same code.
+
+The default spec reproduces ``prepare_advanced_features`` in the exports
+notebook; ``verify`` checks that against the original pandas implementation.
+"""
+import copy
+
+import numpy as np
+
+# (kind, argument) pairs in the column order of prepare_advanced_features
+DEFAULT_SPEC = (
+    ('lag', 1), ('lag', 3), ('lag', 6), ('lag', 12),
+    ('mean', 3), ('std', 3), ('mean', 12),
+    ('month', None), ('quarter', None),
+)
+
+_COLUMN_NAMES = {
+    'lag': 'lag_{}',
+    'mean': 'rolling_mean_{}',
+    'std': 'rolling_std_{}',
+    'month': 'month',
+    'quarter': 'quarter',
+}
+
+
+class FeatureState:
+    """
+    Feature rows for a monthly series, updated one observation at a time.
+
+    Values may be scalars or (batch,) arrays, in which case every series in the
+    batch shares the same calendar. Rolling standard deviations are sample
+    standard deviations (ddof=1), as in pandas.
+    """
+
+    def __init__(self, spec=DEFAULT_SPEC):
+        self.spec = tuple(spec)
+        self.columns = [_COLUMN_NAMES[kind].format(arg) for kind, arg in self.spec]
+        self.windows = sorted({arg for kind, arg in self.spec if kind in ('mean', 'std')})
+        lags = [arg for kind, arg in self.spec if kind == 'lag']
+        self.capacity = max([lag + 1 for lag in lags] + self.windows + [1])
+
+        self.count = 0
+        self.year = None
+        self.month = None
+        self._ring = None
+        self._pos = 0
+        self._shift = None
+        self._sums = {}
+
+    @classmethod
+    def from_series(cls, series, spec=DEFAULT_SPEC):
+        """State after streaming a date-indexed pandas Series"""
+        state = cls(spec)
+        for date, value in zip(series.index, series.values):
+            state.append(value, date)
+        return state
+
+    def _value(self, back):
+        """The observation `back` steps before the latest one"""
+        return self._ring[(self._pos - 1 - back) % self.capacity]
+
+    def append(self, value, date=None):
+        """
+        Add the next observation and return its feature row.
+
+        `date` defaults to one month after the previous observation. Features
+        without enough history yet are NaN.
+        """
+        value = np.asarray(value, dtype=np.float64)
+        if self._ring is None:
+            self._ring = np.full((self.capacity,) + value.shape, np.nan)
+            # Sums are kept relative to the first value so they do not grow with the level
+            self._shift = value.copy()
+            self._sums = {w: np.zeros(value.shape) for w in self.windows}
+
+        for w in self.windows:
+            if self.count >= w:
+                self._sums[w] -= self._value(w - 1) - self._shift
+
+        self._ring[self._pos] = value
+        self._pos = (self._pos + 1) % self.capacity
+        self.count += 1
+
+        for w in self.windows:
+            self._sums[w] += value - self._shift
+
+        if date is not None:
+            self.year, self.month = date.year, date.month
+        elif self.month is not None:
+            self.year, self.month = self.year + self.month // 12, self.month % 12 + 1
+        return self.features()
+
+    def _mean(self, window):
+        return self._sums[window] / window + self._shift
+
+    def features(self):
+        """Feature row of the latest observation, shaped value.shape + (n_features,)"""
+        shape = self._ring.shape[1:]
+        row = []
+        for kind, arg in self.spec:
+            if kind == 'lag':
+                column = self._value(arg) if self.count > arg else np.full(shape, np.nan)
+            elif kind == 'mean':
+                column = self._mean(arg) if self.count >= arg else np.full(shape, np.nan)
+            elif kind == 'std':
+                if self.count >= arg:
+                    window = self._ring[(self._pos - 1 - np.arange(arg)) % self.capacity]
+                    column = np.sqrt(np.sum((window - self._mean(arg)) ** 2, axis=0) / (arg - 1))
+                else:
+                    column = np.full(shape, np.nan)
+            elif kind == 'month':
+                column = np.full(shape, self.month / 12.0)
+            else:
+                column = np.full(shape, ((self.month - 1) // 3) / 4.0)
+            row.append(column)
+        return np.stack(row, axis=-1)
+
+    def copy(self, batch=None):
+        """Independent copy, optionally broadcast to `batch` series for batched rollouts"""
+        state = copy.deepcopy(self)
+        if batch is not None and state._ring is not None and state._ring.ndim == 1:
+            state._ring = np.repeat(state._ring[:, None], batch, axis=1)
+            state._shift = np.repeat(state._shift[None], batch)
+            state._sums = {w: np.repeat(s[None], batch) for w, s in state._sums.items()}
+        return state
+
+
+def feature_frame(series, spec=DEFAULT_SPEC):
+    """Feature rows for every observation of a date-indexed pandas Series, as a DataFrame"""
+    import pandas as pd
+
+    state = FeatureState(spec)
+    rows = np.array([state.append(value, date) for date, value in zip(series.index, series.values)])
+    return pd.DataFrame(rows.reshape(len(series), -1), index=series.index, columns=state.columns)
+
+
+def seasonal_frame(series, period=12):
+    """
+    Seasonal difference, month and time index rows (diff_value, month,
+    time_idx) of the service exports notebook; the first `period` rows,
+    which have no difference, are dropped
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        'diff_value': series.diff(period),
+        'month': series.index.month,
+        'time_idx': np.arange(len(series)),
+    }, index=series.index)
+    return frame.iloc[period:]
+
+
+def reference_features(series):
+    """The original pandas implementation of prepare_advanced_features' feature columns"""
+    import pandas as pd
+
+    features = pd.DataFrame(index=series.index)
+    for lag in [1, 3, 6, 12]:
+        features[f'lag_{lag}'] = series.shift(lag)
+    features['rolling_mean_3'] = series.rolling(window=3).mean()
+    features['rolling_std_3'] = series.rolling(window=3).std()
+    features['rolling_mean_12'] = series.rolling(window=12).mean()
+    features['month'] = series.index.month / 12.0
+    features['quarter'] = (series.index.quarter - 1) / 4.0
+    return features
+
+
+def verify(series, atol=1e-12):
+    """
+    Check the streamed features against the pandas reference for `series`.
+
+    Returns the largest absolute difference; raises AssertionError if the NaN
+    pattern differs or any value is further apart than `atol`.
+    """
+    expected = reference_features(series).to_numpy()
+    actual = feature_frame(series).to_numpy()
+    if not np.array_equal(np.isnan(expected), np.isnan(actual)):
+        raise AssertionError("Streamed features have a different NaN pattern from the pandas reference")
+    max_abs_diff = float(np.nanmax(np.abs(expected - actual)))
+    if max_abs_diff > atol:
+        raise AssertionError(f"Streamed features differ from the pandas reference by {max_abs_diff:.3e}")
+    return max_abs_diff
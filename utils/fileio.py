@@ -0,0 +1,65 @@
+"""Atomic writes and content-addressed publishing for the caches in data_processed/.
+
+Every file or directory a reader may open is written under a temporary name
+(unique per process and thread) and renamed into place, so readers see the
+old or the new content, never a partial one. Cached builds live in
+``<root>/<content hash>/`` with a ``manifest.json`` and a small JSON pointer
+naming the current hash.
+"""
+import contextlib
+import json
+import os
+import shutil
+import threading
+
+
+def tmp_path(path):
+    """A temporary name next to `path`, unique to this process and thread"""
+    return f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file and rename it over `path`"""
+    tmp = tmp_path(path)
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def pointer_path(source, cache_dir):
+    """The pointer file of `source` in `cache_dir` (<source stem>.json)"""
+    return os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(source))[0]}.json")
+
+
+def is_current(manifest_path, layout_version=None):
+    """True if a build is published at `manifest_path` (written with `layout_version`, if given)"""
+    if not os.path.exists(manifest_path):
+        return False
+    if layout_version is None:
+        return True
+    with open(manifest_path) as f:
+        return json.load(f).get('layout_version') == layout_version
+
+
+@contextlib.contextmanager
+def publish_dir(target):
+    """
+    A temporary directory to fill for `target`.
+
+    It replaces `target` when the block completes and is removed if the
+    block raises.
+    """
+    tmp_dir = tmp_path(target)
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        yield tmp_dir
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    try:
+        os.rename(tmp_dir, target)
+    except OSError:
+        # Another process published the same content first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
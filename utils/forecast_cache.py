@@ -0,0 +1,131 @@
+"""Two-tier cache for computed forecasts.
+
+A forecast is fully determined by the model's content hash, the input series,
+the horizon and any scenario parameters, so those four make the key. Entries
+are dicts of NumPy arrays (a point forecast, interval quantiles, ...). They
+live in an in-memory LRU and in ``.npz`` files under
+``data_processed/cache/forecasts`` that survive restarts, so in steady state a
+forecast is a cache read rather than a model rollout.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_DIR = 'data_processed/cache/forecasts'
+
+
+def series_hash(values, index=None):
+    """Content hash of an input series (values and, optionally, its dates)"""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    digest = hashlib.sha256()
+    digest.update(str(values.shape).encode())
+    digest.update(values.tobytes())
+    if index is not None:
+        digest.update(np.asarray(index).astype('datetime64[ns]').astype(np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def forecast_key(model_hash, input_hash, horizon, params=None):
+    """Cache key for one forecast request"""
+    payload = json.dumps(
+        {'model': model_hash, 'series': input_hash, 'horizon': int(horizon), 'params': params or {}},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ForecastCache:
+    """
+    In-memory LRU of `max_entries` forecasts backed by one .npz per key on disk.
+
+    Thread-safe, so one instance can be shared by every Streamlit session.
+    Set `cache_dir` to None for a memory-only cache.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=256):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Cached arrays for `key`, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        if self.cache_dir and os.path.exists(self._path(key)):
+            try:
+                with np.load(self._path(key), allow_pickle=False) as archive:
+                    value = {name: archive[name] for name in archive.files}
+            except (OSError, ValueError):
+                value = None  # Truncated or corrupt file: treat as a miss and rewrite
+            if value is not None:
+                with self._lock:
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store a dict of arrays under `key` in both tiers"""
+        value = {name: np.asarray(array) for name, array in value.items()}
+        with self._lock:
+            self._remember(key, value)
+        if self.cache_dir:
+            # np.savez appends .npz to names without it, so keep the suffix on the temp file
+            tmp_path = os.path.join(self.cache_dir, f".{key}.{os.getpid()}-{threading.get_ident()}.npz")
+            np.savez(tmp_path, **value)
+            os.replace(tmp_path, self._path(key))
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Cached value for `key`, calling compute() and storing its result on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        """Drop both tiers"""
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.npz'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        """Hit/miss counters and the hit rate"""
+        with self._lock:
+            requests = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / requests if requests else 0.0,
+                'entries': len(self._memory),
+            }
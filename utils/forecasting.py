@@ -0,0 +1,234 @@
+"""Batched recursive forecasting for the LSTM models in models/.
+
+The notebooks roll their models forward with one ``model.predict`` call per
+step. ``recursive_forecast`` keeps the same recursion but runs each step as a
+single compiled call over a whole batch of series or scenarios. Models loaded
+with ``utils.lstm_numpy.NumpyModel`` run the same rollout without TensorFlow.
+``mc_dropout_forecast`` samples prediction intervals the same way, with the
+Monte Carlo samples stacked into the batch.
+``undo_seasonal_difference`` turns the forecasts of seasonally differenced
+models back into levels.
+"""
+import sys
+import time
+
+import numpy as np
+
+from utils.lstm_numpy import NumpyModel
+
+
+def compile_step(model):
+    """Wrap a Keras model in a compiled single-step call (batch, look_back, features) -> (batch, 1)"""
+    if isinstance(model, NumpyModel):
+        return model.predict
+
+    import tensorflow as tf
+
+    _, look_back, n_features = model.input_shape
+    signature = [tf.TensorSpec(shape=(None, look_back, n_features), dtype=tf.float32)]
+
+    @tf.function(input_signature=signature)
+    def step(x):
+        return model(x, training=False)
+
+    return lambda x: step(tf.convert_to_tensor(x, dtype=tf.float32)).numpy()
+
+
+def as_batch(history):
+    """Coerce a (T,), (T, F) or (B, T, F) history into a float32 (B, T, F) array"""
+    window = np.asarray(history, dtype=np.float32)
+    if window.ndim == 1:
+        window = window[:, None]
+    if window.ndim == 2:
+        window = window[None, :, :]
+    if window.ndim != 3:
+        raise ValueError(f"history must be 1-, 2- or 3-dimensional, got shape {window.shape}")
+    return window
+
+
+def recursive_forecast(model, history, steps, target_index=0, exog=None, step_fn=None):
+    """
+    Forecast `steps` points ahead for every series in `history`.
+
+    Each step feeds the last `look_back` rows of every series through the model in
+    one call and writes the prediction into the target column of the next row.
+    `exog` optionally supplies the known future covariates, shaped (steps, F) or
+    (B, steps, F); its target column is overwritten by the predictions.
+
+    Returns a (B, steps) array in the model's (scaled) units.
+    """
+    step_fn = step_fn or compile_step(model)
+    window = as_batch(history)
+    batch, look_back, n_features = window.shape
+
+    # One buffer holds history and forecast so every step reads a plain slice
+    buffer = np.zeros((batch, look_back + steps, n_features), dtype=np.float32)
+    buffer[:, :look_back] = window
+    if exog is not None:
+        buffer[:, look_back:] = np.broadcast_to(np.asarray(exog, dtype=np.float32), (batch, steps, n_features))
+
+    for t in range(steps):
+        prediction = np.asarray(step_fn(buffer[:, t:t + look_back]))
+        buffer[:, look_back + t, target_index] = prediction.reshape(batch, -1)[:, 0]
+
+    return buffer[:, look_back:, target_index].copy()
+
+
+def stateful_forecast(model, history, steps, state, step_fn=None):
+    """
+    Forecast a model whose inputs are features derived from its own predictions.
+
+    `history` holds the last look_back feature rows and `state` is a
+    utils.feature_state.FeatureState positioned at the last observation. Each
+    prediction is appended to (a batched copy of) the state, whose feature row
+    becomes the next input row. Returns a (B, steps) array of predictions.
+    """
+    step_fn = step_fn or compile_step(model)
+    window = as_batch(history)
+    batch, look_back, n_features = window.shape
+    state = state.copy(batch=batch)
+
+    buffer = np.empty((batch, look_back + steps, n_features), dtype=np.float32)
+    buffer[:, :look_back] = window
+    forecasts = np.empty((batch, steps), dtype=np.float32)
+    for t in range(steps):
+        forecasts[:, t] = np.asarray(step_fn(buffer[:, t:t + look_back])).reshape(batch, -1)[:, 0]
+        buffer[:, look_back + t] = state.append(forecasts[:, t])
+    return forecasts
+
+
+def mc_dropout_forecast(model, history, steps, samples=200, quantiles=(0.05, 0.5, 0.95), target_index=0,
+                        exog=None, seed=0, transform=None):
+    """
+    Monte Carlo dropout prediction intervals for every series in `history`.
+
+    Each series is repeated `samples` times and rolled forward with dropout
+    active, so every step is still a single batched call of B * samples rows.
+    Returns a dict with 'mean' (B, steps), 'quantiles' (len(quantiles), B, steps)
+    and the 'levels' they were taken at, in the model's (scaled) units or in
+    those of `transform`, applied to every (N, steps) batch of sampled paths
+    first (path-dependent transforms such as undifferencing need this).
+    """
+    window = as_batch(history)
+    batch = window.shape[0]
+    if isinstance(model, NumpyModel):
+        if not model.has_dropout:
+            raise ValueError(f"{model.name} has no Dropout layers to sample")
+        rng = np.random.default_rng(seed)
+        step_fn = lambda x: model.predict(x, training=True, rng=rng)
+    else:
+        import tensorflow as tf
+
+        if any(type(layer).__name__ == 'BatchNormalization' for layer in model.layers):
+            # training=True would also switch BatchNormalization to batch statistics
+            raise ValueError("Export the model with utils.lstm_numpy to sample dropout past BatchNormalization")
+        tf.random.set_seed(seed)
+        _, look_back, n_features = model.input_shape
+        signature = [tf.TensorSpec(shape=(None, look_back, n_features), dtype=tf.float32)]
+        stochastic = tf.function(lambda x: model(x, training=True), input_signature=signature)
+        step_fn = lambda x: stochastic(tf.convert_to_tensor(x, dtype=tf.float32)).numpy()
+
+    if exog is not None:
+        exog = np.asarray(exog, dtype=np.float32)
+        if exog.ndim == 3:
+            exog = np.repeat(exog, samples, axis=0)
+    paths = recursive_forecast(model, np.repeat(window, samples, axis=0), steps, target_index, exog, step_fn)
+    if transform is not None:
+        paths = transform(paths)
+    paths = paths.reshape(batch, samples, steps)
+    return {
+        'mean': paths.mean(axis=1),
+        'quantiles': np.quantile(paths, quantiles, axis=1),
+        'levels': np.asarray(quantiles),
+    }
+
+
+def undo_seasonal_difference(diffs, last_season):
+    """
+    Levels of forecast seasonal differences (..., steps): each step adds its
+    difference to the level one season earlier, starting from `last_season`,
+    the last season of observed levels.
+    """
+    diffs = np.asarray(diffs, dtype=np.float64)
+    period, steps = len(last_season), diffs.shape[-1]
+    seasons = -(-steps // period)
+    padded = np.zeros(diffs.shape[:-1] + (seasons * period,))
+    padded[..., :steps] = diffs
+    levels = np.asarray(last_season, dtype=np.float64) + np.cumsum(
+        padded.reshape(diffs.shape[:-1] + (seasons, period)), axis=-2)
+    return levels.reshape(padded.shape)[..., :steps]
+
+
+def predict_loop_forecast(model, history, steps, target_index=0):
+    """Reference rollout with one model.predict call per series and step, as the notebooks do"""
+    forecasts = []
+    for window in as_batch(history):
+        current = window.copy()
+        series = []
+        for _ in range(steps):
+            next_pred = model.predict(current[None], verbose=0)[0, 0]
+            series.append(next_pred)
+            current = np.roll(current, -1, axis=0)
+            current[-1] = 0.0
+            current[-1, target_index] = next_pred
+        forecasts.append(series)
+    return np.array(forecasts, dtype=np.float32)
+
+
+def _time_ms(fn, repeats):
+    """Median wall time of fn() in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def benchmark(model, steps=12, batch_sizes=(1, 8, 64), repeats=5, seed=0):
+    """
+    Compare ms per `steps`-step forecast of the predict loop and the compiled rollout.
+
+    Returns a list of dicts, one per batch size, with the per-forecast latency of
+    each method and the resulting speed-up.
+    """
+    rng = np.random.default_rng(seed)
+    _, look_back, n_features = model.input_shape
+    step_fn = compile_step(model)
+    recursive_forecast(model, rng.random((1, look_back, n_features)), steps, step_fn=step_fn)  # trace once
+
+    results = []
+    for batch in batch_sizes:
+        history = rng.random((batch, look_back, n_features), dtype=np.float32)
+        # The predict loop is slow enough that a single pass is representative for batches
+        loop_repeats = repeats if batch == 1 else 1
+        loop_ms = _time_ms(lambda: predict_loop_forecast(model, history, steps), loop_repeats)
+        compiled_ms = _time_ms(lambda: recursive_forecast(model, history, steps, step_fn=step_fn), repeats)
+        results.append({
+            'batch': batch,
+            'predict_loop_ms': loop_ms / batch,
+            'compiled_ms': compiled_ms / batch,
+            'speedup': loop_ms / compiled_ms,
+        })
+    return results
+
+
+def main(argv=None):
+    """Benchmark the saved models: python -m utils.forecasting models/lstm_gdp_model.keras ..."""
+    from tensorflow.keras.models import load_model
+
+    paths = (argv if argv is not None else sys.argv[1:]) or [
+        'models/lstm_gdp_model.keras',
+        'models/Total_Debt_Liabilities.h5',
+        'models/service-exports.h5',
+    ]
+    for path in paths:
+        model = load_model(path, compile=False)
+        print(f"\n{path}  input={model.input_shape}")
+        print(f"{'batch':>6} {'predict loop ms':>16} {'compiled ms':>12} {'speedup':>8}")
+        for row in benchmark(model):
+            print(f"{row['batch']:>6} {row['predict_loop_ms']:>16.2f} {row['compiled_ms']:>12.3f} {row['speedup']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""Indexed columnar store for HDX indicator files.
+
+HDX publishes the World Bank education indicators for Pakistan
+(``education-indicators-for-pakistan-1.csv``) in long format: one row per
+(indicator, year) with a HXL hashtag row (``#country+name,...``) under the
+header. ``ingest`` reads such a file once, skipping the HXL row, types it
+(categorical country and indicator columns, int16 years, float64 values) and
+sorts it by indicator code and year. The result is written as an Arrow IPC
+file under ``data_processed/cache/hdx/<content hash>/``, together with an
+index of indicator codes and row offsets. An indicator's (years, values) are
+then a slice of two memory-mapped columns, so listing and plotting any of the
+~1,000 indicators never scans the file.
+
+    python -m utils.hdx_indicators              # the education indicators
+    python -m utils.hdx_indicators path/to/hdx.csv
+"""
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.etl import file_hash
+from utils.fileio import is_current, pointer_path, publish_dir, write_json_atomic
+
+CACHE_DIR = 'data_processed/cache/hdx'
+HDX_EDUCATION = 'datasets_raw/Education/education-indicators-for-pakistan-1.csv'
+
+COLUMNS = ['Country Name', 'Country ISO3', 'Year', 'Indicator Name', 'Indicator Code', 'Value']
+DTYPES = {
+    'Country Name': 'category',
+    'Country ISO3': 'category',
+    'Indicator Name': 'category',
+    'Indicator Code': 'category',
+    'Year': 'int16',
+    'Value': 'float64',
+}
+
+# Bump when the stored files change; older ingests are redone (2: unicode index, uncompressed Arrow)
+LAYOUT_VERSION = 2
+
+# Indicator code prefix -> source family, for grouping in the explorer
+SOURCES = {
+    'SE': 'World Bank education statistics',
+    'UIS': 'UNESCO Institute for Statistics',
+    'BAR': 'Barro-Lee educational attainment',
+    'SP': 'Population',
+    'SL': 'Labour force',
+    'HH': 'Household surveys (DHS/MICS)',
+}
+
+
+def has_hxl_row(path):
+    """True when the row under the header holds HXL hashtags (#country+name, ...)"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        row = next(reader, None)
+    return bool(row) and all(cell.startswith('#') for cell in row if cell)
+
+
+def read_hdx(path):
+    """Typed long-format DataFrame of an HDX indicator file, sorted by indicator code and year"""
+    df = pd.read_csv(path, skiprows=[1] if has_hxl_row(path) else None, usecols=COLUMNS, dtype=DTYPES)
+    return df.sort_values(['Indicator Code', 'Year'], kind='stable').reset_index(drop=True)
+
+
+def build_index(df):
+    """Indicator codes, their names and the row offsets of each code in `df` (sorted by code)"""
+    # Fixed-width unicode rather than object arrays, so np.load reads them without pickle
+    codes = df['Indicator Code'].to_numpy(dtype=str)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=np.int64)
+    return {
+        'codes': codes[starts],
+        'names': df['Indicator Name'].to_numpy(dtype=str)[starts],
+        'offsets': np.append(starts, len(codes)).astype(np.int64),
+    }
+
+
+def ingest(source=HDX_EDUCATION, cache_dir=CACHE_DIR):
+    """Store `source` as an indexed Arrow table unless this exact file was already ingested"""
+    digest = file_hash(source)
+    target = os.path.join(cache_dir, digest)
+    manifest_path = os.path.join(target, 'manifest.json')
+
+    if not is_current(manifest_path, LAYOUT_VERSION):
+        with publish_dir(target) as tmp_dir:
+            df = read_hdx(source)
+            index = build_index(df)
+            # Uncompressed, so the memory-mapped columns are read in place
+            df.to_feather(os.path.join(tmp_dir, 'indicators.arrow'), compression='uncompressed')
+            np.savez(os.path.join(tmp_dir, 'index.npz'), **index)
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+                json.dump({
+                    'source': source,
+                    'content_hash': digest,
+                    'layout_version': LAYOUT_VERSION,
+                    'rows': int(len(df)),
+                    'indicators': int(len(index['codes'])),
+                    'years': [int(df['Year'].min()), int(df['Year'].max())] if len(df) else None,
+                }, f, indent=2)
+
+    write_json_atomic(pointer_path(source, cache_dir), {'source': source, 'content_hash': digest})
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+class IndicatorIndex:
+    """Random access to the indicators of an ingested HDX file by code"""
+
+    def __init__(self, target):
+        import pyarrow.feather as feather
+
+        with open(os.path.join(target, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        with np.load(os.path.join(target, 'index.npz')) as index:
+            self.codes = index['codes']
+            self.names = index['names']
+            self.offsets = index['offsets']
+        table = feather.read_table(os.path.join(target, 'indicators.arrow'), columns=['Year', 'Value'],
+                                   memory_map=True)
+        self.years = table.column('Year').to_numpy()
+        self.values = table.column('Value').to_numpy()
+        self._positions = {code: i for i, code in enumerate(self.codes)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self._positions
+
+    def name(self, code):
+        return str(self.names[self._positions[code]])
+
+    def series(self, code):
+        """(years, values) of indicator `code`, oldest first; KeyError for an unknown code"""
+        i = self._positions[code]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.years[start:end], self.values[start:end]
+
+    def catalog(self):
+        """One row per indicator: code, name, source family, observations and first/last year"""
+        starts, ends = self.offsets[:-1], self.offsets[1:]
+        prefixes = pd.Series(self.codes).str.split('.').str[0]
+        return pd.DataFrame({
+            'Indicator Code': self.codes,
+            'Indicator Name': self.names,
+            'Source': prefixes.map(SOURCES).fillna('Other').values,
+            'Observations': ends - starts,
+            'First Year': self.years[starts],
+            'Last Year': self.years[ends - 1],
+        })
+
+    def frame(self, codes):
+        """Wide DataFrame (Year x indicator code) of the requested indicators"""
+        columns = {}
+        for code in codes:
+            years, values = self.series(code)
+            columns[code] = pd.Series(values, index=years)
+        frame = pd.DataFrame(columns).sort_index()
+        frame.index.name = 'Year'
+        return frame
+
+
+def load_indicators(source=HDX_EDUCATION, cache_dir=CACHE_DIR):
+    """
+    The IndicatorIndex of an ingested HDX file.
+
+    Never reads the CSV: raises FileNotFoundError if it has not been ingested
+    yet.
+    """
+    pointer = pointer_path(source, cache_dir)
+    if not os.path.exists(pointer):
+        raise FileNotFoundError(f"{source} has not been ingested; run python -m utils.hdx_indicators {source}")
+    with open(pointer) as f:
+        return IndicatorIndex(os.path.join(cache_dir, json.load(f)['content_hash']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store HDX indicator files as indexed Arrow tables")
+    parser.add_argument('sources', nargs='*', default=[HDX_EDUCATION])
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    for source in args.sources:
+        manifest = ingest(source, args.cache_dir)
+        years = manifest['years'] or ['-', '-']
+        print(f"{source}: {manifest['rows']} rows, {manifest['indicators']} indicators, "
+              f"{years[0]}-{years[1]} -> {manifest['content_hash'][:12]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Parallel hyperparameter search for the LSTM models.
+
+Trials run in a process pool, one TensorFlow runtime per worker with a pinned
+thread count, so a search uses every core instead of training configurations
+one after another. Trials are pruned by successive halving: every trial trains
+for ``min_epochs``, the best ``1 / eta`` continue for ``eta`` times as many
+epochs, and so on until each survivor reaches its own ``epochs`` budget or
+stops early. Rung results and weights are checkpointed to disk, so rerunning an
+interrupted search with the same ``checkpoint_dir`` resumes where it left off.
+
+Resumed trials restart their optimizer state at each rung; only the weights
+carry over.
+"""
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.windowing import univariate_windows
+
+# Training data for the current worker process, set by _init_worker
+_DATA = None
+
+
+class WindowedSplit:
+    """
+    Train/validation series windowed by each trial's ``look_back``.
+
+    Use this as the ``data`` argument when the look-back window is one of the
+    searched hyperparameters.
+    """
+
+    def __init__(self, train, validation):
+        self.train = np.asarray(train, dtype=np.float32)
+        self.validation = np.asarray(validation, dtype=np.float32)
+
+    def __call__(self, params):
+        look_back = params['look_back']
+        return univariate_windows(self.train, look_back) + univariate_windows(self.validation, look_back)
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def _trial_id(params):
+    return hashlib.sha1(_params_key(params).encode()).hexdigest()[:12]
+
+
+def rung_epochs(max_epochs, min_epochs, eta):
+    """Epoch budgets of the successive-halving rungs, ending at max_epochs"""
+    budgets = []
+    epochs = min_epochs
+    while epochs < max_epochs:
+        budgets.append(epochs)
+        epochs *= eta
+    budgets.append(max_epochs)
+    return budgets
+
+
+def pin_threads(threads):
+    """Pin this process's TensorFlow thread pools; call before TensorFlow runs any op"""
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _init_worker(threads, data):
+    global _DATA
+    pin_threads(threads)
+    _DATA = data
+
+
+def _run_rung(task):
+    """Train one trial from task['initial_epoch'] up to task['epochs'] and save its weights"""
+    from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+
+    params = task['params']
+    X_train, y_train, X_val, y_val = _DATA(params) if callable(_DATA) else _DATA
+
+    model = task['build_fn'](params, X_train.shape[1:])
+    if task['initial_epoch'] > 0:
+        model.load_weights(task['weights'])
+
+    callbacks = [EarlyStopping(monitor=task['monitor'], patience=task['patience'], restore_best_weights=True)]
+    if task['reduce_lr']:
+        callbacks.append(ReduceLROnPlateau(monitor='val_loss', **task['reduce_lr']))
+
+    history = model.fit(
+        X_train, y_train,
+        epochs=task['epochs'],
+        initial_epoch=task['initial_epoch'],
+        batch_size=params.get('batch_size', task['batch_size']),
+        validation_data=(X_val, y_val),
+        callbacks=callbacks,
+        verbose=0,
+        shuffle=False,  # Time series data should not be shuffled
+    )
+    model.save_weights(task['weights'])
+
+    values = history.history[task['monitor']]
+    return {
+        'key': _params_key(params),
+        'rung': task['rung'],
+        'epochs': task['initial_epoch'] + len(values),
+        'score': float(np.nanmin(values)),
+        'stopped': len(values) < task['epochs'] - task['initial_epoch'],
+        'history': {name: [float(v) for v in series] for name, series in history.history.items()},
+    }
+
+
+def _load_checkpoint(path):
+    records = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records[(record['key'], record['rung'])] = record
+    return records
+
+
+def search(build_fn, configs, data, monitor='val_loss', checkpoint_dir=None, workers=None,
+           threads_per_worker=None, min_epochs=10, eta=3, patience=20, reduce_lr=None,
+           batch_size=32, verbose=True):
+    """
+    Search `configs` in parallel with successive halving and early stopping.
+
+    `build_fn(params, input_shape)` must be importable from a module (see
+    utils.lstm_models) so worker processes can unpickle it. `data` is either an
+    (X_train, y_train, X_val, y_val) tuple or a picklable callable taking the
+    params, such as WindowedSplit. Each config's 'epochs' entry caps its
+    training; a 'batch_size' entry overrides `batch_size`.
+
+    Returns a dict with 'best_params', 'best_score', 'best_weights' and
+    'trials', one entry per config with its best score, epochs trained and
+    concatenated training history.
+    """
+    checkpoint_dir = checkpoint_dir or tempfile.mkdtemp(prefix='hp_search_')
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    log_path = os.path.join(checkpoint_dir, 'trials.jsonl')
+    records = _load_checkpoint(log_path)
+
+    cpus = os.cpu_count() or 1
+    workers = workers or min(len(configs), cpus)
+    threads_per_worker = threads_per_worker or max(1, cpus // workers)
+
+    trials = {
+        _params_key(params): {
+            'params': params,
+            'weights': os.path.join(checkpoint_dir, f"{_trial_id(params)}.weights.h5"),
+            'score': math.inf,
+            'epochs': 0,
+            'stopped': False,
+            'history': {},
+        }
+        for params in configs
+    }
+    budgets = rung_epochs(max(params.get('epochs', 100) for params in configs), min_epochs, eta)
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(threads_per_worker, data)) as pool:
+        active = list(trials)
+        for rung, budget in enumerate(budgets):
+            tasks = []
+            for key in active:
+                trial = trials[key]
+                epochs = min(budget, trial['params'].get('epochs', 100))
+                if (key, rung) in records or trial['epochs'] >= epochs:
+                    continue
+                tasks.append({
+                    'build_fn': build_fn, 'params': trial['params'], 'weights': trial['weights'],
+                    'rung': rung, 'initial_epoch': trial['epochs'], 'epochs': epochs,
+                    'monitor': monitor, 'patience': patience, 'reduce_lr': reduce_lr,
+                    'batch_size': batch_size,
+                })
+
+            with open(log_path, 'a') as log:
+                for record in pool.map(_run_rung, tasks):
+                    log.write(json.dumps(record) + '\n')
+                    log.flush()
+                    records[(record['key'], rung)] = record
+
+            for key in active:
+                record = records.get((key, rung))
+                if record is None:
+                    continue
+                trial = trials[key]
+                trial['score'] = min(trial['score'], record['score'])
+                trial['epochs'] = record['epochs']
+                trial['stopped'] = record['stopped']
+                for name, series in record['history'].items():
+                    trial['history'].setdefault(name, []).extend(series)
+
+            if verbose:
+                print(f"Rung {rung + 1}/{len(budgets)} ({budget} epochs): "
+                      + ", ".join(f"{trials[key]['params']} -> {trials[key]['score']:.6f}" for key in active))
+
+            # Keep the best 1/eta; finished trials keep their place but stop training
+            ranked = sorted(active, key=lambda key: trials[key]['score'])
+            survivors = ranked[:max(1, math.ceil(len(ranked) / eta))]
+            active = [key for key in survivors
+                      if not trials[key]['stopped'] and trials[key]['epochs'] < trials[key]['params'].get('epochs', 100)]
+            if not active:
+                break
+
+    best = min(trials.values(), key=lambda trial: trial['score'])
+    return {
+        'best_params': best['params'],
+        'best_score': best['score'],
+        'best_weights': best['weights'],
+        'trials': list(trials.values()),
+    }
+
+
+def load_best_model(build_fn, result, input_shape):
+    """Rebuild the winning configuration of `search` and load its trained weights"""
+    model = build_fn(result['best_params'], input_shape)
+    model.load_weights(result['best_weights'])
+    return model
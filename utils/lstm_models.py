@@ -0,0 +1,101 @@
+"""LSTM architectures used by the forecasting notebooks.
+
+Each builder takes a hyperparameter dict and the (timesteps, features) input
+shape and returns a compiled Keras model, so the same function can be handed
+to ``utils.hyperparameter_search.search`` and run in worker processes.
+TensorFlow is imported inside the builders to keep this module cheap to import.
+"""
+
+
+def build_simple_lstm(params, input_shape):
+    """Single LSTM layer and a linear output (GDP and Debt models)"""
+    from tensorflow.keras.layers import LSTM, Dense, Input
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+
+    model = Sequential([
+        Input(shape=input_shape),
+        LSTM(params.get('units', 50)),
+        Dense(1),
+    ])
+    model.compile(loss='mean_squared_error', optimizer=Adam(learning_rate=params.get('learning_rate', 0.001)))
+    return model
+
+
+def build_stacked_lstm(params, input_shape):
+    """Three stacked LSTM layers with dropout (univariate exports model)"""
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+
+    units = params.get('units', 50)
+    dropout_rate = params.get('dropout_rate', 0.2)
+    model = Sequential([
+        Input(shape=input_shape),
+        LSTM(units, return_sequences=True),
+        Dropout(dropout_rate),
+        LSTM(units, return_sequences=True),
+        Dropout(dropout_rate),
+        LSTM(units),
+        Dropout(dropout_rate),
+        Dense(25),
+        Dense(1),
+    ])
+    model.compile(optimizer=Adam(learning_rate=params.get('learning_rate', 0.001)), loss='mse', metrics=['mae'])
+    return model
+
+
+def build_seasonal_lstm(params, input_shape):
+    """Two LSTM layers with dropout on (diff_value, month, time_idx) rows (service exports model)"""
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+
+    units = params.get('units', 50)
+    dropout_rate = params.get('dropout_rate', 0.2)
+    model = Sequential([
+        Input(shape=input_shape),
+        LSTM(units, return_sequences=True),
+        Dropout(dropout_rate),
+        LSTM(units),
+        Dropout(dropout_rate),
+        Dense(1),
+    ])
+    model.compile(loss='mean_squared_error', optimizer=Adam(learning_rate=params.get('learning_rate', 0.001)))
+    return model
+
+
+def build_enhanced_lstm(params, input_shape):
+    """Regularised LSTM stack with batch normalisation (multivariate exports model)"""
+    from tensorflow.keras.layers import LSTM, BatchNormalization, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+    from tensorflow.keras.regularizers import l1_l2
+
+    units = params.get('units', 128)
+    dropout_rate = params.get('dropout_rate', 0.3)
+    model = Sequential([
+        Input(shape=input_shape),
+        LSTM(units, return_sequences=True, kernel_regularizer=l1_l2(l1=1e-5, l2=1e-4)),
+        BatchNormalization(),
+        Dropout(dropout_rate),
+
+        LSTM(units, return_sequences=True, kernel_regularizer=l1_l2(l1=1e-5, l2=1e-4)),
+        BatchNormalization(),
+        Dropout(dropout_rate),
+
+        LSTM(units // 2, return_sequences=False, kernel_regularizer=l1_l2(l1=1e-5, l2=1e-4)),
+        BatchNormalization(),
+        Dropout(dropout_rate),
+
+        Dense(64, activation='relu'),
+        Dropout(0.2),
+        Dense(32, activation='relu'),
+        Dense(1),
+    ])
+    model.compile(
+        optimizer=Adam(learning_rate=params.get('learning_rate', 0.0005), beta_1=0.9, beta_2=0.999),
+        loss='huber_loss',  # More robust to outliers
+        metrics=['mae', 'mse'],
+    )
+    return model
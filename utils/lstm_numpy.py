@@ -0,0 +1,337 @@
+"""TensorFlow-free inference for the LSTM models in models/.
+
+``export_model`` reads a Keras ``.h5``/``.keras`` file (this step still needs
+TensorFlow) and writes its layer configs, weights and, when given, the fitted
+MinMaxScaler into a single ``.npz`` next to it. ``NumpyModel`` loads that file
+and reproduces the Keras forward pass with NumPy alone, so the dashboard can
+serve forecasts without importing TensorFlow.
+
+    python -m utils.lstm_numpy export      # write models/*.npz
+    python -m utils.lstm_numpy parity      # compare against Keras outputs
+    python -m utils.lstm_numpy benchmark   # startup time and peak memory
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# Saved models and the scalers they were trained with
+MODELS = {
+    'lstm_gdp_model': ('models/lstm_gdp_model.keras', 'models/lstm_gdp_model.joblib'),
+    'Total_Debt_Liabilities': ('models/Total_Debt_Liabilities.h5', 'models/Total_Debt_Liabilities.pkl'),
+    'service-exports': ('models/service-exports.h5', 'models/service-exports.pkl'),
+    'export_by_com_model': ('models/export_by_com_model.h5', 'models/export_by_com_scaler.pkl'),
+}
+
+SUPPORTED_LAYERS = ('LSTM', 'Dense', 'Dropout', 'BatchNormalization')
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'relu': lambda x: np.maximum(x, 0.0),
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return ACTIVATIONS[name]
+
+
+def lstm_forward(x, kernel, recurrent_kernel, bias, return_sequences=False,
+                 activation='tanh', recurrent_activation='sigmoid'):
+    """
+    Keras LSTM forward pass over a (batch, time, features) array.
+
+    Gates are packed in Keras order (input, forget, cell, output). The input
+    projection for every time step is computed in one matrix product.
+    """
+    act = _activation(activation)
+    rec_act = _activation(recurrent_activation)
+    batch, steps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+
+    projected = x @ kernel
+    if bias is not None:
+        projected = projected + bias
+
+    h = np.zeros((batch, units), dtype=x.dtype)
+    c = np.zeros((batch, units), dtype=x.dtype)
+    outputs = np.empty((batch, steps, units), dtype=x.dtype) if return_sequences else None
+    for t in range(steps):
+        z = projected[:, t] + h @ recurrent_kernel
+        i = rec_act(z[:, :units])
+        f = rec_act(z[:, units:2 * units])
+        g = act(z[:, 2 * units:3 * units])
+        o = rec_act(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * act(c)
+        if return_sequences:
+            outputs[:, t] = h
+    return outputs if return_sequences else h
+
+
+def dense_forward(x, kernel, bias=None, activation='linear'):
+    """Keras Dense layer: activation(x @ kernel + bias)"""
+    y = x @ kernel
+    if bias is not None:
+        y = y + bias
+    return _activation(activation)(y)
+
+
+def batch_norm_forward(x, moving_mean, moving_variance, gamma=None, beta=None, epsilon=1e-3):
+    """BatchNormalization at inference time, using the moving statistics"""
+    y = (x - moving_mean) / np.sqrt(moving_variance + epsilon)
+    if gamma is not None:
+        y = y * gamma
+    if beta is not None:
+        y = y + beta
+    return y
+
+
+class NumpyModel:
+    """A Keras Sequential LSTM/Dense model evaluated with NumPy"""
+
+    def __init__(self, layers, input_shape, scaler=None, name=None):
+        self.layers = layers
+        self.input_shape = tuple(input_shape)
+        self.scaler = scaler
+        self.name = name
+
+    @classmethod
+    def load(cls, path):
+        """Load a model written by export_model"""
+        with np.load(path, allow_pickle=False) as archive:
+            config = json.loads(str(archive['config']))
+            arrays = {key: archive[key] for key in archive.files if key != 'config'}
+
+        layers = []
+        for index, layer in enumerate(config['layers']):
+            prefix = f"{index}/"
+            weights = {key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)}
+            layers.append((layer, weights))
+
+        scaler = None
+        if 'scaler/min_' in arrays:
+            scaler = {'min_': arrays['scaler/min_'], 'scale_': arrays['scaler/scale_']}
+        input_shape = tuple(None if dim is None else int(dim) for dim in config['input_shape'])
+        return cls(layers, input_shape, scaler=scaler, name=config.get('name'))
+
+    @property
+    def nbytes(self):
+        """Memory held by the weight arrays"""
+        return int(sum(value.nbytes for _, weights in self.layers for value in weights.values()))
+
+    @property
+    def has_dropout(self):
+        """True if Monte Carlo dropout can sample this model"""
+        return any(layer['class_name'] == 'Dropout' for layer, _ in self.layers)
+
+    def predict(self, x, verbose=0, training=False, rng=None):
+        """
+        Forward pass over a (batch, look_back, features) array, like keras Model.predict.
+
+        With training=True the Dropout layers drop units as during training
+        (Monte Carlo dropout), drawing masks from `rng`; everything else,
+        BatchNormalization included, stays in inference mode.
+        """
+        y = np.asarray(x, dtype=np.float32)
+        for layer, weights in self.layers:
+            kind = layer['class_name']
+            if kind == 'LSTM':
+                y = lstm_forward(
+                    y, weights['kernel'], weights['recurrent_kernel'], weights.get('bias'),
+                    return_sequences=layer['return_sequences'],
+                    activation=layer['activation'],
+                    recurrent_activation=layer['recurrent_activation'],
+                )
+            elif kind == 'Dense':
+                y = dense_forward(y, weights['kernel'], weights.get('bias'), layer['activation'])
+            elif kind == 'BatchNormalization':
+                y = batch_norm_forward(
+                    y, weights['moving_mean'], weights['moving_variance'],
+                    weights.get('gamma'), weights.get('beta'), layer['epsilon'],
+                )
+            elif kind == 'Dropout' and training and layer['rate'] > 0:
+                rng = rng if rng is not None else np.random.default_rng()
+                keep = 1.0 - layer['rate']
+                y = y * (rng.random(y.shape, dtype=np.float32) < keep) / np.float32(keep)
+            # Otherwise Dropout is the identity at inference time
+        return y
+
+    __call__ = predict
+
+    def transform(self, values):
+        """Apply the exported scaler (stored in MinMaxScaler form)"""
+        if self.scaler is None:
+            raise ValueError(f"No scaler was exported with {self.name}")
+        return np.asarray(values, dtype=np.float64) * self.scaler['scale_'] + self.scaler['min_']
+
+    def inverse_transform(self, values, column=None):
+        """Undo the exported scaler, or only that of feature `column` for values of that feature alone"""
+        if self.scaler is None:
+            raise ValueError(f"No scaler was exported with {self.name}")
+        minimum, scale = self.scaler['min_'], self.scaler['scale_']
+        if column is not None:
+            minimum, scale = minimum[column], scale[column]
+        return (np.asarray(values, dtype=np.float64) - minimum) / scale
+
+
+def _layer_config(layer):
+    """The subset of a Keras layer's config needed for the NumPy forward pass"""
+    kind = type(layer).__name__
+    if kind not in SUPPORTED_LAYERS:
+        raise ValueError(f"Layer {layer.name} ({kind}) is not supported by the NumPy runtime")
+    config = layer.get_config()
+    entry = {'class_name': kind, 'name': layer.name}
+    if kind == 'LSTM':
+        entry.update({key: config[key] for key in ('units', 'activation', 'recurrent_activation',
+                                                    'return_sequences', 'use_bias')})
+        if config.get('go_backwards') or config.get('stateful'):
+            raise ValueError(f"Layer {layer.name}: go_backwards/stateful LSTMs are not supported")
+        names = ['kernel', 'recurrent_kernel'] + (['bias'] if config['use_bias'] else [])
+    elif kind == 'Dense':
+        entry.update({key: config[key] for key in ('units', 'activation', 'use_bias')})
+        names = ['kernel'] + (['bias'] if config['use_bias'] else [])
+    elif kind == 'BatchNormalization':
+        entry['epsilon'] = config['epsilon']
+        names = ((['gamma'] if config['scale'] else []) + (['beta'] if config['center'] else [])
+                 + ['moving_mean', 'moving_variance'])
+    else:
+        entry['rate'] = config['rate']
+        names = []
+    return entry, dict(zip(names, layer.get_weights()))
+
+
+def export_model(model_path, scaler_path=None, output_path=None):
+    """
+    Write the weights of a saved Keras model (and its scaler) to a .npz file.
+
+    Returns the path of the written file, by default the model path with a
+    .npz extension.
+    """
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path, compile=False)
+    output_path = output_path or os.path.splitext(model_path)[0] + '.npz'
+
+    layers = []
+    arrays = {}
+    for index, layer in enumerate(model.layers):
+        entry, weights = _layer_config(layer)
+        layers.append(entry)
+        for name, value in weights.items():
+            arrays[f"{index}/{name}"] = np.asarray(value, dtype=np.float32)
+
+    if scaler_path and os.path.exists(scaler_path):
+        import joblib
+
+        scaler = joblib.load(scaler_path)
+        if hasattr(scaler, 'min_'):
+            arrays['scaler/min_'] = np.asarray(scaler.min_, dtype=np.float64)
+            arrays['scaler/scale_'] = np.asarray(scaler.scale_, dtype=np.float64)
+        else:
+            # StandardScaler: (x - mean) / scale == x * (1 / scale) + (-mean / scale)
+            arrays['scaler/min_'] = -np.asarray(scaler.mean_, dtype=np.float64) / scaler.scale_
+            arrays['scaler/scale_'] = 1.0 / np.asarray(scaler.scale_, dtype=np.float64)
+
+    config = {
+        'name': os.path.splitext(os.path.basename(model_path))[0],
+        'source': os.path.basename(model_path),
+        'input_shape': list(model.input_shape),
+        'layers': layers,
+    }
+    np.savez_compressed(output_path, config=np.array(json.dumps(config)), **arrays)
+    return output_path
+
+
+def check_parity(model_path, npz_path=None, samples=256, atol=1e-4, seed=0):
+    """
+    Compare Keras and NumPy outputs on random inputs in the scaled [0, 1] range.
+
+    Returns a dict with the largest absolute difference and whether it is
+    within `atol`.
+    """
+    from tensorflow.keras.models import load_model
+
+    keras_model = load_model(model_path, compile=False)
+    numpy_model = NumpyModel.load(npz_path or os.path.splitext(model_path)[0] + '.npz')
+
+    _, look_back, n_features = keras_model.input_shape
+    x = np.random.default_rng(seed).random((samples, look_back, n_features), dtype=np.float32)
+    expected = keras_model.predict(x, verbose=0)
+    actual = numpy_model.predict(x)
+    max_abs_diff = float(np.max(np.abs(expected - actual)))
+    return {'model': model_path, 'max_abs_diff': max_abs_diff, 'passed': max_abs_diff <= atol}
+
+
+# Loads a model in a fresh interpreter and reports import+load time, one
+# prediction and the peak resident memory of the process
+_STARTUP_SCRIPT = """
+import resource, sys, time
+start = time.perf_counter()
+if sys.argv[1] == 'numpy':
+    from utils.lstm_numpy import NumpyModel
+    model = NumpyModel.load(sys.argv[2])
+else:
+    from tensorflow.keras.models import load_model
+    model = load_model(sys.argv[2], compile=False)
+import numpy as np
+_, look_back, n_features = model.input_shape
+model.predict(np.zeros((1, look_back, n_features), dtype=np.float32), verbose=0)
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def startup_benchmark(model_path, npz_path=None):
+    """Seconds to first prediction and peak RSS (MB) for the Keras and NumPy runtimes"""
+    npz_path = npz_path or os.path.splitext(model_path)[0] + '.npz'
+    results = {}
+    for runtime, path in (('keras', model_path), ('numpy', npz_path)):
+        output = subprocess.run(
+            [sys.executable, '-c', _STARTUP_SCRIPT, runtime, path],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        # ru_maxrss is reported in kilobytes on Linux
+        results[runtime] = {'seconds': float(output[-2]), 'peak_mb': int(output[-1]) / 1024}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export and check the NumPy LSTM runtime")
+    parser.add_argument('command', choices=['export', 'parity', 'benchmark'])
+    parser.add_argument('models', nargs='*', help="Model names from MODELS (default: all present)")
+    args = parser.parse_args(argv)
+
+    names = args.models or [name for name, (path, _) in MODELS.items() if os.path.exists(path)]
+    for name in names:
+        model_path, scaler_path = MODELS[name]
+        if args.command == 'export':
+            print(f"{model_path} -> {export_model(model_path, scaler_path)}")
+        elif args.command == 'parity':
+            result = check_parity(model_path)
+            status = 'OK' if result['passed'] else 'MISMATCH'
+            print(f"{status:8} {model_path}  max |keras - numpy| = {result['max_abs_diff']:.2e}")
+        else:
+            result = startup_benchmark(model_path)
+            for runtime, row in result.items():
+                print(f"{model_path}  {runtime:6} {row['seconds']:6.2f} s  {row['peak_mb']:8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+"""Registry of the forecasting models in models/.
+
+Every model is described by a uniform ``manifest.json``: features, sequence
+length, scaler, training date, metrics and a content hash of its files.
+Models trained by ``train.py`` live in immutable version directories
+``models/<name>/<version>/`` and ``models/<name>/LATEST`` names the current
+one; publishing a version renames a finished directory into place and then
+replaces LATEST atomically, so a reader sees either the old or the new model,
+never a partial one. The flat notebook artifacts (``models/*.h5``, ``.keras``,
+``.pkl``, ``.joblib``) are described by ``LEGACY_MODELS`` until they are
+imported with ``python -m utils.model_registry import-legacy``.
+
+``ModelRegistry.get`` loads a model on first use, preferring the TensorFlow-free
+``.npz`` export, and keeps loaded models under a memory budget with LRU
+eviction.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.fileio import write_json_atomic
+
+MODELS_DIR = 'models'
+MANIFEST = 'manifest.json'
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Notebook artifacts saved directly into models/
+LEGACY_MODELS = {
+    'lstm_gdp_model': {
+        'model': 'lstm_gdp_model.keras',
+        'scaler': 'lstm_gdp_model.joblib',
+        'features': ['GDP'],
+        'sequence_length': 3,
+    },
+    'Total_Debt_Liabilities': {
+        'model': 'Total_Debt_Liabilities.h5',
+        'scaler': 'Total_Debt_Liabilities.pkl',
+        'features': ['Total_Debt_PKR'],
+    },
+    'service-exports': {
+        'model': 'service-exports.h5',
+        'scaler': 'service-exports.pkl',
+        'features': ['diff_value', 'month', 'time_idx'],
+        'sequence_length': 12,
+    },
+    'export_by_com_model': {
+        'model': 'export_by_com_model.h5',
+        'scaler': 'export_by_com_scaler.pkl',
+        'features': ['Value_Scaled'],
+        'sequence_length': 24,
+    },
+    'export_by_services': {
+        'model': 'export_by_services_model.h5',
+        'scaler': 'export_by_services_scaler.pkl',
+        'metadata': 'export_by_services_metadata.json',
+    },
+}
+
+
+def content_hash(paths):
+    """sha256 over the names and bytes of `paths`, in sorted order"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(name, version, directory, files, features, sequence_length, scaler_type=None,
+                   training_date=None, metrics=None, **extra):
+    """
+    Uniform manifest for a model whose `files` ({role: filename}) sit in `directory`.
+
+    Roles are 'keras', 'numpy' and 'scaler'. Extra keyword arguments (params,
+    data_hash, ...) are stored alongside the standard fields.
+    """
+    manifest = {
+        'name': name,
+        'version': version,
+        'model_type': 'LSTM',
+        'files': files,
+        'features': list(features or []),
+        'sequence_length': sequence_length,
+        'scaler': {'type': scaler_type, 'file': files.get('scaler')} if files.get('scaler') else None,
+        'training_date': training_date,
+        'metrics': metrics or {},
+        'content_hash': content_hash([os.path.join(directory, f) for f in files.values()]),
+        'created_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    manifest.update(extra)
+    return manifest
+
+
+def publish(models_dir, name, staging_dir, version):
+    """
+    Move a finished staging directory to models/<name>/<version> and make it current.
+
+    The version directory is renamed into place whole and LATEST is replaced
+    atomically afterwards, so readers never observe a partial model.
+    """
+    model_dir = os.path.join(models_dir, name)
+    os.makedirs(model_dir, exist_ok=True)
+    os.rename(staging_dir, os.path.join(model_dir, version))
+
+    tmp_path = os.path.join(model_dir, f".LATEST.tmp-{os.getpid()}")
+    with open(tmp_path, 'w') as f:
+        f.write(version + '\n')
+    os.replace(tmp_path, os.path.join(model_dir, 'LATEST'))
+    return os.path.join(model_dir, version)
+
+
+def _legacy_npz(spec):
+    """Where `python -m utils.lstm_numpy export` puts the NumPy export of a legacy model"""
+    return os.path.splitext(spec['model'])[0] + '.npz'
+
+
+def _model_nbytes(model):
+    """Approximate resident size of a loaded model's weights"""
+    if hasattr(model, 'nbytes'):
+        return model.nbytes
+    return int(sum(np.asarray(w).nbytes for w in model.get_weights()))
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, memory-bounded view of the models in `root`.
+
+    Thread-safe, so one instance can be shared by every Streamlit session
+    (e.g. through st.cache_resource).
+    """
+
+    def __init__(self, root=MODELS_DIR, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.root = root
+        self.memory_budget = memory_budget
+        self._loaded = OrderedDict()  # name -> (version, model, nbytes)
+        self._legacy_manifests = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    # --- manifests -------------------------------------------------------
+
+    def _latest_version(self, name):
+        try:
+            with open(os.path.join(self.root, name, 'LATEST')) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _legacy_manifest(self, name):
+        spec = LEGACY_MODELS[name]
+        files = {}
+        for role, filename in (('keras', spec['model']), ('numpy', _legacy_npz(spec)), ('scaler', spec['scaler'])):
+            if os.path.exists(os.path.join(self.root, filename)):
+                files[role] = filename
+        if 'keras' not in files and 'numpy' not in files:
+            return None
+        model_path = os.path.join(self.root, files.get('numpy', files.get('keras')))
+
+        # Hashing the files is the expensive part; redo it only when they change
+        stamp = tuple(sorted((f, os.path.getmtime(os.path.join(self.root, f))) for f in files.values()))
+        cached = self._legacy_manifests.get(name)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        metadata = {}
+        if spec.get('metadata') and os.path.exists(os.path.join(self.root, spec['metadata'])):
+            with open(os.path.join(self.root, spec['metadata'])) as f:
+                metadata = json.load(f)
+
+        sequence_length = spec.get('sequence_length', metadata.get('sequence_length'))
+        if sequence_length is None and 'numpy' in files:
+            from utils.lstm_numpy import NumpyModel
+
+            sequence_length = NumpyModel.load(os.path.join(self.root, files['numpy'])).input_shape[1]
+
+        modified = datetime.date.fromtimestamp(os.path.getmtime(model_path)).isoformat()
+        manifest = build_manifest(
+            name, 'legacy', self.root, files,
+            features=spec.get('features', metadata.get('feature_columns')),
+            sequence_length=sequence_length,
+            training_date=metadata.get('last_training_date', modified),
+            metrics=metadata.get('performance_metrics'),
+        )
+        self._legacy_manifests[name] = (stamp, manifest)
+        return manifest
+
+    def directory(self, name):
+        """Directory holding the current files of `name`"""
+        version = self._latest_version(name)
+        return os.path.join(self.root, name, version) if version else self.root
+
+    def manifest(self, name):
+        """Manifest of the current version of `name`; KeyError if there is none"""
+        version = self._latest_version(name)
+        if version:
+            with open(os.path.join(self.root, name, version, MANIFEST)) as f:
+                return json.load(f)
+        if name in LEGACY_MODELS:
+            manifest = self._legacy_manifest(name)
+            if manifest:
+                return manifest
+        raise KeyError(f"No model named {name!r} in {self.root}")
+
+    def names(self):
+        """Models with a published version or a legacy artifact present"""
+        versioned = {
+            entry for entry in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, entry, 'LATEST'))
+        } if os.path.isdir(self.root) else set()
+        legacy = {name for name, spec in LEGACY_MODELS.items()
+                  if any(os.path.exists(os.path.join(self.root, f)) for f in (spec['model'], _legacy_npz(spec)))}
+        return sorted(versioned | legacy)
+
+    def has_numpy_runtime(self, name):
+        """True if `name` can be served without importing TensorFlow"""
+        try:
+            return 'numpy' in self.manifest(name)['files']
+        except KeyError:
+            return False
+
+    # --- loading ---------------------------------------------------------
+
+    def _load(self, name, manifest):
+        directory = self.directory(name)
+        files = manifest['files']
+        if 'numpy' in files:
+            from utils.lstm_numpy import NumpyModel
+
+            return NumpyModel.load(os.path.join(directory, files['numpy']))
+        from tensorflow.keras.models import load_model
+
+        return load_model(os.path.join(directory, files['keras']), compile=False)
+
+    def get(self, name):
+        """
+        The current model for `name`, loading it on first use.
+
+        A newer published version replaces the resident one on the next call.
+        Least recently used models are evicted to stay within memory_budget.
+        """
+        version = self._latest_version(name) or 'legacy'
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry and entry[0] == version:
+                self._loaded.move_to_end(name)
+                return entry[1]
+
+        manifest = self.manifest(name)
+        model = self._load(name, manifest)
+        nbytes = _model_nbytes(model)
+
+        with self._lock:
+            self._loaded[name] = (manifest['version'], model, nbytes)
+            self._loaded.move_to_end(name)
+            self.loads += 1
+            while self.memory_used > self.memory_budget and len(self._loaded) > 1:
+                self._loaded.popitem(last=False)
+                self.evictions += 1
+        return model
+
+    @property
+    def memory_used(self):
+        return sum(nbytes for _, _, nbytes in self._loaded.values())
+
+    def stats(self):
+        """Resident models and memory accounting"""
+        with self._lock:
+            return {
+                'resident': {name: {'version': version, 'bytes': nbytes}
+                             for name, (version, _, nbytes) in self._loaded.items()},
+                'memory_used': self.memory_used,
+                'memory_budget': self.memory_budget,
+                'loads': self.loads,
+                'evictions': self.evictions,
+            }
+
+
+def import_legacy(models_dir=MODELS_DIR):
+    """Copy the flat notebook artifacts into versioned directories with manifests"""
+    registry = ModelRegistry(models_dir)
+    imported = []
+    for name in LEGACY_MODELS:
+        if registry._latest_version(name):
+            continue
+        manifest = registry._legacy_manifest(name)
+        if manifest is None:
+            continue
+
+        version = f"{manifest['content_hash'][:12]}"
+        staging_dir = os.path.join(models_dir, name, f".{version}.tmp")
+        os.makedirs(staging_dir, exist_ok=True)
+        files = {}
+        for role, filename in manifest['files'].items():
+            target = {'keras': 'model', 'numpy': 'model', 'scaler': 'scaler'}[role] + os.path.splitext(filename)[1]
+            shutil.copy2(os.path.join(models_dir, filename), os.path.join(staging_dir, target))
+            files[role] = target
+
+        extra = {key: manifest[key] for key in ('training_date', 'metrics')}
+        new_manifest = build_manifest(name, version, staging_dir, files, manifest['features'],
+                                      manifest['sequence_length'], **extra)
+        write_json_atomic(os.path.join(staging_dir, MANIFEST), new_manifest)
+        publish(models_dir, name, staging_dir, version)
+        imported.append(name)
+    return imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the model registry")
+    parser.add_argument('command', choices=['list', 'import-legacy'])
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == 'import-legacy':
+        for name in import_legacy(args.models_dir):
+            print(f"imported {name}")
+        return
+
+    registry = ModelRegistry(args.models_dir)
+    for name in registry.names():
+        manifest = registry.manifest(name)
+        print(f"{name:<24} {manifest['version']:<24} seq={manifest['sequence_length']} "
+              f"trained={manifest['training_date']} hash={manifest['content_hash'][:12]} "
+              f"runtime={'numpy' if 'numpy' in manifest['files'] else 'keras'}")
+
+
+if __name__ == '__main__':
+    main()
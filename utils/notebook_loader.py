@@ -1,46 +1,308 @@
 import requests
+import argparse
+import glob
+import io
 import json
+import re
+import threading
 import pandas as pd
-import pickle
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.artifact_store import ArtifactStore
+from utils.etl import file_hash
+from utils.fileio import write_json_atomic
+
+NOTEBOOKS_DIR = 'notebooks'
+NOTEBOOK_CACHE_DIR = 'data_processed/cache/notebooks'
+NOTEBOOK_FIGURES = 'saved_plots/notebook_forecasts.json'
+FETCH_STATE = os.path.join(NOTEBOOK_CACHE_DIR, 'fetch_state.json')
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = (5, 60)  # connect, read (seconds)
+FETCH_CHUNK_SIZE = 1 << 16
+INDEX_VERSION = 2  # bump when the index layout changes
+
+PLOTLY_CALL = re.compile(r'Plotly\.newPlot\(\s*"[^"]*",\s*')
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_session = None
+_session_lock = threading.Lock()
+
+def fetch_session(pool_size=FETCH_WORKERS):
+    """requests.Session with a connection pool for `pool_size` threads and retries on transient errors"""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def _shared_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = fetch_session()
+        return _session
+
+def _load_fetch_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def fetch_notebook(url, local_path, session=None, state=None, timeout=FETCH_TIMEOUT):
+    """
+    Fetch `url` into `local_path`; returns 'downloaded' or 'not-modified'.
+
+    `state` maps URLs to the ETag and Last-Modified of their last download and
+    is updated in place. They are sent back as If-None-Match and
+    If-Modified-Since while the local copy still has the hash it was saved
+    with, so an unchanged source costs one 304; a 304 to an unconditional
+    request raises requests.HTTPError. The body is streamed to a
+    temporary file next to `local_path` and renamed into place.
+    """
+    session = session or _shared_session()
+    state = {} if state is None else state
+    known = state.get(url)
+    headers = {}
+    if known and known.get('path') == local_path and os.path.exists(local_path) \
+            and file_hash(local_path) == known.get('content_hash'):
+        if known.get('etag'):
+            headers['If-None-Match'] = known['etag']
+        if known.get('last_modified'):
+            headers['If-Modified-Since'] = known['last_modified']
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            # Only a conditional request for a cached copy can be answered with "not modified"
+            if headers and os.path.exists(local_path):
+                return 'not-modified'
+            raise requests.HTTPError(f"304 Not Modified for {url} without a cached copy", response=response)
+        response.raise_for_status()
+
+        directory = os.path.dirname(local_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f".{os.path.basename(local_path)}.tmp-{os.getpid()}-{threading.get_ident()}")
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(tmp_path, local_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    state[url] = {
+        'path': local_path,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_hash': file_hash(local_path),
+    }
+    return 'downloaded'
+
+def fetch_notebooks(targets, workers=FETCH_WORKERS, session=None, state_path=FETCH_STATE, timeout=FETCH_TIMEOUT):
+    """
+    Fetch {url: local_path} concurrently over one pooled session.
+
+    Returns {url: 'downloaded' | 'not-modified' | 'failed: <reason>'}; one
+    failing URL does not stop the others. Validators are kept in `state_path`.
+    """
+    targets = dict(targets)
+    if not targets:
+        return {}
+    session = session or _shared_session()
+    state = _load_fetch_state(state_path)
+    state_lock = threading.Lock()
+
+    def fetch(url):
+        with state_lock:
+            entry = dict(state[url]) if url in state else None
+        local = {url: entry} if entry else {}
+        try:
+            status = fetch_notebook(url, targets[url], session, local, timeout)
+        except (requests.RequestException, OSError) as e:
+            return f"failed: {e}"
+        with state_lock:
+            if url in local:
+                state[url] = local[url]
+        return status
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(targets)))) as pool:
+        results = dict(zip(targets, pool.map(fetch, targets)))
+
+    os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+    write_json_atomic(state_path, state)
+    return results
 
 def download_notebook_from_url(url, local_path):
     """Download a notebook from a URL (GitHub, Google Colab, etc.)"""
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        with open(local_path, 'w') as f:
-            f.write(response.text)
-        
-        return True
-    except Exception as e:
-        print(f"Error downloading notebook: {e}")
+    status = fetch_notebooks({url: local_path})[url]
+    if status.startswith('failed'):
+        print(f"Error downloading notebook: {status[len('failed: '):]}")
         return False
+    return True
+
+def _cell_id(cell, position, seen=()):
+    """
+    nbformat 4.5 id, else the id Colab or Deepnote keep in the cell metadata;
+    'cell-<position>' when the cell has none or repeats one in `seen`
+    """
+    metadata = cell.get('metadata', {})
+    cell_id = cell.get('id') or metadata.get('id') or metadata.get('cell_id')
+    return cell_id if cell_id and cell_id not in seen else f"cell-{position}"
+
+def _text(value):
+    return ''.join(value) if isinstance(value, list) else (value or '')
+
+def plotly_figures_in_html(html):
+    """Figure dicts ({'data', 'layout'}) of every Plotly.newPlot call embedded in an HTML output"""
+    decoder = json.JSONDecoder()
+    figures = []
+    for match in PLOTLY_CALL.finditer(html):
+        try:
+            data, end = decoder.raw_decode(html, match.end())
+            rest = html[end:].lstrip()
+            layout = decoder.raw_decode(rest[1:].lstrip())[0] if rest.startswith(',') else {}
+        except ValueError:
+            continue
+        figures.append({'data': data, 'layout': layout})
+    return figures
+
+def figure_title(figure):
+    title = figure['layout'].get('title', '')
+    title = title.get('text', '') if isinstance(title, dict) else title
+    return re.sub(r'<[^>]+>', ' ', title or '').split('  ')[0].strip()
+
+def build_notebook_index(notebook):
+    """
+    Index of a parsed notebook: every cell in notebook order (id, type,
+    source, outputs) plus the Plotly figures and DataFrame HTML tables found
+    in their outputs. Cell ids are unique within the index.
+    """
+    index = {'version': INDEX_VERSION, 'cells': [], 'figures': [], 'tables': []}
+    seen = set()
+    for position, cell in enumerate(notebook['cells']):
+        cell_id = _cell_id(cell, position, seen)
+        seen.add(cell_id)
+        outputs = cell.get('outputs', [])
+        index['cells'].append({
+            'id': cell_id,
+            'position': position,
+            'cell_type': cell['cell_type'],
+            'source': _text(cell['source']),
+            'execution_count': cell.get('execution_count'),
+            'outputs': outputs,
+        })
+        for output in outputs:
+            html = _text(output.get('data', {}).get('text/html'))
+            if not html:
+                continue
+            for figure in plotly_figures_in_html(html):
+                index['figures'].append(dict(figure, cell_id=cell_id, title=figure_title(figure)))
+            if 'class="dataframe"' in html:
+                index['tables'].append({'cell_id': cell_id, 'html': html})
+    return index
+
+def notebook_index(notebook_path, cache_dir=NOTEBOOK_CACHE_DIR):
+    """
+    The index of a notebook, parsing it at most once per content hash.
+
+    Kept in memory per (mtime, size) and on disk under cache_dir/<hash>.json.
+    """
+    stat = os.stat(notebook_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _indexes_lock:
+        entry = _indexes.get(notebook_path)
+        if entry and entry[0] == stamp:
+            return entry[1]
+
+    digest = file_hash(notebook_path)
+    cache_path = os.path.join(cache_dir, f"{digest}.json")
+    index = None
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            index = json.load(f)
+        if index.get('version') != INDEX_VERSION:
+            index = None
+    if index is None:
+        with open(notebook_path, 'r', encoding='utf-8') as f:
+            index = build_notebook_index(json.load(f))
+        index['content_hash'] = digest
+        os.makedirs(cache_dir, exist_ok=True)
+        write_json_atomic(cache_path, index)
+
+    with _indexes_lock:
+        _indexes[notebook_path] = (stamp, index)
+    return index
 
 def extract_code_from_notebook(notebook_path):
     """Extract Python code from a Jupyter notebook"""
-    with open(notebook_path, 'r') as f:
-        notebook = json.load(f)
-    
-    code_cells = []
-    for cell in notebook['cells']:
-        if cell['cell_type'] == 'code':
-            code_cells.append(''.join(cell['source']))
-    
-    return code_cells
+    cells = notebook_index(notebook_path)['cells']
+    return [cell['source'] for cell in cells if cell['cell_type'] == 'code']
 
 def load_notebook_outputs(notebook_path):
     """Extract outputs from notebook cells"""
-    with open(notebook_path, 'r') as f:
-        notebook = json.load(f)
-    
-    outputs = []
-    for cell in notebook['cells']:
-        if cell['cell_type'] == 'code' and 'outputs' in cell:
-            outputs.append(cell['outputs'])
-    
-    return outputs
+    cells = notebook_index(notebook_path)['cells']
+    return [cell['outputs'] for cell in cells if cell['cell_type'] == 'code']
+
+def notebook_tables(notebook_path, cell_id=None):
+    """DataFrames displayed by a notebook (optionally one cell), parsed from their HTML"""
+    tables = notebook_index(notebook_path)['tables']
+    return [frame for table in tables if cell_id in (None, table['cell_id'])
+            for frame in pd.read_html(io.StringIO(table['html']))]
+
+def is_forecast_figure(figure):
+    names = [trace.get('name') or '' for trace in figure['data']]
+    return any('forecast' in text.lower() for text in [figure['title']] + names)
+
+def publish_forecast_figures(notebook_paths=None, figures_dir='saved_plots', manifest_path=NOTEBOOK_FIGURES):
+    """
+    Save every forecast figure of the notebooks to the dashboard's figure store.
+
+    Figures are named <notebook>__<cell id>_<n>; notebooks whose content hash
+    is unchanged since the last publish are skipped. Returns the manifest.
+    """
+    import plotly.graph_objects as go
+
+    from utils.plot_loader import save_plotly_figure
+
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    for notebook_path in notebook_paths or sorted(glob.glob(os.path.join(NOTEBOOKS_DIR, '*.ipynb'))):
+        index = notebook_index(notebook_path)
+        published = {name: entry for name, entry in manifest.items() if entry['notebook'] == notebook_path}
+        if published and all(entry['content_hash'] == index['content_hash'] for entry in published.values()):
+            continue
+        for name in published:
+            del manifest[name]
+
+        stem = re.sub(r'[^0-9A-Za-z]+', '_', os.path.splitext(os.path.basename(notebook_path))[0])
+        counts = {}
+        for figure in index['figures']:
+            n = counts[figure['cell_id']] = counts.get(figure['cell_id'], -1) + 1
+            if not is_forecast_figure(figure):
+                continue
+            name = f"{stem}__{re.sub(r'[^0-9A-Za-z]+', '_', figure['cell_id'])}_{n}"
+            fig = go.Figure({'data': figure['data'], 'layout': figure['layout']}, skip_invalid=True)
+            manifest[name] = {
+                'notebook': notebook_path,
+                'cell_id': figure['cell_id'],
+                'title': figure['title'],
+                'path': save_plotly_figure(fig, name, figures_dir=figures_dir),
+                'content_hash': index['content_hash'],
+            }
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    write_json_atomic(manifest_path, manifest)
+    return manifest
 
 # Example usage functions
 def download_colab_notebook(colab_url, local_path):
@@ -63,18 +325,53 @@ def download_github_notebook(github_url, local_path):
     
     return download_notebook_from_url(github_url, local_path)
 
-def save_processed_data(data, filename):
-    """Save processed data from notebook"""
-    if isinstance(data, pd.DataFrame):
-        data.to_csv(f"data_processed/{filename}.csv", index=False)
-    else:
-        with open(f"data_processed/{filename}.pkl", 'wb') as f:
-            pickle.dump(data, f)
-
-def load_processed_data(filename, data_type='csv'):
-    """Load processed data"""
-    if data_type == 'csv':
-        return pd.read_csv(f"data_processed/{filename}.csv")
-    else:
-        with open(f"data_processed/{filename}.pkl", 'rb') as f:
-            return pickle.load(f)
\ No newline at end of file
+def save_processed_data(data, filename, metadata=None):
+    """Save processed data from notebook as a new version in the artifact store"""
+    return ArtifactStore().put(filename, data, metadata)
+
+def load_processed_data(filename, data_type='csv', version=None):
+    """
+    Load processed data (the latest version unless `version` is given).
+
+    `data_type` is kept for existing callers; the stored artifact knows its own
+    type. Data saved as data_processed/{filename}.csv before the artifact store
+    existed is still read from the CSV.
+    """
+    store = ArtifactStore()
+    if store.latest(filename) is None and version is None:
+        legacy_path = f"data_processed/{filename}.csv"
+        if os.path.exists(legacy_path):
+            return pd.read_csv(legacy_path)
+    return store.get(filename, version)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch and index notebooks and publish their forecast figures")
+    parser.add_argument('command', choices=['fetch', 'index', 'publish'])
+    parser.add_argument('notebooks', nargs='*',
+                        help=f"Notebooks (default: {NOTEBOOKS_DIR}/*.ipynb), or URLs to fetch into {NOTEBOOKS_DIR}/")
+    parser.add_argument('--workers', type=int, default=FETCH_WORKERS)
+    args = parser.parse_args(argv)
+
+    if args.command == 'fetch':
+        targets = {url: os.path.join(NOTEBOOKS_DIR, os.path.basename(url.split('?')[0]))
+                   for url in args.notebooks}
+        results = fetch_notebooks(targets, workers=args.workers)
+        for url, status in results.items():
+            print(f"{status:<14} {url}")
+        if any(status.startswith('failed') for status in results.values()):
+            raise SystemExit(1)
+        return
+
+    paths = args.notebooks or sorted(glob.glob(os.path.join(NOTEBOOKS_DIR, '*.ipynb')))
+    if args.command == 'publish':
+        for name, entry in publish_forecast_figures(paths).items():
+            print(f"{name:<48} {entry['title']}")
+        return
+
+    for path in paths:
+        index = notebook_index(path)
+        print(f"{path}: {len(index['cells'])} cells, {len(index['figures'])} figures, "
+              f"{len(index['tables'])} tables ({index['content_hash'][:12]})")
+
+if __name__ == '__main__':
+    main()
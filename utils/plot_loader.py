@@ -1,45 +1,193 @@
+"""Saved Plotly figures for the dashboard.
+
+Each figure is written once, as compact Plotly JSON in ``saved_plots/<name>.json``
+(or ``.json.gz`` with ``compress=True``). Numeric arrays are stored as Plotly
+typed arrays (``{"dtype": "f8", "bdata": <base64>}``, the encoding plotly.js
+reads natively) instead of lists of decimal strings. HTML and images are derived
+from it only when asked for. Loaded figures are cached in memory and re-read
+only when the file's mtime or size changes, and every write goes through a
+temporary file and a rename, so a reader never sees a partial figure.
+"""
+import base64
+import gzip
+import json
+import os
+import threading
+
+import numpy as np
 import plotly.graph_objects as go
 import plotly.io as pio
-import pickle
-import json
 import streamlit as st
+from plotly.utils import PlotlyJSONEncoder
+
+from utils.fileio import write_json_atomic
+
+FIGURES_DIR = 'saved_plots'
+ANALYSIS_RESULTS = 'saved_analysis/economic_analysis_results.json'
+
+TYPED_ARRAY_MIN = 8  # shorter numeric lists stay plain JSON
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+# --- typed arrays ----------------------------------------------------------------
+
+
+def _typed(array):
+    array = np.asarray(array)
+    if array.dtype.kind in 'iu' and array.size and np.abs(array).max() < 2 ** 31:
+        array = array.astype('<i4')
+    else:
+        array = array.astype('<f8')
+    encoded = {'dtype': array.dtype.str[1:], 'bdata': base64.b64encode(array.tobytes()).decode('ascii')}
+    if array.ndim > 1:
+        encoded['shape'] = ','.join(str(n) for n in array.shape)
+    return encoded
+
+
+def _numeric_kind(value):
+    """'i' or 'f' for a (possibly nested, rectangular) list of numbers and None gaps, else None"""
+    if not isinstance(value, list) or len(value) < TYPED_ARRAY_MIN:
+        return None
+    items = value
+    if all(isinstance(row, list) for row in value):
+        if len({len(row) for row in value}) != 1:
+            return None
+        items = [item for row in value for item in row]
+    kind = None
+    for item in items:
+        if item is None or isinstance(item, float):
+            kind = 'f'
+        elif isinstance(item, int) and not isinstance(item, bool):
+            kind = kind or 'i'
+        else:
+            return None
+    return kind if any(item is not None for item in items) else None
+
+
+def encode_typed_arrays(obj):
+    """Copy of a figure dict with numeric arrays and long numeric lists as typed arrays"""
+    if isinstance(obj, dict):
+        return {key: encode_typed_arrays(value) for key, value in obj.items()}
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in 'iuf' and obj.size >= TYPED_ARRAY_MIN:
+        return _typed(obj)
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        values = obj.tolist() if isinstance(obj, np.ndarray) else list(obj)
+        kind = _numeric_kind(values)
+        if kind:
+            return _typed(np.array(values, dtype=np.int64 if kind == 'i' else np.float64))
+        return [encode_typed_arrays(value) for value in values]
+    return obj
+
+
+def decode_typed_arrays(obj):
+    """Figure dict with every typed array replaced by a NumPy array"""
+    if isinstance(obj, dict):
+        if 'bdata' in obj and 'dtype' in obj:
+            array = np.frombuffer(base64.b64decode(obj['bdata']), dtype=np.dtype(obj['dtype']).newbyteorder('<'))
+            if obj.get('shape'):
+                array = array.reshape([int(n) for n in str(obj['shape']).split(',')])
+            return array
+        return {key: decode_typed_arrays(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [decode_typed_arrays(value) for value in obj]
+    return obj
+
+
+# --- saving and loading ----------------------------------------------------------
+
+
+def figure_path(filename, figures_dir=FIGURES_DIR):
+    """The canonical file of a saved figure (compressed if that is what exists)"""
+    base = os.path.join(figures_dir, filename)
+    return f"{base}.json.gz" if os.path.exists(f"{base}.json.gz") else f"{base}.json"
+
+
+def save_plotly_figure(fig, filename, compress=False, figures_dir=FIGURES_DIR):
+    """Save a Plotly figure once, atomically, in the canonical JSON format; returns its path"""
+    os.makedirs(figures_dir, exist_ok=True)
+    payload = json.dumps(encode_typed_arrays(fig.to_dict()), cls=PlotlyJSONEncoder, separators=(',', ':'))
+    base = os.path.join(figures_dir, filename)
+    path = f"{base}.json.gz" if compress else f"{base}.json"
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    if compress:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(payload)
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+    os.replace(tmp_path, path)
+
+    # Keep a single canonical file per figure
+    other = f"{base}.json" if compress else f"{base}.json.gz"
+    if os.path.exists(other):
+        os.remove(other)
+    return path
+
+
+def _cached(path, key, build):
+    """build() cached per (path, key) until the file's mtime or size changes"""
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        entry = _cache.get((path, key))
+        if entry and entry[0] == stamp:
+            return entry[1]
+    value = build()
+    with _cache_lock:
+        _cache[(path, key)] = (stamp, value)
+    return value
+
+
+def _read_figure(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return go.Figure(decode_typed_arrays(json.load(f)))
+
+
+def load_figure(path):
+    """The figure stored at `path`, parsed once per version of the file (treat it as read-only)"""
+    return _cached(path, 'figure', lambda: _read_figure(path))
+
+
+def figure_html(path, include_plotlyjs='cdn'):
+    """Standalone HTML for the figure at `path`, derived on demand and cached with it"""
+    return _cached(path, f'html:{include_plotlyjs}',
+                   lambda: pio.to_html(load_figure(path), include_plotlyjs=include_plotlyjs, full_html=True))
+
+
+def export_figure(filename, output_path, figures_dir=FIGURES_DIR):
+    """Write a derived format (.html, or .png/.svg/.pdf via kaleido) of a saved figure atomically"""
+    path = figure_path(filename, figures_dir)
+    root, extension = os.path.splitext(output_path)
+    tmp_path = f"{root}.tmp-{os.getpid()}{extension}"
+    if extension == '.html':
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(figure_html(path, include_plotlyjs=True))
+    else:
+        load_figure(path).write_image(tmp_path)
+    os.replace(tmp_path, output_path)
+    return output_path
 
-def save_plotly_figure(fig, filename):
-    """Save a Plotly figure for later use in Streamlit"""
-    # Save as JSON
-    fig.write_json(f"saved_plots/{filename}.json")
-    
-    # Save as HTML (for embedding)
-    fig.write_html(f"saved_plots/{filename}.html")
-    
-    # Save as pickle (preserves all properties)
-    with open(f"saved_plots/{filename}.pkl", 'wb') as f:
-        pickle.dump(fig, f)
 
 def load_plotly_figure(filename, format='json'):
-    """Load a saved Plotly figure"""
-    try:
-        if format == 'json':
-            with open(f"saved_plots/{filename}.json", 'r') as f:
-                fig_dict = json.load(f)
-            return go.Figure(fig_dict)
-        
-        elif format == 'pickle':
-            with open(f"saved_plots/{filename}.pkl", 'rb') as f:
-                return pickle.load(f)
-        
-        elif format == 'html':
-            with open(f"saved_plots/{filename}.html", 'r') as f:
-                return f.read()
-    
-    except Exception as e:
-        st.error(f"Error loading plot: {e}")
+    """Load a saved Plotly figure ('json'), or its HTML ('html')"""
+    path = figure_path(filename)
+    if not os.path.exists(path):
+        st.error(f"Error loading plot: {path} not found")
         return None
+    if format == 'json':
+        return load_figure(path)
+    if format == 'html':
+        return figure_html(path)
+    raise ValueError(f"Unknown format {format!r}: figures are stored as JSON and can be loaded as 'json' or 'html'")
+
 
 def display_saved_plot(filename, format='json'):
     """Display a saved plot in Streamlit"""
     fig = load_plotly_figure(filename, format)
-    
+
     if fig is not None:
         if format == 'html':
             st.components.v1.html(fig, height=600)
@@ -51,7 +199,7 @@ def display_saved_plot(filename, format='json'):
 # Example: Save notebook outputs
 def save_notebook_analysis_results():
     """Example function to save analysis results from notebooks"""
-    
+
     # This would be your notebook analysis results
     results = {
         'gdp_forecast': [400, 420, 440, 460, 480],  # Example forecast
@@ -63,17 +211,16 @@ def save_notebook_analysis_results():
             "Seasonal patterns detected in monthly data"
         ]
     }
-    
+
     # Save results
-    with open('saved_analysis/economic_analysis_results.pkl', 'wb') as f:
-        pickle.dump(results, f)
-    
+    os.makedirs(os.path.dirname(ANALYSIS_RESULTS), exist_ok=True)
+    write_json_atomic(ANALYSIS_RESULTS, results)
+
     return results
 
 def load_notebook_analysis_results():
     """Load saved analysis results"""
-    try:
-        with open('saved_analysis/economic_analysis_results.pkl', 'rb') as f:
-            return pickle.load(f)
-    except:
-        return None
\ No newline at end of file
+    if not os.path.exists(ANALYSIS_RESULTS):
+        return None
+    with open(ANALYSIS_RESULTS) as f:
+        return json.load(f)
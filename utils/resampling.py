@@ -0,0 +1,85 @@
+"""Vectorized resampling of sorted (series, period, value) records to coarser calendars.
+
+Frequencies are labelled by their period-end date: month end ('M'), calendar
+quarter end ('Q'), 31 December ('Y') and 30 June for Pakistan's July-June
+fiscal year ('FY'). How a series is aggregated follows its unit: rates,
+percentages and indices are averaged, stocks (students, teachers, peak load)
+take the last value and flows (currency amounts, doses) are summed.
+
+A bucket is kept only when it is complete. A series finer than the frequency
+needs every sub-period present (all 12 months of a fiscal year), and a series
+as coarse as the frequency is kept only where its periods fall on the bucket
+ends (a 30 June annual series appears under 'FY' but not under 'Y').
+"""
+import numpy as np
+
+# Frequency -> months per bucket
+FREQUENCIES = {'M': 1, 'Q': 3, 'Y': 12, 'FY': 12}
+
+AGGREGATIONS = ('sum', 'mean', 'last')
+UNIT_AGGREGATION = {
+    'percent': 'mean',
+    'index': 'mean',
+    'students': 'last',
+    'teachers': 'last',
+    'ampere': 'last',
+}
+DEFAULT_AGGREGATION = 'sum'
+
+
+def aggregation_for(unit, override=None):
+    """'sum', 'mean' or 'last' for a series measured in `unit`"""
+    if override:
+        return override
+    return UNIT_AGGREGATION.get(str(unit).strip().lower(), DEFAULT_AGGREGATION)
+
+
+def native_months(spacing_days):
+    """Months per observation (1, 3 or 12) from the typical spacing of a series in days"""
+    spacing_days = np.asarray(spacing_days, dtype=np.float64)
+    return np.where(spacing_days <= 45, 1, np.where(spacing_days <= 135, 3, 12))
+
+
+def bucket_end(periods, freq):
+    """Period-end date (datetime64[D]) of the `freq` bucket holding each of `periods`"""
+    months = periods.astype('datetime64[M]')
+    if freq == 'M':
+        ends = months + 1
+    elif freq == 'Q':
+        ends = months - months.astype(np.int64) % 3 + 3
+    elif freq == 'Y':
+        ends = (periods.astype('datetime64[Y]') + 1).astype('datetime64[M]')
+    elif freq == 'FY':
+        # July of year Y - 1 .. June of year Y shift into calendar year Y
+        ends = (months + 6).astype('datetime64[Y]').astype('datetime64[M]') + 6
+    else:
+        raise ValueError(f"Unknown frequency {freq!r}; expected one of {', '.join(FREQUENCIES)}")
+    return ends.astype('datetime64[D]') - 1
+
+
+def resample(series, periods, values, how, native, freq):
+    """
+    Aggregate records sorted by (series, period) into complete `freq` buckets.
+
+    `how` holds an index into AGGREGATIONS and `native` the months per
+    observation of each record's series. Returns (series, bucket_end, value)
+    arrays sorted by series and bucket.
+    """
+    ends = bucket_end(periods, freq)
+    new = np.ones(len(series), dtype=bool)
+    new[1:] = (series[1:] != series[:-1]) | (ends[1:] != ends[:-1])
+    starts = np.flatnonzero(new)
+    if not len(starts):
+        return series[:0], ends[:0], values[:0]
+    last = np.append(starts[1:], len(series)) - 1
+    counts = last - starts + 1
+
+    sums = np.add.reduceat(values, starts)
+    method = how[starts]
+    out = np.where(method == 0, sums, np.where(method == 1, sums / counts, values[last]))
+
+    months = FREQUENCIES[freq]
+    finer = native[starts] < months
+    expected = np.maximum(months // native[starts], 1)
+    keep = np.where(finer, counts >= expected, periods[last] == ends[last])
+    return series[starts][keep], ends[starts][keep], out[keep]
@@ -0,0 +1,440 @@
+"""One long-format time-series store over every domain's datasets.
+
+Each domain ships its own shape: tall Date / Series_Name / Value / Unit files
+in Economy, academic-year columns ('2019-20' ... '2023-24') in Education, a
+year x vaccine matrix in Health and year columns ('2011' ... '2015') per
+feeder in Energy. ``build`` reshapes them once into (series_id, period, value)
+records sorted by series and period, with a catalog giving each series its
+unit, domain, source and name, and publishes them under
+``data_processed/timeseries/<hash>/``. Series ids are derived from
+(domain, source, name), so they stay the same across rebuilds.
+
+Periods are period-end dates: month and quarter ends as published, 30 June for
+fiscal and academic years ('2019-20' -> 2020-06-30) and 31 December for
+calendar years.
+
+At build time every series is also resampled to monthly, quarterly,
+calendar-year and July-June fiscal-year buckets (see utils.resampling), so
+``get_series(..., freq='FY')`` is a lookup rather than a resample.
+
+    python -m utils.timeseries_store build
+    python -m utils.timeseries_store list --domain Health
+
+    store = load_store()
+    periods, block = store.get_series(store.ids(domain='Health'), start='2014')
+    periods, block = store.get_series(store.ids(source='Workers_Remittance'), freq='FY')
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils import resampling, validation
+from utils.etl import code_hash, file_hash
+from utils.fileio import is_current, publish_dir, write_json_atomic
+from utils.resampling import AGGREGATIONS, FREQUENCIES, aggregation_for, native_months, resample
+from utils.validation import ValidationError, validate_source, write_report
+
+STORE_DIR = 'data_processed/timeseries'
+POINTER = 'current.json'
+
+TALL_ALIASES = {
+    'Series Name': 'Series_Name',
+    'Series name': 'Series_Name',
+    'Observation Date': 'Date',
+    'Observation Value': 'Value',
+}
+
+
+# --- readers: source file -> DataFrame of name, period, value, unit ---------
+
+
+def _year_end(years):
+    return pd.to_datetime(years.astype(int).astype(str) + '-12-31')
+
+
+def _join(df, keys):
+    """'Stage / Sector' style names from the `keys` columns of each row"""
+    return df[keys].astype(str).apply(lambda column: column.str.strip()).agg(' / '.join, axis=1)
+
+
+def tall(path, value_column='Value', name=None, unit=None, annual=False):
+    """
+    A tall file with a Date column (Economy).
+
+    Files without Series_Name / Unit columns hold one series, named `name`
+    and measured in `unit`. `annual` moves the 1 January dates of WDI
+    extracts to the year end.
+    """
+    df = pd.read_csv(path).rename(columns=TALL_ALIASES)
+    periods = pd.to_datetime(df['Date'])
+    if annual:
+        periods = _year_end(periods.dt.year)
+    return pd.DataFrame({
+        'name': df['Series_Name'].str.strip() if 'Series_Name' in df else name,
+        'period': periods,
+        'value': pd.to_numeric(df[value_column], errors='coerce'),
+        'unit': df['Unit'] if 'Unit' in df else unit,
+    })
+
+
+def academic_years(path, keys, unit):
+    """Wide '2019-20' year columns, one series per row named by its `keys` columns (Education)"""
+    df = pd.read_csv(path)
+    years = [column for column in df.columns if column[:4].isdigit() and column[4:5] == '-']
+    if not years:
+        raise KeyError("academic-year columns such as '2019-20'")
+    long = df.melt(id_vars=keys, value_vars=years, var_name='year', value_name='value')
+    return pd.DataFrame({
+        'name': _join(long, keys),
+        'period': pd.to_datetime((long['year'].str[:4].astype(int) + 1).astype(str) + '-06-30'),
+        'value': pd.to_numeric(long['value'], errors='coerce'),
+        'unit': unit,
+    })
+
+
+def year_matrix(path, unit, year_column='Year'):
+    """Years down the rows and one series per column, with '1,234.5' numbers and '-' gaps (Health)"""
+    df = pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+    long = df.melt(id_vars=[year_column], var_name='name', value_name='value')
+    return pd.DataFrame({
+        'name': long['name'].str.strip(),
+        'period': _year_end(long[year_column]),
+        'value': pd.to_numeric(long['value'].str.replace(',', ''), errors='coerce'),
+        'unit': unit,
+    })
+
+
+def year_columns(path, keys, unit):
+    """Calendar-year columns ('2011', ...), one series per row named by its `keys` columns (Energy)"""
+    df = pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+    df.columns = df.columns.str.strip()
+    # Four-digit years only: the Energy file also has transformer-rating columns ('25', ..., '630')
+    years = [column for column in df.columns if len(column) == 4 and column.isdigit() and column[:2] in ('19', '20')]
+    if not years:
+        raise KeyError("year columns such as '2011'")
+    long = df.melt(id_vars=keys, value_vars=years, var_name='year', value_name='value')
+    return pd.DataFrame({
+        'name': _join(long, keys),
+        'period': _year_end(long['year']),
+        'value': pd.to_numeric(long['value'], errors='coerce'),
+        'unit': unit,
+    })
+
+
+def _economy(**params):
+    return {'domain': 'Economy', 'transform': tall, 'params': params}
+
+
+# Source file -> domain, reader and its parameters; 'aggregation' overrides the unit's and
+# 'validation': {'warn': [check, ...]} downgrades known issues of a source to warnings
+SOURCES = {
+    'datasets_cleaned/Economy/Agriculture-Sector.csv': _economy(),
+    'datasets_cleaned/Economy/Exchange_Rates.csv': _economy(),
+    'datasets_cleaned/Economy/Export_By_Commodities.csv': _economy(),
+    'datasets_cleaned/Economy/Export_of_Goods_&_Services.csv': _economy(),
+    'datasets_cleaned/Economy/GDP_Quarterly_With_Constant_Prices.csv': _economy(),
+    'datasets_cleaned/Economy/Net-balance-PKR-Exports.csv': _economy(),
+    'datasets_cleaned/Economy/Net-balance-USD-Exports.csv': _economy(),
+    'datasets_cleaned/Economy/Pakistan_Debt_and_Liabilities.csv': dict(_economy(), aggregation='last'),
+    'datasets_cleaned/Economy/Pakistan_GDP_2000-2025.csv': _economy(),
+    # SBP's truncated names merge two series each into 'Import payments of Buses,Trucks & Oth. Heavy
+    # Vehicle' and 'Import payments of Others'; the store keeps the first row of each duplicate
+    'datasets_cleaned/Economy/Pk_Imports_Payments.csv': dict(_economy(), validation={'warn': ['duplicate_keys']}),
+    'datasets_cleaned/Economy/Services-Export.csv': _economy(),
+    'datasets_cleaned/Economy/Total_Foreign_Investment.csv': _economy(),
+    'datasets_cleaned/Economy/Workers_Remittance.csv': _economy(),
+    'datasets_cleaned/Economy/Pakistan-CPI_Annual.csv': _economy(
+        value_column='CPI_Value', name='CPI Inflation', unit='Percent', annual=True),
+    'datasets_cleaned/Economy/Pakistan_GDP.csv': _economy(
+        value_column='GDP (current US$)', name='GDP (current US$)', unit='USD', annual=True),
+    'datasets_cleaned/Education/Enrollments/5_year_enrollment.csv': {
+        'domain': 'Education', 'transform': academic_years,
+        'params': {'keys': ['Stage', 'Sector'], 'unit': 'Students'},
+    },
+    'datasets_cleaned/Education/Enrollments/Total_Enrollent(Public)_Ten_Years.csv': {
+        'domain': 'Education', 'transform': academic_years, 'params': {'keys': ['Class'], 'unit': 'Students'},
+    },
+    'datasets_cleaned/Education/Teachers/5_year_Teachers.csv': {
+        'domain': 'Education', 'transform': academic_years,
+        'params': {'keys': ['Institution Type', 'Sector'], 'unit': 'Teachers'},
+    },
+    'datasets_raw/Health/immunization-coverage-in-thousands-pakistan-in-last-ten-years.csv': {
+        'domain': 'Health', 'transform': year_matrix, 'params': {'unit': 'Thousand doses'},
+    },
+    'datasets_raw/Energy/demandfordistributedrenewableenergygenerationinpakistan.csv': {
+        'domain': 'Energy', 'transform': year_columns,
+        'params': {'keys': ['Name of Grid Station', 'Name of Outgoing 11Kv'], 'unit': 'Ampere'},
+    },
+}
+
+
+# --- building ----------------------------------------------------------------
+
+
+def series_id(domain, source, name):
+    """Stable non-negative 63-bit id of a series"""
+    key = f"{domain}|{os.path.splitext(os.path.basename(source))[0]}|{name}"
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'big') >> 1
+
+
+def read_sources(sources=None):
+    """
+    Long DataFrame (series_id, period, value, unit, domain, source, name) of every source found.
+
+    Every source is validated first; raises ValidationError if any fails.
+    Missing sources are skipped with a warning.
+    """
+    frames, reports = [], []
+    for source, spec in (sources or SOURCES).items():
+        if not os.path.exists(source):
+            warnings.warn(f"Skipping {source}: not found")
+            continue
+        report, df = validate_source(source, spec)
+        reports.append(report)
+        if not report['ok']:
+            continue
+        df['domain'] = spec['domain']
+        df['source'] = source
+        df['aggregation'] = [aggregation_for(unit, spec.get('aggregation')) for unit in df['unit']]
+        ids = {name: series_id(spec['domain'], source, name) for name in df['name'].unique()}
+        df['series_id'] = df['name'].map(ids).astype('int64')
+        frames.append(df)
+    write_report(reports)
+    if not all(report['ok'] for report in reports):
+        raise ValidationError(reports)
+    records = pd.concat(frames, ignore_index=True)
+    return records[records['value'].notna()]
+
+
+def _digest(sources):
+    digest = hashlib.sha256()
+    for source, spec in sorted(sources.items()):
+        if os.path.exists(source):
+            options = json.dumps([spec.get('aggregation'), spec.get('validation')], sort_keys=True)
+            digest.update(f"{source}:{file_hash(source)}:{code_hash(spec)}:{options}".encode())
+    digest.update(inspect.getsource(resampling).encode())
+    digest.update(inspect.getsource(validation).encode())
+    return digest.hexdigest()
+
+
+def build(sources=None, root=STORE_DIR, force=False):
+    """
+    Publish the store for the current sources unless it already exists; returns its directory.
+
+    Raises ValidationError, leaving the current store in place, if a source
+    fails validation.
+    """
+    sources = sources or SOURCES
+    digest = _digest(sources)
+    target = os.path.join(root, digest)
+
+    if force or not is_current(os.path.join(target, 'manifest.json')):
+        records = read_sources(sources)
+        catalog = records.groupby('series_id', sort=True).agg(
+            domain=('domain', 'first'), source=('source', 'first'), name=('name', 'first'),
+            unit=('unit', 'first'), aggregation=('aggregation', 'first'), names=('name', 'nunique'),
+            start=('period', 'min'), end=('period', 'max'), count=('value', 'size'),
+        ).reset_index()
+        if (catalog['names'] > 1).any():
+            raise ValueError("Series id collision between different names")
+
+        duplicated = records.duplicated(['series_id', 'period'])
+        records = records[~duplicated]
+        order = np.lexsort((records['period'].values, records['series_id'].values))
+        ids = records['series_id'].values[order]
+        _, first, position = np.unique(ids, return_index=True, return_inverse=True)
+        periods = records['period'].values[order].astype('datetime64[D]')
+        values = records['value'].values[order].astype('float64')
+
+        # Typical spacing of each series decides how many observations make a complete bucket
+        spacing = np.diff(periods).astype(np.int64)
+        same_series = position[1:] == position[:-1]
+        spacing = pd.Series(spacing[same_series]).groupby(position[1:][same_series]).median()
+        catalog['native_months'] = native_months(spacing.reindex(range(len(catalog)), fill_value=366).values)
+        how = catalog['aggregation'].map(AGGREGATIONS.index).values
+
+        arrays = {
+            'series_id': catalog['series_id'].values,
+            'offsets': np.append(first, len(ids)).astype('int64'),
+            'period': periods,
+            'value': values,
+        }
+        for freq in FREQUENCIES:
+            level_series, level_periods, level_values = resample(
+                position, periods, values, how[position], catalog['native_months'].values[position], freq)
+            arrays[f'{freq}_offsets'] = np.searchsorted(level_series, np.arange(len(catalog) + 1)).astype('int64')
+            arrays[f'{freq}_period'] = level_periods
+            arrays[f'{freq}_value'] = level_values
+
+        with publish_dir(target) as tmp_dir:
+            np.savez(os.path.join(tmp_dir, 'store.npz'), **arrays)
+            catalog['count'] = np.diff(arrays['offsets'])
+            catalog.drop(columns='names').to_csv(os.path.join(tmp_dir, 'catalog.csv'), index=False,
+                                                 date_format='%Y-%m-%d')
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+                json.dump({
+                    'content_hash': digest,
+                    'built_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+                    'series': int(len(catalog)),
+                    'records': int(len(ids)),
+                    'duplicates_dropped': int(duplicated.sum()),
+                    'frequencies': {freq: int(len(arrays[f'{freq}_value'])) for freq in FREQUENCIES},
+                    'sources': sorted(records['source'].unique().tolist()),
+                }, f, indent=2)
+
+    write_json_atomic(os.path.join(root, POINTER), {'content_hash': digest})
+    return target
+
+
+# --- reading -----------------------------------------------------------------
+
+
+def _day(value):
+    return None if value is None else np.datetime64(pd.Timestamp(value), 'D')
+
+
+class TimeSeriesStore:
+    """
+    Read access to a published store: the catalog plus CSR-style arrays sorted
+    by (series, period), as observed and at each resampled frequency.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with np.load(os.path.join(directory, 'store.npz')) as arrays:
+            self.series_ids = arrays['series_id']
+            self.offsets = arrays['offsets']
+            self.periods = arrays['period']
+            self.values = arrays['value']
+            # None is the data as observed
+            self.levels = {None: (self.offsets, self.periods, self.values)}
+            for freq in FREQUENCIES:
+                self.levels[freq] = (arrays[f'{freq}_offsets'], arrays[f'{freq}_period'], arrays[f'{freq}_value'])
+        self.catalog = pd.read_csv(os.path.join(directory, 'catalog.csv'), parse_dates=['start', 'end'])
+        self.catalog = self.catalog.set_index('series_id', drop=False)
+
+    def ids(self, domain=None, name=None, source=None):
+        """Ids of the series in `domain` whose name / source contain the given text (case-insensitive)"""
+        catalog = self.catalog
+        if domain:
+            catalog = catalog[catalog['domain'] == domain]
+        if name:
+            catalog = catalog[catalog['name'].str.contains(name, case=False, regex=False)]
+        if source:
+            catalog = catalog[catalog['source'].str.contains(source, case=False, regex=False)]
+        return catalog['series_id'].tolist()
+
+    def _positions(self, ids):
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        positions = np.searchsorted(self.series_ids, ids)
+        clipped = np.minimum(positions, len(self.series_ids) - 1)
+        found = (positions < len(self.series_ids)) & (self.series_ids[clipped] == ids)
+        if not found.all():
+            raise KeyError(f"Unknown series id(s): {ids[~found].tolist()}")
+        return ids, positions
+
+    def get_series(self, ids, start=None, end=None, freq=None):
+        """
+        Aligned block of the series `ids` between `start` and `end` (inclusive).
+
+        `freq` picks a precomputed level ('M', 'Q', 'Y' or 'FY'); None gives the
+        data as observed. Returns (periods, block): the sorted union of their
+        periods in range (datetime64[D]) and a float array of shape
+        (len(periods), len(ids)) with NaN where a series has no value.
+        """
+        if freq not in self.levels:
+            raise ValueError(f"Unknown frequency {freq!r}; expected None or one of {', '.join(FREQUENCIES)}")
+        offsets, all_periods, values = self.levels[freq]
+        ids, positions = self._positions(ids)
+        lo, hi = offsets[positions], offsets[positions + 1]
+        start, end = _day(start), _day(end)
+
+        # Narrow each series' slice to [start, end]; periods are sorted within a series
+        if start is not None or end is not None:
+            for j in range(len(ids)):
+                if start is not None:
+                    lo[j] += np.searchsorted(all_periods[lo[j]:hi[j]], start, side='left')
+                if end is not None:
+                    hi[j] = lo[j] + np.searchsorted(all_periods[lo[j]:hi[j]], end, side='right')
+
+        lengths = hi - lo
+        index = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)]) if len(ids) else np.empty(0, np.int64)
+        index = index.astype(np.int64)
+        periods = np.unique(all_periods[index])
+        block = np.full((len(periods), len(ids)), np.nan)
+        block[np.searchsorted(periods, all_periods[index]), np.repeat(np.arange(len(ids)), lengths)] = values[index]
+        return periods, block
+
+    def frame(self, ids, start=None, end=None, freq=None):
+        """get_series as a DataFrame indexed by period with one column per series name"""
+        periods, block = self.get_series(ids, start, end, freq)
+        return pd.DataFrame(block, index=pd.DatetimeIndex(periods, name='period'),
+                            columns=self.catalog.loc[list(ids), 'name'].values)
+
+    def records(self, ids=None):
+        """Long (series_id, period, value, unit, domain) records of `ids` (default: all)"""
+        if ids is None:
+            ids = self.series_ids
+        ids, positions = self._positions(ids)
+        lengths = self.offsets[positions + 1] - self.offsets[positions]
+        index = np.concatenate([np.arange(self.offsets[p], self.offsets[p + 1]) for p in positions])
+        series = np.repeat(ids, lengths)
+        info = self.catalog.loc[series]
+        return pd.DataFrame({
+            'series_id': series,
+            'period': self.periods[index],
+            'value': self.values[index],
+            'unit': info['unit'].values,
+            'domain': info['domain'].values,
+        })
+
+
+def store_directory(root=STORE_DIR):
+    """Directory of the current published store; raises FileNotFoundError if none has been built"""
+    pointer = os.path.join(root, POINTER)
+    if not os.path.exists(pointer):
+        raise FileNotFoundError(f"No time-series store in {root}; run python -m utils.timeseries_store build")
+    with open(pointer) as f:
+        return os.path.join(root, json.load(f)['content_hash'])
+
+
+def load_store(root=STORE_DIR):
+    """The current published store; raises FileNotFoundError if none has been built"""
+    return TimeSeriesStore(store_directory(root))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the unified time-series store")
+    parser.add_argument('command', choices=['build', 'list'])
+    parser.add_argument('--domain')
+    parser.add_argument('--name')
+    parser.add_argument('--freq', choices=list(FREQUENCIES), help="list: count values at this frequency")
+    parser.add_argument('--root', default=STORE_DIR)
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the sources are unchanged")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        directory = build(root=args.root, force=args.force)
+        with open(os.path.join(directory, 'manifest.json')) as f:
+            manifest = json.load(f)
+        print(f"{manifest['series']} series, {manifest['records']} records -> {directory}")
+        return
+
+    store = load_store(args.root)
+    catalog = store.catalog.loc[store.ids(args.domain, args.name)]
+    offsets = store.levels[args.freq][0]
+    positions = np.searchsorted(store.series_ids, catalog['series_id'].values)
+    counts = offsets[positions + 1] - offsets[positions]
+    for row, count in zip(catalog.itertuples(index=False), counts):
+        print(f"{row.series_id:>20} {row.domain:<10} {row.start:%Y-%m-%d}..{row.end:%Y-%m-%d} "
+              f"n={count:<4} {row.aggregation:<4} [{row.unit}] {row.name}")
+
+
+if __name__ == '__main__':
+    main()
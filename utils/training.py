@@ -0,0 +1,308 @@
+"""Batch training pipeline for the economy LSTM models.
+
+``python train.py`` trains every configured series found in
+``datasets_cleaned/Economy`` in one run:
+
+1. each series is loaded, scaled and windowed in the parent process; the
+   prepared windows are cached under ``data_processed/cache/windows`` by a hash
+   of the data and preparation settings, so unchanged series skip this step;
+2. models train in a process pool, one pinned TensorFlow runtime per worker;
+3. each model is written to a new version directory
+   ``models/<name>/<version>/`` (Keras model, scaler, registry manifest and the
+   NumPy export used by the dashboard) and ``models/<name>/LATEST`` is switched
+   to it (see utils.model_registry).
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils import lstm_models
+from utils.feature_state import feature_frame, seasonal_frame
+from utils.fileio import write_json_atomic
+from utils.model_registry import MANIFEST, build_manifest, publish
+from utils.windowing import multivariate_windows, univariate_windows
+
+DATA_DIR = 'datasets_cleaned/Economy'
+MODELS_DIR = 'models'
+CACHE_DIR = 'data_processed/cache/windows'
+
+# Series trained by the pipeline, mirroring the notebook setups
+TRAINING_CONFIGS = {
+    'lstm_gdp_model': {
+        'file': 'Pakistan_GDP.csv',
+        'date_column': 'Date',
+        'value_column': 'GDP (current US$)',
+        'features': 'univariate',
+        'look_back': 3,
+        'builder': 'build_simple_lstm',
+        'params': {'units': 50, 'learning_rate': 0.001, 'epochs': 100, 'batch_size': 1},
+    },
+    'Total_Debt_Liabilities': {
+        'file': 'Pakistan_Debt_and_Liabilities.csv',
+        'series_column': 'Series_Name',
+        'series': 'Total Debt and Liabilities (sum I to IX)',
+        'value_column': 'Value',
+        'multiplier': 1_000_000_000,  # Billion PKR -> PKR
+        'features': 'univariate',
+        'look_back': 2,
+        'builder': 'build_simple_lstm',
+        'params': {'units': 50, 'learning_rate': 0.001, 'epochs': 200, 'batch_size': 1},
+    },
+    'service-exports': {
+        'file': 'Services-Export.csv',
+        'series_column': 'Series Name',
+        'series': 'Exports of Services',
+        'value_column': 'Value',
+        'multiplier': 1_000_000,  # Million USD -> USD
+        'features': 'seasonal',
+        'seasonal_period': 12,
+        'look_back': 12,
+        'builder': 'build_seasonal_lstm',
+        'params': {'units': 50, 'dropout_rate': 0.2, 'learning_rate': 0.001, 'epochs': 100, 'batch_size': 64},
+    },
+    'export_by_com_model': {
+        'file': 'Export_By_Commodities.csv',
+        'series_column': 'Series_Name',
+        'series': 'Other Exports',
+        'value_column': 'Value',
+        'multiplier': 1000,  # Thousand USD -> USD
+        'features': 'univariate',
+        'look_back': 24,
+        'builder': 'build_stacked_lstm',
+        'params': {'units': 100, 'dropout_rate': 0.2, 'learning_rate': 0.001, 'epochs': 200},
+    },
+    'export_by_services': {
+        'file': 'Export_of_Goods_&_Services.csv',
+        'series_column': 'Series_Name',
+        'series': 'Exports of Goods & Services',
+        'value_column': 'Value',
+        'multiplier': 1_000_000,  # Million USD -> USD
+        'features': 'advanced',
+        'look_back': 18,
+        'builder': 'build_enhanced_lstm',
+        'monitor': 'val_mae',
+        'params': {'units': 256, 'dropout_rate': 0.4, 'learning_rate': 0.0003, 'epochs': 250, 'batch_size': 16},
+    },
+}
+
+
+def load_series(config, data_dir=DATA_DIR):
+    """The configured column of a cleaned CSV as a date-sorted float Series"""
+    df = pd.read_csv(os.path.join(data_dir, config['file']))
+    if 'series_column' in config:
+        df = df[df[config['series_column']] == config['series']]
+    dates = pd.to_datetime(df[config.get('date_column', 'Date')])
+    values = df[config['value_column']].astype('float64') * config.get('multiplier', 1)
+    return pd.Series(values.values, index=pd.DatetimeIndex(dates), name=config['value_column']).sort_index()
+
+
+def data_hash(series, config):
+    """Content hash of a series and the settings that shape its windows"""
+    digest = hashlib.sha256()
+    digest.update(series.index.asi8.tobytes())
+    digest.update(series.to_numpy(dtype='float64').tobytes())
+    prep = {key: config.get(key) for key in ('features', 'look_back', 'multiplier', 'seasonal_period')}
+    digest.update(json.dumps(prep, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def build_windows(series, config):
+    """
+    Scale a series and window it as the model expects; returns (X, y, scaler, feature_columns).
+
+    The target is always the first column the scaler was fitted on.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    look_back = config['look_back']
+
+    if config['features'] == 'seasonal':
+        # All three columns share one scaler and the seasonal difference is the target, as in the notebook
+        features = seasonal_frame(series, config['seasonal_period'])
+        scaled_features = scaler.fit_transform(features.values)
+        X, y = multivariate_windows(scaled_features, scaled_features[:, 0], look_back)
+        return X, y, scaler, list(features.columns)
+
+    scaled = pd.Series(scaler.fit_transform(series.values.reshape(-1, 1))[:, 0], index=series.index)
+
+    if config['features'] == 'advanced':
+        features = feature_frame(scaled).dropna()
+        X, y = multivariate_windows(features.values, scaled.loc[features.index].values, look_back)
+        return X, y, scaler, list(features.columns)
+
+    X, y = univariate_windows(scaled.values, look_back)
+    return X, y, scaler, ['value']
+
+
+def prepare(name, config, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Load and window one series, reusing the cached windows when its data hash is unchanged"""
+    import joblib
+
+    series = load_series(config, data_dir)
+    key = data_hash(series, config)
+    path = os.path.join(cache_dir, key)
+
+    if not os.path.exists(os.path.join(path, 'windows.npz')):
+        X, y, scaler, feature_columns = build_windows(series, config)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(tmp_path, exist_ok=True)
+        np.savez(os.path.join(tmp_path, 'windows.npz'), X=np.ascontiguousarray(X, dtype=np.float32),
+                 y=np.asarray(y, dtype=np.float32))
+        joblib.dump(scaler, os.path.join(tmp_path, 'scaler.joblib'))
+        with open(os.path.join(tmp_path, 'features.json'), 'w') as f:
+            json.dump(feature_columns, f)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # Another run cached the same windows first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    return {
+        'name': name,
+        'config': config,
+        'data_hash': key,
+        'cache_path': path,
+        'last_date': series.index[-1].strftime('%Y-%m-%d'),
+    }
+
+
+def _new_version(job):
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d%H%M%S')
+    return f"{stamp}-{job['data_hash'][:8]}"
+
+
+def train_job(job, models_dir=MODELS_DIR, validation_split=0.2):
+    """Train one prepared series and publish it as a new model version (runs in a worker)"""
+    import joblib
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    from utils.lstm_numpy import export_model
+
+    config = job['config']
+    params = config['params']
+    monitor = config.get('monitor', 'val_loss')
+    with np.load(os.path.join(job['cache_path'], 'windows.npz')) as windows:
+        X, y = windows['X'], windows['y']
+    scaler = joblib.load(os.path.join(job['cache_path'], 'scaler.joblib'))
+    with open(os.path.join(job['cache_path'], 'features.json')) as f:
+        feature_columns = json.load(f)
+
+    split = max(1, int(len(X) * (1 - validation_split)))
+    X_train, y_train, X_val, y_val = X[:split], y[:split], X[split:], y[split:]
+
+    model = getattr(lstm_models, config['builder'])(params, X.shape[1:])
+    model.fit(
+        X_train, y_train,
+        epochs=params.get('epochs', 100),
+        batch_size=params.get('batch_size', 32),
+        validation_data=(X_val, y_val),
+        callbacks=[EarlyStopping(monitor=monitor, patience=20, restore_best_weights=True)],
+        verbose=0,
+        shuffle=False,  # Time series data should not be shuffled
+    )
+
+    # Undo the target column's scaling only (seasonal models scale three columns together)
+    predicted = (model.predict(X_val, verbose=0).ravel() - scaler.min_[0]) / scaler.scale_[0]
+    actual = (y_val.ravel() - scaler.min_[0]) / scaler.scale_[0]
+    errors = actual - predicted
+    metrics = {
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors))),
+        'mse': float(np.mean(errors ** 2)),
+    }
+
+    model_dir = os.path.join(models_dir, job['name'])
+    version = _new_version(job)
+    tmp_dir = os.path.join(model_dir, f".{version}.tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    model_path = os.path.join(tmp_dir, 'model.keras')
+    scaler_path = os.path.join(tmp_dir, 'scaler.joblib')
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+    export_model(model_path, scaler_path, os.path.join(tmp_dir, 'model.npz'))
+
+    manifest = build_manifest(
+        job['name'], version, tmp_dir,
+        files={'keras': 'model.keras', 'numpy': 'model.npz', 'scaler': 'scaler.joblib'},
+        features=feature_columns,
+        sequence_length=config['look_back'],
+        scaler_type=type(scaler).__name__,
+        training_date=job['last_date'],
+        metrics=metrics,
+        builder=config['builder'],
+        input_shape=list(model.input_shape),
+        output_shape=list(model.output_shape),
+        params=params,
+        source_file=config['file'],
+        data_hash=job['data_hash'],
+    )
+    write_json_atomic(os.path.join(tmp_dir, MANIFEST), manifest)
+
+    # Publish the finished directory, then switch LATEST to it
+    publish(models_dir, job['name'], tmp_dir, version)
+    return manifest
+
+
+def _init_worker(threads):
+    from utils.hyperparameter_search import pin_threads
+
+    pin_threads(threads)
+
+
+def discover(data_dir=DATA_DIR, names=None):
+    """Configured series whose cleaned CSV is present, optionally limited to `names`"""
+    unknown = set(names or []) - set(TRAINING_CONFIGS)
+    if unknown:
+        raise ValueError(f"Unknown model(s): {', '.join(sorted(unknown))}")
+    return {
+        name: config for name, config in TRAINING_CONFIGS.items()
+        if (not names or name in names) and os.path.exists(os.path.join(data_dir, config['file']))
+    }
+
+
+def run(names=None, workers=None, data_dir=DATA_DIR, models_dir=MODELS_DIR, cache_dir=CACHE_DIR):
+    """Prepare and train every discovered series; returns the manifest of each new version"""
+    configs = discover(data_dir, names)
+    if not configs:
+        print(f"No configured series found in {data_dir}")
+        return []
+    os.makedirs(cache_dir, exist_ok=True)
+    jobs = [prepare(name, config, data_dir, cache_dir) for name, config in configs.items()]
+
+    cpus = os.cpu_count() or 1
+    workers = workers or min(len(jobs), cpus)
+    threads = max(1, cpus // workers)
+    print(f"Training {len(jobs)} model(s) on {workers} worker(s) x {threads} thread(s)")
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = [pool.submit(train_job, job, models_dir) for job in jobs]
+        results = []
+        for job, future in zip(jobs, futures):
+            manifest = future.result()
+            metrics = manifest['metrics']
+            print(f"  {job['name']:<24} {manifest['version']}  RMSE {metrics['rmse']:,.2f}  MAE {metrics['mae']:,.2f}")
+            results.append(manifest)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the economy LSTM models")
+    parser.add_argument('models', nargs='*', help=f"Models to train (default: all of {', '.join(TRAINING_CONFIGS)})")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per model, up to the core count)")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args(argv)
+    run(args.models or None, args.workers, args.data_dir, args.models_dir, args.cache_dir)
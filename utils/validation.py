@@ -0,0 +1,192 @@
+"""Ingest-time validation of the datasets behind the dashboard.
+
+Every source is read into long (name, period, value, unit) records with the
+time-series store's readers and checked in one vectorized pass:
+
+- required columns: the reader found every column it needs
+- dates: every period parses
+- monotonic dates: within a series the dates only rise (or, as SBP
+  publishes them, only fall)
+- duplicate keys: no (series, period) pair appears twice
+- unit consistency: each series keeps one unit
+- ranges: values lie within the bounds of their unit
+- gaps: no spacing far wider than the series' typical spacing (warning)
+
+Errors block publishing: ``timeseries_store.build`` raises ValidationError
+instead of publishing a new store, and the ETL keeps the previous cleaned
+file, so the time-series store only ever holds validated snapshots. The
+dashboard sections that read files directly still guard their own rendering.
+
+    python -m utils.validation            # report on every source
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.fileio import write_json_atomic
+
+REPORT_PATH = 'data_processed/validation_report.json'
+
+# Inclusive (min, max) per lower-cased unit; None is unbounded
+UNIT_BOUNDS = {
+    'percent': (-100, 1000),
+    'index': (0, None),
+    'students': (0, None),
+    'teachers': (0, None),
+    'thousand doses': (0, None),
+    'ampere': (0, None),
+}
+GAP_FACTOR = 1.5  # spacing over this multiple of a series' median spacing is a gap
+EXAMPLES = 3
+
+
+class ValidationError(ValueError):
+    """Raised instead of publishing when a source fails validation; carries the reports"""
+
+    def __init__(self, reports):
+        super().__init__(reports)
+        self.reports = reports
+
+    def __str__(self):
+        failed = [report for report in self.reports if not report['ok']]
+        return '; '.join(
+            f"{report['source']}: " + ', '.join(issue['detail'] for issue in report['issues']
+                                                if issue['severity'] == 'error')
+            for report in failed
+        )
+
+
+def _issue(check, severity, rows, detail):
+    return {'check': check, 'severity': severity, 'rows': int(rows), 'detail': detail}
+
+
+def _examples(names):
+    names = list(names)
+    more = f" (+{len(names) - EXAMPLES} more)" if len(names) > EXAMPLES else ''
+    return ', '.join(repr(name) for name in names[:EXAMPLES]) + more
+
+
+def check_records(records, bounds=UNIT_BOUNDS, gap_factor=GAP_FACTOR):
+    """Issues found in long (name, period, value, unit) records, which are in file order"""
+    issues = []
+    bad_dates = records['period'].isna().values
+    if bad_dates.any():
+        issues.append(_issue('dates', 'error', bad_dates.sum(), f"{bad_dates.sum()} unparseable dates"))
+    records = records[~bad_dates]
+    if records.empty:
+        return issues
+
+    # Group rows by series while keeping file order inside each series
+    codes, names = pd.factorize(records['name'])
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    days = records['period'].values[order].astype('datetime64[D]').astype(np.int64)
+    same = codes[1:] == codes[:-1]
+    step = np.diff(days)
+    rising = np.bincount(codes[1:][same & (step > 0)], minlength=len(names))
+    falling = np.bincount(codes[1:][same & (step < 0)], minlength=len(names))
+    mixed = (rising > 0) & (falling > 0)
+    if mixed.any():
+        issues.append(_issue('monotonic_dates', 'error', mixed.sum(),
+                             f"dates out of order in {mixed.sum()} series: {_examples(names[mixed])}"))
+
+    duplicated = records.duplicated(['name', 'period']).values
+    if duplicated.any():
+        series = records.loc[duplicated, 'name'].unique()
+        issues.append(_issue('duplicate_keys', 'error', duplicated.sum(),
+                             f"{duplicated.sum()} duplicate (series, date) rows in {_examples(series)}"))
+
+    units = records.groupby('name', sort=False)['unit'].nunique()
+    if (units > 1).any():
+        issues.append(_issue('unit_consistency', 'error', (units > 1).sum(),
+                             f"several units in {_examples(units.index[units > 1])}"))
+
+    unit = records['unit'].astype(str).str.strip().str.lower()
+    lower = unit.map({u: b[0] for u, b in bounds.items() if b[0] is not None}).astype('float64').values
+    upper = unit.map({u: b[1] for u, b in bounds.items() if b[1] is not None}).astype('float64').values
+    values = records['value'].values.astype('float64')
+    with np.errstate(invalid='ignore'):
+        outside = (values < lower) | (values > upper)
+    if outside.any():
+        issues.append(_issue('range', 'error', outside.sum(),
+                             f"{outside.sum()} values outside their unit's range in "
+                             f"{_examples(records.loc[outside, 'name'].unique())}"))
+
+    spacing = np.abs(step[same])
+    if len(spacing):
+        median = pd.Series(spacing).groupby(codes[1:][same]).median()
+        wide = spacing > gap_factor * median.reindex(codes[1:][same]).values
+        if wide.any():
+            series = names[np.unique(codes[1:][same][wide])]
+            issues.append(_issue('gaps', 'warning', wide.sum(), f"{wide.sum()} gaps in {_examples(series)}"))
+    return issues
+
+
+def validate_source(path, spec):
+    """
+    Read `path` with its store reader and check it.
+
+    Returns (report, records); records is None when the file could not be
+    read. Checks listed in the spec's 'validation': {'warn': [...]} are
+    reported as warnings only.
+    """
+    issues, records = [], None
+    try:
+        records = spec['transform'](path, **spec.get('params', {}))
+    except KeyError as e:
+        issues.append(_issue('required_columns', 'error', 0, f"missing column {e}"))
+    except ValueError as e:
+        issues.append(_issue('dates', 'error', 0, f"unreadable: {e}"))
+    if records is not None:
+        issues.extend(check_records(records))
+
+    warn_only = set(spec.get('validation', {}).get('warn', []))
+    for issue in issues:
+        if issue['check'] in warn_only:
+            issue['severity'] = 'warning'
+    report = {
+        'source': path,
+        'rows': 0 if records is None else int(len(records)),
+        'series': 0 if records is None else int(records['name'].nunique()),
+        'ok': not any(issue['severity'] == 'error' for issue in issues),
+        'issues': issues,
+    }
+    return report, records
+
+
+def write_report(reports, path=REPORT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_json_atomic(path, {
+        'checked_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'ok': all(report['ok'] for report in reports),
+        'sources': reports,
+    })
+
+
+def validate(sources=None):
+    """Reports for every source of the time-series store that exists"""
+    from utils.timeseries_store import SOURCES
+
+    return [validate_source(path, spec)[0] for path, spec in (sources or SOURCES).items() if os.path.exists(path)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate every dataset behind the dashboard")
+    parser.add_argument('--report', default=REPORT_PATH)
+    args = parser.parse_args(argv)
+
+    reports = validate()
+    write_report(reports, args.report)
+    for report in reports:
+        print(f"{'ok    ' if report['ok'] else 'FAILED'} {report['source']} "
+              f"({report['rows']} rows, {report['series']} series)")
+        for issue in report['issues']:
+            print(f"         {issue['severity']:<7} {issue['check']}: {issue['detail']}")
+    if not all(report['ok'] for report in reports):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Streaming extraction from World Bank WDI bulk CSVs.
+
+WDI downloads (``API_<indicator>_DS2_en_csv_v2_*.csv``, ``CPI_All Countries.csv``)
+hold every country in wide format, one column per year, below a short
+"Data Source" / "Last Updated Date" preamble. ``iter_wdi`` reads them one row
+at a time with the csv module, keeps only the requested country codes and
+years, and yields long-format records, so memory stays flat however many
+countries and indicator files are scanned.
+
+    python -m utils.wdi datasets_raw/Economy/API_NY.GDP.MKTP.CD_DS2_en_csv_v2_130122.csv \\
+        --countries PAK --start 1999 -o data_processed/wdi_pakistan.csv
+"""
+import argparse
+import csv
+import os
+
+import pandas as pd
+
+LONG_COLUMNS = ['Country Name', 'Country Code', 'Indicator Name', 'Indicator Code', 'Year', 'Value']
+
+
+def _rows(path):
+    """csv rows of a WDI file from its 'Country Name' header on, skipping the preamble"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if row and row[0] == 'Country Name':
+                yield row
+                break
+        else:
+            raise ValueError(f"{path} has no 'Country Name' header row; is it a WDI bulk file?")
+        yield from reader
+
+
+def iter_wdi(path, countries=None, start=None, end=None):
+    """
+    Yield (country name, country code, indicator name, indicator code, year, value)
+    for every non-empty cell of the requested countries (ISO3 codes) and years.
+    """
+    rows = _rows(path)
+    header = next(rows)
+    # Year columns, their positions and whether they fall in [start, end]
+    years = [(i, int(name)) for i, name in enumerate(header) if name.isdigit()]
+    years = [(i, year) for i, year in years if (start is None or year >= start) and (end is None or year <= end)]
+    wanted = set(countries) if countries else None
+
+    for row in rows:
+        if len(row) < 4 or (wanted is not None and row[1] not in wanted):
+            continue
+        for i, year in years:
+            if i < len(row) and row[i] != '':
+                yield row[0], row[1], row[2], row[3], year, float(row[i])
+
+
+def read_wdi(paths, countries=None, start=None, end=None):
+    """Long-format DataFrame of the requested countries and years from one or more WDI files"""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    records = [record for path in paths for record in iter_wdi(path, countries, start, end)]
+    df = pd.DataFrame.from_records(records, columns=LONG_COLUMNS)
+    df['Date'] = pd.to_datetime(df['Year'].astype(str), format='%Y')
+    return df
+
+
+def write_long(paths, output, countries=None, start=None, end=None):
+    """Stream the extracted records of `paths` into one long-format CSV; returns the row count"""
+    tmp_path = f"{output}.tmp-{os.getpid()}"
+    count = 0
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(LONG_COLUMNS)
+        for path in paths:
+            for record in iter_wdi(path, countries, start, end):
+                writer.writerow(record[:5] + (repr(record[5]),))
+                count += 1
+    os.replace(tmp_path, output)
+    return count
+
+
+def wdi_long(path, countries=None, start=None, end=None):
+    """Long-format table of one WDI file (ETL transform)"""
+    return read_wdi(path, countries, start, end)[LONG_COLUMNS]
+
+
+def wdi_indicator(path, country='PAK', start=None, end=None, value_column='Value', date_last=False):
+    """
+    One country's indicator as a Date / value_column table (ETL transform).
+
+    `date_last` puts the Date column after the value, as in Pakistan-CPI_Annual.csv.
+    """
+    df = read_wdi(path, [country], start, end)
+    out = pd.DataFrame({'Date': df['Date'], value_column: df['Value']})
+    return out[[value_column, 'Date']] if date_last else out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract countries and years from WDI bulk CSVs")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--countries', nargs='+', help="ISO3 country codes (default: all)")
+    parser.add_argument('--start', type=int)
+    parser.add_argument('--end', type=int)
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args(argv)
+
+    count = write_long(args.files, args.output, args.countries, args.start, args.end)
+    print(f"Wrote {count} observations to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
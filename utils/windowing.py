@@ -0,0 +1,40 @@
+"""Sliding-window datasets for the LSTM models.
+
+Windows are built with ``numpy.lib.stride_tricks.sliding_window_view``, so
+``X`` is a read-only view of the input rather than a copy: building the
+(samples, timesteps, features) array costs the same for any look-back.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(data, look_back):
+    """
+    Split a series into (window, next value) pairs.
+
+    For `data` of shape (T, ...) returns X of shape (T - look_back, look_back, ...)
+    where X[i] = data[i:i + look_back], and y = data[look_back:]. A 1-D series
+    gives (samples, look_back) windows; reshape to add a feature axis.
+    """
+    data = np.asarray(data)
+    if len(data) <= look_back:
+        raise ValueError(f"Need more than {look_back} observations, got {len(data)}")
+    windows = np.moveaxis(sliding_window_view(data, look_back, axis=0), -1, 1)
+    return windows[:len(data) - look_back], data[look_back:]
+
+
+def univariate_windows(series, look_back):
+    """(samples, look_back, 1) windows of a 1-D or single-column series and the (samples,) targets"""
+    series = np.asarray(series).reshape(len(series), -1)[:, 0]
+    X, y = sliding_windows(series, look_back)
+    return X[..., None], y
+
+
+def multivariate_windows(features, target, look_back):
+    """
+    (samples, look_back, n_features) windows of `features` and the `target` value
+    that follows each window.
+    """
+    X, _ = sliding_windows(np.asarray(features), look_back)
+    return X, np.asarray(target)[look_back:]
+
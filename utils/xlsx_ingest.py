@@ -0,0 +1,158 @@
+"""One-off ingest of Excel workbooks into typed, columnar tables.
+
+Parsing XLSX with openpyxl is orders of magnitude slower than reading a CSV,
+so workbooks are converted once, never at request time. ``ingest`` streams
+each sheet with openpyxl's read-only mode, infers a type per column (nullable
+integer, float or string, with padding and 'NULL' placeholders removed) and
+writes one Arrow IPC (Feather) file per sheet under
+``data_processed/cache/xlsx/<content hash>/``. A small pointer file named after
+the workbook records the current hash, so an unchanged workbook is never
+parsed twice and readers only memory-map the Arrow files.
+
+    python -m utils.xlsx_ingest                  # the ITAASER school survey
+    python -m utils.xlsx_ingest path/to/book.xlsx
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.etl import file_hash
+from utils.fileio import is_current, pointer_path, publish_dir, write_json_atomic
+
+CACHE_DIR = 'data_processed/cache/xlsx'
+ITAASER_SCHOOLS = 'datasets_raw/Education/ITAASER2023School.xlsx'
+
+MISSING = {'', 'NULL', 'null', 'NA', 'N/A', '#N/A'}
+
+LAYOUT_VERSION = 2  # bump when the stored files change; older ingests are redone (2: uncompressed Arrow)
+
+
+def _slug(name):
+    return re.sub(r'[^0-9A-Za-z]+', '_', name).strip('_') or 'sheet'
+
+
+def typed_column(values):
+    """A typed pandas array for one column of raw cell values"""
+    cleaned = []
+    for value in values:
+        if isinstance(value, str):
+            value = value.strip()
+            if value in MISSING:
+                value = None
+        cleaned.append(value)
+
+    present = [value for value in cleaned if value is not None]
+    if not present:
+        return pd.array(cleaned, dtype='string')
+    if all(isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+           for value in present):
+        numbers = pd.to_numeric(pd.Series(cleaned, dtype='object'))
+    else:
+        # Numbers stored as text are common in survey exports
+        numbers = pd.to_numeric(pd.Series(cleaned, dtype='object'), errors='coerce')
+        if numbers.notna().sum() != len(present):
+            return pd.array([None if value is None else str(value) for value in cleaned], dtype='string')
+
+    if np.all(np.mod(numbers.dropna(), 1) == 0):
+        return pd.array(numbers, dtype='Int64')
+    return numbers.astype('float64').array
+
+
+def read_sheet(worksheet):
+    """DataFrame of a read-only worksheet whose first row holds the column names"""
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+
+    names, seen = [], {}
+    for i, name in enumerate(header):
+        name = str(name).strip() if name is not None else f"column_{i}"
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+
+    # Column-wise accumulation: one list per column, filled row by row
+    columns = [[] for _ in names]
+    for row in rows:
+        if row is None or all(value is None for value in row):
+            continue
+        for i, column in enumerate(columns):
+            column.append(row[i] if i < len(row) else None)
+    return pd.DataFrame({name: typed_column(column) for name, column in zip(names, columns)})
+
+
+def ingest(source, cache_dir=CACHE_DIR):
+    """Convert every sheet of `source` to Arrow IPC unless this exact file was already ingested"""
+    from openpyxl import load_workbook
+
+    digest = file_hash(source)
+    target = os.path.join(cache_dir, digest)
+    manifest_path = os.path.join(target, 'manifest.json')
+
+    if not is_current(manifest_path, LAYOUT_VERSION):
+        with publish_dir(target) as tmp_dir:
+            workbook = load_workbook(source, read_only=True, data_only=True)
+            sheets = {}
+            try:
+                for worksheet in workbook.worksheets:
+                    df = read_sheet(worksheet)
+                    filename = f"{_slug(worksheet.title)}.arrow"
+                    # Uncompressed, so memory-mapped reads use the file's buffers in place
+                    df.to_feather(os.path.join(tmp_dir, filename), compression='uncompressed')
+                    sheets[worksheet.title] = {
+                        'file': filename,
+                        'rows': int(len(df)),
+                        'columns': {name: str(dtype) for name, dtype in df.dtypes.items()},
+                    }
+            finally:
+                workbook.close()
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+                json.dump({'source': source, 'content_hash': digest, 'layout_version': LAYOUT_VERSION, 'sheets': sheets},
+                          f, indent=2)
+
+    write_json_atomic(pointer_path(source, cache_dir), {'source': source, 'content_hash': digest})
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def load_table(source, sheet=None, columns=None, cache_dir=CACHE_DIR):
+    """
+    A sheet of an ingested workbook (the first one by default), memory-mapped from Arrow.
+
+    Never parses the workbook: raises FileNotFoundError if it has not been
+    ingested yet.
+    """
+    import pyarrow.feather as feather
+
+    pointer = pointer_path(source, cache_dir)
+    if not os.path.exists(pointer):
+        raise FileNotFoundError(f"{source} has not been ingested; run python -m utils.xlsx_ingest {source}")
+    with open(pointer) as f:
+        target = os.path.join(cache_dir, json.load(f)['content_hash'])
+    with open(os.path.join(target, 'manifest.json')) as f:
+        sheets = json.load(f)['sheets']
+
+    entry = sheets[sheet] if sheet else next(iter(sheets.values()))
+    table = feather.read_table(os.path.join(target, entry['file']), columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert Excel workbooks to cached Arrow tables")
+    parser.add_argument('workbooks', nargs='*', default=[ITAASER_SCHOOLS])
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    for source in args.workbooks:
+        manifest = ingest(source, args.cache_dir)
+        for name, sheet in manifest['sheets'].items():
+            print(f"{source} [{name}]: {sheet['rows']} rows x {len(sheet['columns'])} columns "
+                  f"-> {manifest['content_hash'][:12]}/{sheet['file']}")
+
+
+if __name__ == '__main__':
+    main()